@@ -0,0 +1,152 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class AssetCache:
+    """
+    On-disk store of generated sprite zips and portrait sheets.
+    Entries are never modified; the least recently used are deleted once the total size passes the limit.
+    """
+    def __init__(self, path: str, size_limit: int):
+        self.path = path
+        self.size_limit = size_limit
+        self.total_size = 0
+        # file name -> size, oldest first
+        self.entries: OrderedDict[str, int] = OrderedDict()
+
+        os.makedirs(self.path, exist_ok=True)
+        existing = []
+        for entry in os.scandir(self.path):
+            if entry.is_file():
+                stat = entry.stat()
+                existing.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(existing):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.path, name))
+                continue
+            self.entries[name] = size
+            self.total_size += size
+
+    def getFileName(self, key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        file_name = self.getFileName(key)
+        if file_name not in self.entries:
+            return None
+        full_path = os.path.join(self.path, file_name)
+        try:
+            with open(full_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.total_size -= self.entries.pop(file_name)
+            return None
+        # mark as recently used, also across restarts
+        self.entries.move_to_end(file_name)
+        os.utime(full_path)
+        return data
+
+    def put(self, key: str, data: bytes):
+        file_name = self.getFileName(key)
+        full_path = os.path.join(self.path, file_name)
+        tmp_path = full_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, full_path)
+
+        if file_name in self.entries:
+            self.total_size -= self.entries.pop(file_name)
+        self.entries[file_name] = len(data)
+        self.total_size += len(data)
+
+        while self.total_size > self.size_limit and len(self.entries) > 1:
+            old_name, old_size = self.entries.popitem(last=False)
+            self.total_size -= old_size
+            try:
+                os.remove(os.path.join(self.path, old_name))
+            except FileNotFoundError:
+                pass
+
+    def remove(self, key: str):
+        file_name = self.getFileName(key)
+        if file_name not in self.entries:
+            return
+        self.total_size -= self.entries.pop(file_name)
+        try:
+            os.remove(os.path.join(self.path, file_name))
+        except FileNotFoundError:
+            pass
+
+
+class MemoryCache:
+    """
+    In-memory store of decoded assets, shared by the bot and verification threads.
+    The least recently used are dropped once the total size passes the limit.
+    """
+    def __init__(self, size_limit: int):
+        self.size_limit = size_limit
+        self.total_size = 0
+        self.hits = 0
+        self.misses = 0
+        # key -> (value, size), oldest first
+        self.entries: OrderedDict[Any, Tuple[Any, int]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key) -> Optional[Any]:
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, key, value, size: int):
+        with self.lock:
+            if key in self.entries:
+                self.total_size -= self.entries.pop(key)[1]
+            if size > self.size_limit:
+                return
+            self.entries[key] = (value, size)
+            self.total_size += size
+
+            while self.total_size > self.size_limit:
+                _, (_, old_size) = self.entries.popitem(last=False)
+                self.total_size -= old_size
+
+
+class DigestCache:
+    """
+    Pixel digests of locked asset files by folder, along with the stats of each file when it was read.
+    Kept on disk next to the bot rather than in the tracker, since the stats only hold on this machine.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        # folder -> file name -> [mtime_ns, size, inode, digest]
+        self.entries: Dict[str, Dict[str, List[Any]]] = {}
+        self.changed = False
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.entries = json.load(f)
+
+    def getFolder(self, folder: str) -> Dict[str, List[Any]]:
+        # a copy, to be filled in by a lock check and given back through update
+        return dict(self.entries.get(folder, {}))
+
+    def update(self, folder: str, digests: Dict[str, List[Any]]):
+        if self.entries.get(folder, {}) != digests:
+            self.entries[folder] = digests
+            self.changed = True
+
+    def save(self):
+        if not self.changed:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as txt:
+            json.dump(self.entries, txt)
+        os.replace(tmp_path, self.path)
+        self.changed = False
@@ -0,0 +1,52 @@
+import asyncio
+import contextlib
+from typing import Dict, List, Optional
+
+
+class NodeLockManager:
+    """
+    Async locks over tracker nodes.
+    Nodes of the same species share files and recolor bases, so they are locked together.
+    """
+    def __init__(self):
+        self.locks: Dict[str, asyncio.Lock] = {}
+        # holders and waiters of each lock, so that unused locks can be dropped
+        self.users: Dict[str, int] = {}
+
+    def getKeys(self, full_indices: List[Optional[List[str]]]) -> List[str]:
+        keys = set()
+        for full_idx in full_indices:
+            if full_idx is not None and len(full_idx) > 0:
+                keys.add(full_idx[0])
+        # always acquire in the same order to avoid deadlocks between multi-node operations
+        return sorted(keys)
+
+    def isLocked(self, *full_indices: Optional[List[str]]) -> bool:
+        for key in self.getKeys(list(full_indices)):
+            if key in self.locks and self.locks[key].locked():
+                return True
+        return False
+
+    @contextlib.asynccontextmanager
+    async def lock(self, *full_indices: Optional[List[str]]):
+        keys = self.getKeys(list(full_indices))
+        registered = []
+        held = []
+        try:
+            for key in keys:
+                if key not in self.locks:
+                    self.locks[key] = asyncio.Lock()
+                    self.users[key] = 0
+                self.users[key] += 1
+                registered.append(key)
+                await self.locks[key].acquire()
+                held.append(key)
+            yield
+        finally:
+            for key in reversed(held):
+                self.locks[key].release()
+            for key in registered:
+                self.users[key] -= 1
+                if self.users[key] == 0:
+                    del self.locks[key]
+                    del self.users[key]
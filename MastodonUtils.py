@@ -5,6 +5,7 @@ import mastodon
 import os
 import SpriteUtils
 import TrackerUtils
+from utils import unpack_optional
 import asyncio
 
 TOKEN_FILE_PATH = 'mastodon_token.txt'
@@ -51,29 +52,28 @@ async def query_text(sprite_bot, api, tracker, orig_post, name_args):
         return
 
     name_seq = [TrackerUtils.sanitizeName(i) for i in name_args]
-    full_idx = TrackerUtils.findFullTrackerIdx(tracker, name_seq, 0)
+    full_idx = sprite_bot.name_index.findFullTrackerIdx(name_seq)
     if full_idx is None:
         post_text(api, orig_post, "No such Pokemon.", None)
         return
 
-    chosen_node = TrackerUtils.getNodeFromIdx(tracker, full_idx, 0)
+    chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(tracker, full_idx, 0))
     # post the statuses
     response = ""
     status = TrackerUtils.getStatusEmoji(chosen_node, asset_type)
     response += "{0} #{1:03d}: {2}".format(status, int(full_idx[0]), " ".join(name_seq))
 
-    if chosen_node.__dict__[asset_type + "_required"]:
-        file_exists = chosen_node.__dict__[asset_type + "_credit"].primary != ""
+    if chosen_node[asset_type + "_required"]:
+        file_exists = chosen_node[asset_type + "_credit"].primary != ""
         if not file_exists:
             post_text(api, orig_post, "This Pokemon doesn't have a {0}.".format(asset_type), None)
             return
         else:
-            credit = chosen_node.__dict__[asset_type + "_credit"]
+            credit = chosen_node[asset_type + "_credit"]
             base_credit = None
             response += "\n" + sprite_bot.createCreditBlock(credit, base_credit, True)
 
-        chosen_link = await sprite_bot.retrieveLinkMsg(full_idx, chosen_node, asset_type, False)
-        base_file, base_name = SpriteUtils.getLinkFile(chosen_link, asset_type)
+        base_file, base_name = sprite_bot.getAssetFile(full_idx, chosen_node, asset_type, False)
         base_file = SpriteUtils.thumbnailFileImg(base_file)
         media = api.media_post(file_name=base_name, mime_type="image/png", media_file=base_file)
 
@@ -7,10 +7,15 @@ import io
 import discord
 import traceback
 import asyncio
+from concurrent.futures.process import BrokenProcessPool
 import json
 import SpriteUtils
 import TrackerUtils
+import VerifyUtils
+import CacheUtils
+import LockUtils
 import datetime
+import time
 import git
 import sys
 import re
@@ -58,6 +63,7 @@ from commands.Shutdown import Shutdown
 from Constants import PHASES, PermissionLevel
 from utils import unpack_optional
 import psutil
+from PIL import Image
 
 from discord import app_commands
 
@@ -69,6 +75,9 @@ INFO_FILE_PATH = 'README.md'
 CONFIG_FILE_PATH = 'config.json'
 SPRITE_CONFIG_FILE_PATH = 'sprite_config.json'
 TRACKER_FILE_PATH = 'tracker.json'
+ASSET_CACHE_PATH = 'asset_cache'
+SCAN_CACHE_FILE_PATH = 'scan_cache.json'
+DIGEST_CACHE_FILE_PATH = 'digest_cache.json'
 
 scdir = os.path.dirname(os.path.abspath(__file__))
 
@@ -89,6 +98,16 @@ parser.add_argument('--files')
 class MyClient(discord.Client):
     async def setup_hook(self):
         asyncio.create_task(periodic_update_status())
+        sprite_bot.startApprovalWorkers()
+        sprite_bot.startCommitWorker()
+
+    async def close(self):
+        await sprite_bot.flushCommits()
+        if sprite_bot.tracker_save_pending:
+            sprite_bot.flushTracker()
+        sprite_bot.digest_cache.save()
+        await SpriteUtils.closeHttpSession()
+        await super().close()
 
 # The Discord client.
 intent = discord.Intents.default()
@@ -131,6 +150,14 @@ class BotConfig:
         self.update_ch = 0
         self.update_msg = 0
         self.use_bounties = False
+        self.verify_workers = 2
+        self.verify_timeout = 300
+        self.asset_cache_size = 1000000000
+        self.frame_cache_size = 200000000
+        self.member_cache_ttl = 600
+        self.resync_concurrency = 8
+        self.approval_workers = 4
+        self.commit_window = 10
         self.servers: Dict[str, BotServer] = {}
 
         if main_dict is None:
@@ -197,12 +224,51 @@ class SpriteBot:
             for key in sprite_config['action_map']:
                 Constants.ACTION_MAP[int(key)] = sprite_config['action_map'][key]
 
+        SpriteUtils.frame_cache.size_limit = self.config.frame_cache_size
+
+        # start the verification workers now, so the first submission doesn't wait on them
+        self.verify_pool = VerifyUtils.createVerifyPool(self.config.verify_workers, self.config.frame_cache_size)
+        self.verify_pool.submit(VerifyUtils.warmUp).result()
+
         with open(os.path.join(self.config.path, INFO_FILE_PATH)) as f:
             self.info_post = f.read().split("\n\n\n")
 
+        # generated zips and sheets, so that checks don't need to download them back from discord
+        self.asset_cache = CacheUtils.AssetCache(os.path.join(self.path, ASSET_CACHE_PATH), self.config.asset_cache_size)
+        # pixel digests of locked files, so that lock checks don't need to read them back from disk
+        self.digest_cache = CacheUtils.DigestCache(os.path.join(self.path, DIGEST_CACHE_FILE_PATH))
+
         # init repo
         self.repo = git.Repo(self.config.path)
         self.commits = 0
+        # commit messages and touched paths waiting to be committed together, None for the whole repo
+        self.commit_msgs: List[str] = []
+        self.commit_paths: Optional[set] = set()
+        self.commit_event = asyncio.Event()
+        self.git_lock = asyncio.Lock()
+        self.commit_task = None
+        # serialized tracker entries by species, so that a save only needs to redo the changed ones
+        self.tracker_json: Dict[str, str] = {}
+        self.tracker_dirty = set()
+        self.tracker_save_pending = False
+        self.node_locks = LockUtils.NodeLockManager()
+        # submissions to poll after a reaction, and the time each message was queued
+        self.approval_queue: asyncio.Queue = asyncio.Queue()
+        self.queued_approvals: Dict[int, float] = {}
+        self.approval_tasks: List[asyncio.Task] = []
+        self.approvals_polled = 0
+        self.approval_wait_total = 0.0
+        self.approval_wait_max = 0.0
+        # role ids of guild members by guild, with their expiry
+        # member events aren't received without the members intent, so roles may be up to member_cache_ttl seconds stale
+        self.member_roles: Dict[int, Dict[int, Tuple[float, set]]] = {}
+        self.member_cache_hits = 0
+        self.member_cache_misses = 0
+        # rendered #info lines by species, and the last content of each #info message
+        self.info_lines: Dict[str, List[str]] = {}
+        self.info_contents: Dict[int, str] = {}
+        # totals over each species, dropped along with its #info lines whenever it changes
+        self.species_stats: Dict[str, TrackerUtils.NodeStats] = {}
         # tracking data from the content folder
         with open(os.path.join(self.config.path, TRACKER_FILE_PATH)) as f:
             new_tracker = json.load(f)
@@ -217,8 +283,15 @@ class SpriteBot:
         # update tracker based on last-modify
         over_dict = TrackerUtils.initSubNode("", True)
         over_dict.subgroups = self.tracker
-        TrackerUtils.fileSystemToJson(over_dict, os.path.join(self.config.path, "sprite"), "sprite", 0)
-        TrackerUtils.fileSystemToJson(over_dict, os.path.join(self.config.path, "portrait"), "portrait", 0)
+        scan_cache = TrackerUtils.ScanCache()
+        if os.path.exists(os.path.join(self.path, SCAN_CACHE_FILE_PATH)):
+            with open(os.path.join(self.path, SCAN_CACHE_FILE_PATH)) as f:
+                scan_cache = TrackerUtils.ScanCache(json.load(f))
+        TrackerUtils.fileSystemToJson(over_dict, os.path.join(self.config.path, "sprite"), "sprite", 0, scan_cache)
+        TrackerUtils.fileSystemToJson(over_dict, os.path.join(self.config.path, "portrait"), "portrait", 0, scan_cache)
+        with open(os.path.join(self.path, SCAN_CACHE_FILE_PATH), 'w', encoding='utf-8') as txt:
+            json.dump(scan_cache.getDict(), txt)
+        self.name_index = TrackerUtils.NameIndex(self.tracker)
 
         # update credits
         for name in confirmed_names:
@@ -339,31 +412,121 @@ class SpriteBot:
             config = self.config.getDict()
             json.dump(config, txt, indent=2)
 
-    def saveTracker(self):
-        new_tracker = { }
-        for species_idx in self.tracker:
-            new_tracker[species_idx] = self.tracker[species_idx].getDict()
-        with open(os.path.join(self.config.path, TRACKER_FILE_PATH), 'w', encoding='utf-8') as txt:
-            json.dump(new_tracker, txt, indent=2)
+    def saveTracker(self, full_idx=None):
+        """
+        Marks the species of full_idx as changed, or every species if not given,
+        and writes the tracker once the current event loop iteration is done.
+        """
+        if full_idx is None:
+            self.tracker_json = {}
+            self.info_lines = {}
+            self.species_stats = {}
+        else:
+            self.tracker_dirty.add(full_idx[0])
+            self.info_lines.pop(full_idx[0], None)
+            self.species_stats.pop(full_idx[0], None)
 
-    async def gitCommit(self, msg):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None:
+            self.flushTracker()
+        elif not self.tracker_save_pending:
+            self.tracker_save_pending = True
+            loop.call_soon(self.flushTracker)
+
+    def flushTracker(self):
+        self.tracker_save_pending = False
+        species_json = []
+        for species_idx in self.tracker:
+            if species_idx in self.tracker_dirty or species_idx not in self.tracker_json:
+                species_txt = json.dumps(self.tracker[species_idx].getDict(), indent=2)
+                # indented one level in, the same as json.dump would for the whole tracker
+                self.tracker_json[species_idx] = species_txt.replace("\n", "\n  ")
+            species_json.append(json.dumps(species_idx) + ": " + self.tracker_json[species_idx])
+        self.tracker_dirty.clear()
+        for species_idx in [idx for idx in self.tracker_json if idx not in self.tracker]:
+            del self.tracker_json[species_idx]
+
+        if len(species_json) == 0:
+            tracker_txt = "{}"
+        else:
+            tracker_txt = "{\n  " + ",\n  ".join(species_json) + "\n}"
+        file_path = os.path.join(self.config.path, TRACKER_FILE_PATH)
+        with open(file_path + ".tmp", 'w', encoding='utf-8') as txt:
+            txt.write(tracker_txt)
+        os.replace(file_path + ".tmp", file_path)
+
+    async def gitCommit(self, msg, paths=None):
+        """
+        Queues a commit of the given paths, or of the whole repo if not given.
+        The tracker and credit files are always included.
+        """
         if self.config.push:
-            index = self.repo.index
-            diff = index.diff(None)
-            if len(diff) > 0:
-                try:
-                    self.repo.git.add(".")
-                    self.repo.git.commit(m=msg)
-                except Exception as e:
-                    await self.sendError(traceback.format_exc())
-            self.commits += 1
+            self.commit_msgs.append(msg)
+            if paths is None:
+                self.commit_paths = None
+            elif self.commit_paths is not None:
+                self.commit_paths.update(paths)
+            self.commit_event.set()
+
+    def startCommitWorker(self):
+        self.commit_task = asyncio.create_task(self.commitWorker())
+
+    async def commitWorker(self):
+        while True:
+            await self.commit_event.wait()
+            # give the rest of an operation's changes time to arrive, so that they go in one commit
+            await asyncio.sleep(self.config.commit_window)
+            await self.flushCommits()
+
+    async def flushCommits(self):
+        self.commit_event.clear()
+        if len(self.commit_msgs) == 0:
+            return
+        msgs = self.commit_msgs
+        paths = self.commit_paths
+        self.commit_msgs = []
+        self.commit_paths = set()
+
+        # a save scheduled this tick has to be on disk before it is committed
+        if self.tracker_save_pending:
+            self.flushTracker()
+        async with self.git_lock:
+            try:
+                if await asyncio.to_thread(self.commitPaths, "\n".join(msgs), paths):
+                    self.commits += 1
+            except Exception as e:
+                await self.sendError(traceback.format_exc())
 
+    def commitPaths(self, msg, paths):
+        if paths is None:
+            self.repo.git.add("-A")
+        else:
+            add_paths = []
+            for file_name in [TRACKER_FILE_PATH, NAME_FILE_PATH, CREDIT_FILE_PATH]:
+                paths.add(os.path.join(self.config.path, file_name))
+            for path in sorted(paths):
+                # paths that never existed can't be staged, but removed ones still need to be
+                if os.path.exists(path) or self.repo.git.ls_files("--", path) != "":
+                    add_paths.append(path)
+            self.repo.git.add("-A", "--", *add_paths)
+
+        if not self.repo.is_dirty(index=True, working_tree=False, untracked_files=False):
+            return False
+        self.repo.git.commit(m=msg)
+        return True
 
     async def gitPush(self):
-        if self.config.push and self.commits > 0:
-            origin = self.repo.remotes.origin
-            origin.push()
-            self.commits = 0
+        if self.config.push:
+            await self.flushCommits()
+            if self.commits > 0:
+                origin = self.repo.remotes.origin
+                async with self.git_lock:
+                    await asyncio.to_thread(origin.push)
+                self.commits = 0
 
     async def checkRestarted(self):
         if self.config.update_ch != 0 and self.config.update_msg != 0:
@@ -432,11 +595,11 @@ class SpriteBot:
         # fall back on a quoted mention
         # return "`" + mention + "`"
 
-    def getPostsFromDict(self, include_sprite, include_portrait, include_credit, tracker_dict, posts, indices):
+    def getPostsFromDict(self, include_sprite, include_portrait, include_credit, tracker_dict, posts, indices, names):
         if tracker_dict.name != "":
-            new_titles = TrackerUtils.getIdxName(self.tracker, indices)
+            names = names + [tracker_dict.name]
             dexnum = int(indices[0])
-            name_str = " ".join(new_titles)
+            name_str = " ".join(names)
             post = ""
 
             # status
@@ -458,15 +621,20 @@ class SpriteBot:
             posts.append(post)
 
         for sub_dict in tracker_dict.subgroups:
-            self.getPostsFromDict(include_sprite, include_portrait, include_credit, tracker_dict.subgroups[sub_dict], posts, indices + [sub_dict])
+            self.getPostsFromDict(include_sprite, include_portrait, include_credit, tracker_dict.subgroups[sub_dict], posts, indices + [sub_dict], names)
+
 
 
+    def getSpeciesStats(self, species_idx) -> TrackerUtils.NodeStats:
+        if species_idx not in self.species_stats:
+            self.species_stats[species_idx] = TrackerUtils.NodeStats(self.tracker[species_idx])
+        return self.species_stats[species_idx]
 
-    def getBountiesFromDict(self, asset_type, tracker_dict, entries: List[Tuple[int, str, str, int]], indices):
+    def getBountiesFromDict(self, asset_type, tracker_dict, entries: List[Tuple[int, str, str, int]], indices, names):
         if tracker_dict.name != "":
-            new_titles = TrackerUtils.getIdxName(self.tracker, indices)
+            names = names + [tracker_dict.name]
             dexnum = int(indices[0])
-            name_str = " ".join(new_titles)
+            name_str = " ".join(names)
             post = asset_type.title() + " of "
 
             # status
@@ -474,8 +642,8 @@ class SpriteBot:
             # name
             post += " `#" + "{:03d}".format(dexnum) + "`: `" + name_str + "` "
 
-            bounty_dict = tracker_dict.__dict__[asset_type + "_bounty"]
-            next_phase = tracker_dict.__dict__[asset_type + "_complete"] + 1
+            bounty_dict = tracker_dict[asset_type + "_bounty"]
+            next_phase = tracker_dict[asset_type + "_complete"] + 1
 
             if str(next_phase) in bounty_dict:
                 bounty = bounty_dict[str(next_phase)]
@@ -483,7 +651,7 @@ class SpriteBot:
                     entries.append((bounty, post, asset_type, next_phase))
 
         for sub_dict in tracker_dict.subgroups:
-            self.getBountiesFromDict(asset_type, tracker_dict.subgroups[sub_dict], entries, indices + [sub_dict])
+            self.getBountiesFromDict(asset_type, tracker_dict.subgroups[sub_dict], entries, indices + [sub_dict], names)
 
 
     async def isAuthorized(self, user, guild):
@@ -499,14 +667,11 @@ class SpriteBot:
 
         approve_role = guild.get_role(self.config.servers[guild_id_str].approval)
 
-        try:
-            user_member = await guild.fetch_member(user.id)
-        except discord.NotFound as e:
-            user_member = None
+        member_roles = await self.getMemberRoles(user, guild)
 
-        if user_member is None:
+        if member_roles is None:
             return False
-        if approve_role in user_member.roles:
+        if approve_role is not None and approve_role.id in member_roles:
             return True
         return False
 
@@ -523,16 +688,56 @@ class SpriteBot:
 
         approve_role = guild.get_role(self.config.servers[guild_id_str].approval)
 
+        member_roles = await self.getMemberRoles(user, guild)
+
+        if member_roles is None:
+            return PermissionLevel.EVERYONE
+        if approve_role is not None and approve_role.id in member_roles:
+            return PermissionLevel.STAFF
+        return PermissionLevel.EVERYONE
+
+    async def getMemberRoles(self, user, guild):
+        """
+        Returns the role ids of the user in the guild, or None if they aren't a member.
+        Fetched members are kept for member_cache_ttl seconds; non-members are not kept.
+        """
+        guild_members = self.member_roles.setdefault(guild.id, {})
+        now = time.monotonic()
+        if user.id in guild_members:
+            expiry, member_roles = guild_members[user.id]
+            if expiry > now:
+                self.member_cache_hits += 1
+                return member_roles
+            del guild_members[user.id]
+        self.member_cache_misses += 1
+
         try:
             user_member = await guild.fetch_member(user.id)
         except discord.NotFound as e:
             user_member = None
 
         if user_member is None:
-            return PermissionLevel.EVERYONE
-        if approve_role in user_member.roles:
-            return PermissionLevel.STAFF
-        return PermissionLevel.EVERYONE
+            return None
+        member_roles = set(role.id for role in user_member.roles)
+        guild_members[user.id] = (now + self.config.member_cache_ttl, member_roles)
+        return member_roles
+
+    def cacheMember(self, member):
+        member_roles = set(role.id for role in member.roles)
+        self.member_roles.setdefault(member.guild.id, {})[member.id] = (time.monotonic() + self.config.member_cache_ttl, member_roles)
+
+    def clearMemberCache(self, guild_id):
+        self.member_roles.pop(guild_id, None)
+
+    def getMemberStats(self):
+        # drop the members whose roles expired without being read again
+        now = time.monotonic()
+        cached = 0
+        for guild_members in self.member_roles.values():
+            for user_id in [user_id for user_id in guild_members if guild_members[user_id][0] <= now]:
+                del guild_members[user_id]
+            cached += len(guild_members)
+        return "Member cache: {0} cached, {1} hits, {2} misses".format(cached, self.member_cache_hits, self.member_cache_misses)
 
     def remove_self_mention(self, split_args):
         for idx in range(len(split_args)):
@@ -552,12 +757,13 @@ class SpriteBot:
         result_url = resp.attachments[0].url
         return result_url
 
-    async def verifySubmission(self, msg, full_idx, base_idx, asset_type, recolor, msg_args):
+    async def verifySubmission(self, msg, submission, full_idx, base_idx, asset_type, recolor, msg_args):
         decline_msg = None
         quant_img = None
         diffs = None
 
         chosen_node = TrackerUtils.getNodeFromIdx(self.tracker, full_idx, 0)
+        assert chosen_node is not None
         chosen_path = TrackerUtils.getDirFromIdx(self.config.path, asset_type, full_idx)
 
         if asset_type == "sprite":
@@ -565,13 +771,14 @@ class SpriteBot:
             wan_zip = None
             try:
                 if recolor:
-                    wan_zip = SpriteUtils.getLinkImg(msg.attachments[0].url)
+                    wan_zip = submission.getImg()
                 else:
-                    wan_zip = SpriteUtils.getLinkZipGroup(msg.attachments[0].url)
+                    wan_zip = submission.open()
             except SpriteUtils.SpriteVerifyError as e:
-                await self.returnMsgFile(msg, None, msg.author.mention + " Submission was in the wrong format.\n{0}".format(str(e)), asset_type)
+                await self.returnMsgFile(msg, None, msg.author.mention + " Submission was in the wrong format.\n{0}".format(str(e)), asset_type, submission=submission)
+                return False, None
             except Exception as e:
-                await self.returnMsgFile(msg, None, msg.author.mention + " Submission was in the wrong format.\n{0}".format(str(e)), asset_type)
+                await self.returnMsgFile(msg, None, msg.author.mention + " Submission was in the wrong format.\n{0}".format(str(e)), asset_type, submission=submission)
                 raise e
 
             orig_zip = None
@@ -585,104 +792,135 @@ class SpriteBot:
                 orig_idx = base_idx
 
             if orig_idx is not None:
-                orig_node = TrackerUtils.getNodeFromIdx(self.tracker, orig_idx, 0)
+                orig_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.tracker, orig_idx, 0))
 
-                if orig_node.__dict__[asset_type + "_credit"].primary == "":
+                if orig_node[asset_type + "_credit"].primary == "":
                     # this means there's no original portrait to base the recolor off of
-                    await self.returnMsgFile(msg, None, msg.author.mention + " Cannot submit a shiny when the original isn't finished.", asset_type)
+                    await self.returnMsgFile(msg, None, msg.author.mention + " Cannot submit a shiny when the original isn't finished.", asset_type, submission=submission)
                     return False, None
 
-                orig_link = await self.retrieveLinkMsg(orig_idx, orig_node, asset_type, recolor)
                 try:
                     if recolor:
-                        orig_zip = SpriteUtils.getLinkImg(orig_link)
-                        orig_group_link = await self.retrieveLinkMsg(orig_idx, orig_node, asset_type, False)
-                        orig_zip_group = SpriteUtils.getLinkZipGroup(orig_group_link)
+                        orig_zip = self.getAssetImg(orig_idx, orig_node, asset_type, recolor)
+                        orig_zip_group, _ = self.getAssetFile(orig_idx, orig_node, asset_type, False)
                     else:
-                        orig_zip = SpriteUtils.getLinkZipGroup(orig_link)
+                        orig_zip, _ = self.getAssetFile(orig_idx, orig_node, asset_type, recolor)
                 except Exception as e:
-                    await self.returnMsgFile(msg, None, msg.author.mention + " A problem occurred reading original sprite.", asset_type)
+                    await self.returnMsgFile(msg, None, msg.author.mention + " A problem occurred reading original sprite.", asset_type, submission=submission)
                     raise e
 
-            # if the file needs to be compared to an original, verify it as a recolor. Otherwise, by itself.
             try:
-                diffs = SpriteUtils.verifySpriteLock(chosen_node, chosen_path, orig_zip_group, wan_zip, recolor)
-                if TrackerUtils.isShinyIdx(full_idx):
-                    SpriteUtils.verifySpriteRecolor(msg_args, orig_zip, wan_zip, recolor, True)
-                elif base_idx is not None:
-                    warnings = SpriteUtils.verifySpriteRecolor(msg_args, orig_zip, wan_zip, recolor, False)
-                    await self.warnSubmission(msg, warnings)
-                else:
-                    SpriteUtils.verifySprite(msg_args, wan_zip)
+                lock_data = VerifyUtils.LockData(chosen_node, self.digest_cache.getFolder(chosen_path))
+                diffs, warnings, submission.preview_data, digests, error = await self.runVerification(VerifyUtils.verifySpriteSubmission, msg_args,
+                                                                                                       lock_data, chosen_path,
+                                                                                                       TrackerUtils.isShinyIdx(full_idx), base_idx is not None,
+                                                                                                       orig_zip, orig_zip_group, wan_zip, recolor)
+                self.digest_cache.update(chosen_path, digests)
+                if error is not None:
+                    raise error
+                await self.warnSubmission(msg, warnings)
             except SpriteUtils.SpriteVerifyError as e:
                 decline_msg = e.message
                 quant_img = e.preview_img
+            except asyncio.TimeoutError:
+                await self.returnMsgFile(msg, None, msg.author.mention + " Verification of the submitted sprite took too long.", asset_type, submission=submission)
+                return False, None
             except Exception as e:
-                await self.returnMsgFile(msg, None, msg.author.mention + " A problem occurred reading submitted sprite.\n{0}".format(str(e)), asset_type)
+                await self.returnMsgFile(msg, None, msg.author.mention + " A problem occurred reading submitted sprite.\n{0}".format(str(e)), asset_type, submission=submission)
                 raise e
         elif asset_type == "portrait":
             # get the portrait image and verify its contents
             try:
-                img = SpriteUtils.getLinkImg(msg.attachments[0].url)
+                img = submission.getImg()
             except SpriteUtils.SpriteVerifyError as e:
-                await self.returnMsgFile(msg, None, msg.author.mention + " Submission was in the wrong format.\n{0}".format(str(e)), asset_type)
+                await self.returnMsgFile(msg, None, msg.author.mention + " Submission was in the wrong format.\n{0}".format(str(e)), asset_type, submission=submission)
                 return False, None
             except Exception as e:
-                await self.returnMsgFile(msg, None, msg.author.mention + " Submission was in the wrong format.\n{0}".format(str(e)), asset_type)
+                await self.returnMsgFile(msg, None, msg.author.mention + " Submission was in the wrong format.\n{0}".format(str(e)), asset_type, submission=submission)
                 raise e
 
             orig_img = None
             # if it's a shiny, get the original image
             if TrackerUtils.isShinyIdx(full_idx):
                 orig_idx = TrackerUtils.createShinyIdx(full_idx, False)
-                orig_node = TrackerUtils.getNodeFromIdx(self.tracker, orig_idx, 0)
+                orig_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.tracker, orig_idx, 0))
 
-                if orig_node.__dict__[asset_type + "_credit"].primary == "":
+                if orig_node[asset_type + "_credit"].primary == "":
                     # this means there's no original portrait to base the recolor off of
-                    await self.returnMsgFile(msg, None, msg.author.mention + " Cannot submit a shiny when the original isn't finished.", asset_type)
+                    await self.returnMsgFile(msg, None, msg.author.mention + " Cannot submit a shiny when the original isn't finished.", asset_type, submission=submission)
                     return False, None
 
-                orig_link = await self.retrieveLinkMsg(orig_idx, orig_node, asset_type, recolor)
-
                 try:
-                    orig_img = SpriteUtils.getLinkImg(orig_link)
+                    orig_img = self.getAssetImg(orig_idx, orig_node, asset_type, recolor)
                 except SpriteUtils.SpriteVerifyError as e:
                     await self.returnMsgFile(msg, None, msg.author.mention + " A problem occurred reading original portrait.",
-                                             asset_type)
+                                             asset_type, submission=submission)
                     return False, None
                 except Exception as e:
                     await self.returnMsgFile(msg, None, msg.author.mention + " A problem occurred reading original portrait.",
-                                             asset_type)
+                                             asset_type, submission=submission)
                     raise e
 
-            # if the file needs to be compared to an original, verify it as a recolor. Otherwise, by itself.
             try:
-                diffs = SpriteUtils.verifyPortraitLock(chosen_node, chosen_path, img, recolor)
-                if TrackerUtils.isShinyIdx(full_idx):
-                    warnings = SpriteUtils.verifyPortraitRecolor(msg_args, orig_img, img, recolor)
-                    await self.warnSubmission(msg, warnings)
-                else:
-                    SpriteUtils.verifyPortrait(msg_args, img)
+                lock_data = VerifyUtils.LockData(chosen_node, self.digest_cache.getFolder(chosen_path))
+                diffs, warnings, digests, error = await self.runVerification(VerifyUtils.verifyPortraitSubmission, msg_args, lock_data,
+                                                                             chosen_path, TrackerUtils.isShinyIdx(full_idx), orig_img, img, recolor)
+                self.digest_cache.update(chosen_path, digests)
+                if error is not None:
+                    raise error
+                await self.warnSubmission(msg, warnings)
             except SpriteUtils.SpriteVerifyError as e:
                 decline_msg = e.message
                 quant_img = e.preview_img
+            except asyncio.TimeoutError:
+                await self.returnMsgFile(msg, None, msg.author.mention + " Verification of the submitted portrait took too long.", asset_type, submission=submission)
+                return False, None
 
         if decline_msg is not None:
-            await self.returnMsgFile(msg, None, msg.author.mention + " " + decline_msg, asset_type, quant_img)
+            await self.returnMsgFile(msg, None, msg.author.mention + " " + decline_msg, asset_type, quant_img, submission=submission)
             return False, None
 
         return True, diffs
 
+    async def runVerification(self, verify_func, *args):
+        """
+        Runs a verification function from VerifyUtils in the worker pool.
+        Raises asyncio.TimeoutError if it exceeds the configured timeout.
+        """
+        for attempt in range(2):
+            pool = self.verify_pool
+            try:
+                future = pool.submit(verify_func, *args)
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.config.verify_timeout)
+            except asyncio.TimeoutError:
+                # the worker keeps running the job after we stop waiting, so take it down with the pool
+                self.replaceVerifyPool(pool)
+                raise
+            except BrokenProcessPool:
+                # a worker died, or the pool was killed over another job's timeout; retry once on a new pool
+                self.replaceVerifyPool(pool)
+                if attempt > 0:
+                    raise
+
+    def replaceVerifyPool(self, pool):
+        # jobs failing together on the same pool only replace it once
+        if pool is not self.verify_pool:
+            return
+        VerifyUtils.killVerifyPool(pool)
+        self.verify_pool = VerifyUtils.createVerifyPool(self.config.verify_workers, self.config.frame_cache_size)
+
     async def warnSubmission(self, msg, warnings):
         for warning in warnings:
             await self.getChatChannel(msg.guild.id).send(msg.author.mention + " " + msg.attachments[0].filename + "\n" + warning)
 
-    async def returnMsgFile(self, msg, thread, msg_body, asset_type, quant_img=None):
+    async def returnMsgFile(self, msg, thread, msg_body, asset_type, quant_img=None, submission=None):
         try:
-            return_file, return_name = SpriteUtils.getLinkFile(msg.attachments[0].url, asset_type)
+            if submission is None:
+                submission = await SpriteUtils.getLinkBuffer(msg.attachments[0].url)
+            return_file, return_name = submission.getFile(asset_type)
             if thread:
                 await self.getChatChannel(msg.guild.id).send(msg_body + "\n" + thread.mention, file=discord.File(return_file, return_name))
-                return_file, return_name = SpriteUtils.getLinkFile(msg.attachments[0].url, asset_type)
+                return_file, return_name = submission.getFile(asset_type)
                 await thread.send(msg_body, file=discord.File(return_file, return_name))
             else:
                 await self.getChatChannel(msg.guild.id).send(msg_body, file=discord.File(return_file, return_name))
@@ -701,10 +939,10 @@ class SpriteBot:
         await msg.delete()
 
 
-    async def stageSubmission(self, msg, split_args, full_idx, chosen_node, asset_type, author, recolor, diffs, overcolor):
+    async def stageSubmission(self, msg, submission, split_args, full_idx, chosen_node, asset_type, author, recolor, diffs, overcolor):
 
         try:
-            return_file, return_name = SpriteUtils.getLinkFile(msg.attachments[0].url, asset_type)
+            return_file, return_name = submission.getFile(asset_type)
         except SpriteUtils.SpriteVerifyError as e:
             await self.getChatChannel(msg.guild.id).send("An error occurred with the file {0}.\n{1}".format(msg.attachments[0].filename, str(e)))
             await msg.delete()
@@ -716,25 +954,24 @@ class SpriteBot:
 
         overcolor_img = None
         if overcolor:
-            overcolor_img = SpriteUtils.getLinkImg(msg.attachments[0].url)
+            overcolor_img = submission.getImg()
             if recolor:
                 overcolor_img = SpriteUtils.removePalette(overcolor_img)
 
         await self.postStagedSubmission(msg.channel, split_args, "", full_idx, chosen_node, asset_type, author, recolor,
-                                        diffs, return_file, return_name, overcolor_img)
+                                        diffs, return_file, return_name, overcolor_img, submission.preview_data)
 
         await msg.delete()
 
     async def postStagedSubmission(self, channel, cmd_str, formatted_content, full_idx, chosen_node, asset_type, author, recolor,
-                                   diffs, return_file, return_name, overcolor_img):
+                                   diffs, return_file, return_name, overcolor_img, preview_data=None):
 
         deleting = ("--deleteauthor" in cmd_str)
         no_credit = ("--nocredit" in cmd_str)
         title = TrackerUtils.getIdxName(self.tracker, full_idx)
 
-        return_copy = io.BytesIO()
-        return_copy.write(return_file.read())
-        return_copy.seek(0)
+        # a separate file over the same bytes, for sending while the original is read for previews
+        return_copy = io.BytesIO(return_file.getvalue())
         return_file.seek(0)
         send_files = [(return_copy, return_name)]
 
@@ -756,10 +993,13 @@ class SpriteBot:
 
         add_msg = ""
         if not recolor and asset_type == "sprite":
-            preview_img = SpriteUtils.getCombinedZipImg(return_file)
-            preview_file = io.BytesIO()
-            preview_img.save(preview_file, format='PNG')
-            preview_file.seek(0)
+            if preview_data is None:
+                preview_img = SpriteUtils.getCombinedZipImg(return_file)
+                preview_file = io.BytesIO()
+                preview_img.save(preview_file, format='PNG')
+                preview_file.seek(0)
+            else:
+                preview_file = io.BytesIO(preview_data)
             send_files.append((preview_file, return_name.replace('.zip', '.png')))
             add_msg += "\nPreview included."
 
@@ -777,7 +1017,7 @@ class SpriteBot:
             send_files.append((reduced_file, return_name.replace('.png', '_reduced.png')))
             add_msg += "\nReduced Color Preview included."
 
-        if chosen_node.__dict__[asset_type + "_credit"].primary != "":
+        if chosen_node[asset_type + "_credit"].primary != "":
             if recolor or asset_type == "portrait":
                 orig_link = await self.retrieveLinkMsg(full_idx, chosen_node, asset_type, recolor)
                 add_msg += "\nCurrent Version: {0}".format(orig_link)
@@ -788,9 +1028,11 @@ class SpriteBot:
         new_msg = await channel.send("{0} {1}\n{2}\n{3}{4}\n{5}".format(author, " ".join(title), cmd_str, diff_str,
                                                                         thread_link, formatted_content + add_msg), files=main_files)
 
-        pending_dict = chosen_node.__dict__[asset_type+"_pending"]
+        pending_dict = chosen_node[asset_type+"_pending"]
         change_status = len(pending_dict) == 0
         pending_dict[str(new_msg.id)] = new_msg.channel.id
+        # also redraws the species on the #info board, which shows whether a node has pending submissions
+        self.saveTracker(full_idx)
 
         # react to the message
         await new_msg.add_reaction('\U00002705')
@@ -857,7 +1099,7 @@ class SpriteBot:
                 delete_author = True
             if msg_args.base:
                 name_seq = [TrackerUtils.sanitizeName(i) for i in msg_args.base]
-                base_idx = TrackerUtils.findFullTrackerIdx(self.tracker, name_seq, 0)
+                base_idx = self.name_index.findFullTrackerIdx(name_seq)
                 if base_idx is None:
                     await self.getChatChannel(msg.guild.id).send(msg.author.mention + " No such Pokemon to base this sprite off.")
                     await msg.delete()
@@ -881,13 +1123,12 @@ class SpriteBot:
         base_recolor_file = None
         if not is_shiny:
             shiny_idx = TrackerUtils.createShinyIdx(full_idx, True)
-            shiny_node = TrackerUtils.getNodeFromIdx(self.tracker, shiny_idx, 0)
+            shiny_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.tracker, shiny_idx, 0))
 
             # the shiny may be marked as incomplete, so we should check for an author at all
-            if shiny_node.__dict__[asset_type+"_credit"].primary != "":
+            if shiny_node[asset_type+"_credit"].primary != "":
                 # get recolor data
-                base_link = await self.retrieveLinkMsg(full_idx, chosen_node, asset_type, False)
-                base_recolor_file, _ = SpriteUtils.getLinkFile(base_link, asset_type)
+                base_recolor_file, _ = self.getAssetFile(full_idx, chosen_node, asset_type, False)
 
         # get the name of the slot that it was written to
         new_name = TrackerUtils.getIdxName(self.tracker, full_idx)
@@ -899,7 +1140,7 @@ class SpriteBot:
             new_revise = "Revised Credit"
         elif delete_author:
             new_revise = "Deleted Credit"
-        elif chosen_node.__dict__[asset_type+"_credit"].primary != "":
+        elif chosen_node[asset_type+"_credit"].primary != "":
             new_revise = "Revised"
 
         # save and set the new sprite or portrait
@@ -918,7 +1159,7 @@ class SpriteBot:
                     # no need to check if the original sprite has changed between this recolor's submission and acceptance
                     # because when the original sprite is approved, all submissions for shinies are purged
                     try:
-                        recolor_img = SpriteUtils.getLinkImg(msg.attachments[0].url)
+                        recolor_img = await SpriteUtils.getLinkImg(msg.attachments[0].url)
                     except Exception as e:
                         await self.getChatChannel(msg.guild.id).send(
                             orig_sender + " " + "Removed unknown file: {0}".format(file_name))
@@ -926,11 +1167,11 @@ class SpriteBot:
                         raise e
                     SpriteUtils.placeSpriteRecolorToPath(orig_path, recolor_img, gen_path)
                 else:
-                    wan_file = SpriteUtils.getLinkZipGroup(msg.attachments[0].url)
+                    wan_file = await SpriteUtils.getLinkZipGroup(msg.attachments[0].url)
                     SpriteUtils.placeSpriteZipToPath(wan_file, gen_path)
             elif asset_type == "portrait":
                 try:
-                    portrait_img = SpriteUtils.getLinkImg(msg.attachments[0].url)
+                    portrait_img = await SpriteUtils.getLinkImg(msg.attachments[0].url)
                 except Exception as e:
                     await self.getChatChannel(msg.guild.id).send(orig_sender + " " + "Removed unknown file: {0}".format(file_name))
                     await msg.delete()
@@ -954,9 +1195,9 @@ class SpriteBot:
             TrackerUtils.deleteCredits(gen_path, orig_author)
 
             # update the credits and timestamp in the chosen node
-            chosen_node.__dict__[asset_type + "_modified"] = str(datetime.datetime.utcnow())
+            chosen_node[asset_type + "_modified"] = str(datetime.datetime.utcnow())
 
-            credit_data = chosen_node.__dict__[asset_type + "_credit"]
+            credit_data = chosen_node[asset_type + "_credit"]
 
             credit_entries = TrackerUtils.getCreditEntries(gen_path)
             if credit_data.primary == orig_author:
@@ -982,9 +1223,9 @@ class SpriteBot:
             self.saveNames()
 
             # update the credits and timestamp in the chosen node
-            chosen_node.__dict__[asset_type + "_modified"] = str(datetime.datetime.utcnow())
+            chosen_node[asset_type + "_modified"] = str(datetime.datetime.utcnow())
 
-            credit_data = chosen_node.__dict__[asset_type + "_credit"]
+            credit_data = chosen_node[asset_type + "_credit"]
             if not no_credit and credit_data.primary != orig_author:
                 # only update credit name if the new author is different from the primary
                 credit_entries = TrackerUtils.getCreditEntries(gen_path)
@@ -1000,7 +1241,7 @@ class SpriteBot:
         current_completion_file = TrackerUtils.getCurrentCompletion(orig_node, chosen_node, asset_type)
 
         # remove from pending list
-        pending_dict = chosen_node.__dict__[asset_type + "_pending"]
+        pending_dict = chosen_node[asset_type + "_pending"]
         if str(msg.id) in pending_dict:
             del pending_dict[str(msg.id)]
 
@@ -1012,8 +1253,8 @@ class SpriteBot:
             file_name = "{0}-{1}{2}".format(asset_type, "-".join(full_idx), ext)
 
             new_link = await self.generateLink(file_data, file_name)
-            chosen_node.__dict__[asset_type+"_link"] = new_link
-            chosen_node.__dict__[asset_type+"_recolor_link"] = ""
+            chosen_node[asset_type+"_link"] = new_link
+            chosen_node[asset_type+"_recolor_link"] = ""
 
         mentions = ["<@!"+str(ii)+">" for ii in approvals]
         approve_msg = "{0} {1} approved by {2}: #{3:03d}: {4}".format(new_revise, asset_type, str(mentions), int(full_idx[0]), new_name_str)
@@ -1026,14 +1267,15 @@ class SpriteBot:
                 approve_msg += "\nNo Changes."
 
             # update completion to correct value
-            chosen_node.__dict__[asset_type + "_complete"] = current_completion_file
+            chosen_node[asset_type + "_complete"] = current_completion_file
             if current_completion_file != prev_completion_file:
                 approve_msg += "\n{0} is now {1}.".format(asset_type.title(), PHASES[current_completion_file])
 
             # if this was non-shiny, set the complete flag to false for the shiny
             if not is_shiny:
-                if shiny_node.__dict__[asset_type+"_credit"].primary != "":
-                    shiny_node.__dict__[asset_type+"_complete"] = TrackerUtils.PHASE_INCOMPLETE
+                assert shiny_node is not None
+                if shiny_node[asset_type+"_credit"].primary != "":
+                    shiny_node[asset_type+"_complete"] = TrackerUtils.PHASE_INCOMPLETE
                     approve_msg += "\nNote: Shiny form now marked as {0} due to this change.".format(PHASES[TrackerUtils.PHASE_INCOMPLETE])
 
 
@@ -1088,11 +1330,11 @@ class SpriteBot:
                 approve_msg += "\nThe non-bounty GP Reward for this {0} will be handled by the approvers.".format(asset_type)
 
         # save the tracker
-        self.saveTracker()
+        self.saveTracker(full_idx)
 
         update_msg = "{0} {1} #{2:03d}: {3}".format(new_revise, asset_type, int(full_idx[0]), new_name_str)
         # commit the changes
-        await self.gitCommit("{0} by {1} {2}".format(update_msg, orig_author, self.names[orig_author].name))
+        await self.gitCommit("{0} by {1} {2}".format(update_msg, orig_author, self.names[orig_author].name), [gen_path])
 
         # post about it
         for server_id in self.config.servers:
@@ -1116,9 +1358,9 @@ class SpriteBot:
             bounty_points = 0
             result_phase = current_completion_file
             while result_phase > 0:
-                if str(result_phase) in chosen_node.__dict__[asset_type + "_bounty"]:
-                    bounty_points += chosen_node.__dict__[asset_type + "_bounty"][str(result_phase)]
-                    del chosen_node.__dict__[asset_type + "_bounty"][str(result_phase)]
+                if str(result_phase) in chosen_node[asset_type + "_bounty"]:
+                    bounty_points += chosen_node[asset_type + "_bounty"][str(result_phase)]
+                    del chosen_node[asset_type + "_bounty"][str(result_phase)]
                 result_phase -= 1
 
             if bounty_points > 0:
@@ -1130,10 +1372,11 @@ class SpriteBot:
 
 
             if not is_shiny:
+                assert shiny_node is not None
                 # remove all pending shinies
                 pending = {}
-                for pending_id in shiny_node.__dict__[asset_type+"_pending"]:
-                    pending[pending_id] = shiny_node.__dict__[asset_type+"_pending"][pending_id]
+                for pending_id in shiny_node[asset_type+"_pending"]:
+                    pending[pending_id] = shiny_node[asset_type+"_pending"][pending_id]
 
                 for pending_id in pending:
                     try:
@@ -1155,19 +1398,20 @@ class SpriteBot:
 
                     # compute the diff
                     auto_diffs = []
+                    shiny_digests = self.digest_cache.getFolder(shiny_path)
                     try:
                         if asset_type == "sprite":
                             orig_idx = unpack_optional(TrackerUtils.createShinyIdx(full_idx, False))
                             orig_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.tracker, orig_idx, 0))
 
-                            orig_group_link = await self.retrieveLinkMsg(orig_idx, orig_node, asset_type, False)
-                            orig_zip_group = SpriteUtils.getLinkZipGroup(orig_group_link)
+                            orig_zip_group, _ = self.getAssetFile(orig_idx, orig_node, asset_type, False)
 
-                            auto_diffs = SpriteUtils.verifySpriteLock(shiny_node, shiny_path, orig_zip_group, auto_recolor_img, True)
+                            auto_diffs = SpriteUtils.verifySpriteLock(shiny_node, shiny_path, SpriteUtils.DecodedSprite(orig_zip_group), auto_recolor_img, True, shiny_digests)
                         elif asset_type == "portrait":
-                            auto_diffs = SpriteUtils.verifyPortraitLock(shiny_node, shiny_path, auto_recolor_img, True)
+                            auto_diffs = SpriteUtils.verifyPortraitLock(shiny_node, shiny_path, auto_recolor_img, True, shiny_digests)
                     except Exception as e:
                         return
+                    self.digest_cache.update(shiny_path, shiny_digests)
 
                     # post it as a staged submission
                     return_name = "{0}-{1}{2}".format(asset_type + "_recolor", "-".join(shiny_idx), ".png") # type: ignore
@@ -1222,10 +1466,11 @@ class SpriteBot:
         review_thread = await self.retrieveDiscussion(full_idx, chosen_node, asset_type, msg.guild.id)
 
         # change the status of the sprite
-        pending_dict = chosen_node.__dict__[asset_type+"_pending"]
+        pending_dict = chosen_node[asset_type+"_pending"]
         change_status = len(pending_dict) == 1
         if str(msg.id) in pending_dict:
             del pending_dict[str(msg.id)]
+            self.saveTracker(full_idx)
 
         if len(declines) > 0:
             mentions = ["<@!" + str(ii) + ">" for ii in declines]
@@ -1242,31 +1487,102 @@ class SpriteBot:
             TrackerUtils.clearSubmissions(self.tracker[node_idx])
 
         # make sure they are re-added
+        start_time = time.monotonic()
+        polled = 0
+        semaphore = asyncio.Semaphore(self.config.resync_concurrency)
+
+        async def resyncSubmission(msg):
+            nonlocal polled
+            try:
+                async with self.node_locks.lock(self.getSubmissionIdx(msg)):
+                    await self.pollSubmission(msg)
+            except Exception as e:
+                await self.sendError(traceback.format_exc())
+            finally:
+                semaphore.release()
+            polled += 1
+            if polled % 100 == 0:
+                self.writeLog("Resynced {0} submissions".format(polled))
+
         for server in self.config.servers:
             ch_id = self.config.servers[server].submit
             if ch_id == 0:
                 continue
-            msgs = []
             channel = self.client.get_channel(ch_id)
+            tasks = set()
             async for message in channel.history(limit=None):
-                msgs.append(message)
-            for msg in msgs:
-                try:
-                    await self.pollSubmission(msg)
-                except Exception as e:
-                    await self.sendError(traceback.format_exc())
+                # stop reading history while the maximum number of submissions are being polled
+                await semaphore.acquire()
+                task = asyncio.create_task(resyncSubmission(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
             self.saveTracker()
             self.changed = True
+        self.writeLog("Resynced {0} submissions in {1:.1f}s".format(polled, time.monotonic() - start_time))
+        self.writeLog(self.getMemberStats())
+
+    def startApprovalWorkers(self):
+        for _ in range(self.config.approval_workers):
+            self.approval_tasks.append(asyncio.create_task(self.approvalWorker()))
+
+    def queueApproval(self, channel_id, msg_id):
+        # further reactions to a message that is still waiting are covered by its poll
+        if msg_id in self.queued_approvals:
+            return
+        self.queued_approvals[msg_id] = time.monotonic()
+        self.approval_queue.put_nowait((channel_id, msg_id))
+
+    async def approvalWorker(self):
+        while True:
+            channel_id, msg_id = await self.approval_queue.get()
+            wait_time = time.monotonic() - self.queued_approvals.pop(msg_id)
+            self.approvals_polled += 1
+            self.approval_wait_total += wait_time
+            self.approval_wait_max = max(self.approval_wait_max, wait_time)
+            try:
+                channel = self.client.get_channel(channel_id)
+                msg = await channel.fetch_message(msg_id)
+                full_idx = self.getSubmissionIdx(msg)
+                contended = self.node_locks.isLocked(full_idx)
+                async with self.node_locks.lock(full_idx):
+                    if contended:
+                        # another operation on the node may have changed or removed the message in the meantime
+                        try:
+                            msg = await channel.fetch_message(msg_id)
+                        except discord.NotFound:
+                            continue
+                    changed_idx = await self.pollSubmission(msg)
+                if changed_idx is not None:
+                    self.saveTracker(changed_idx)
+            except Exception as e:
+                await self.sendError(traceback.format_exc())
+            finally:
+                self.approval_queue.task_done()
+
+    def getApprovalStats(self):
+        avg_wait = 0.0
+        if self.approvals_polled > 0:
+            avg_wait = self.approval_wait_total / self.approvals_polled
+        return "Approval queue: {0} waiting, {1} polled, {2:.1f}s average wait, {3:.1f}s max wait".format(
+            self.approval_queue.qsize(), self.approvals_polled, avg_wait, self.approval_wait_max)
+
+    def getSubmissionIdx(self, msg):
+        # both submissions and staged submissions are named after the node they are for
+        if len(msg.attachments) != 1:
+            return None
+        _, full_idx, _, _ = TrackerUtils.getStatsFromFilename(msg.attachments[0].filename)
+        return full_idx
 
     """
-    Returns true if anything changed that would require a tracker save
+    Returns the index of the changed node if anything changed that would require a tracker save
     """
     async def pollSubmission(self, msg):
         # check for messages in #submissions
 
         if msg.author.id == self.client.user.id:
             if msg.content == ".":
-                return False
+                return None
 
             cks = None
             xs = None
@@ -1369,34 +1685,35 @@ class SpriteBot:
 
             if len(decline) > 0:
                 await self.submissionDeclined(msg, orig_sender, decline)
-                return True
+                return full_idx
             elif auto:
                 await self.submissionApproved(msg, orig_sender, orig_author, approve, silent)
-                return False
+                return None
             elif not warn:
                 if deleting:
                     if len(approve) >= 3 and consent:
                         await self.submissionApproved(msg, orig_sender, orig_author, approve, silent)
-                        return False
+                        return None
                 elif asset_type == "sprite" and len(approve) >= 3:
                     await self.submissionApproved(msg, orig_sender, orig_author, approve, silent)
-                    return False
+                    return None
                 elif asset_type == "portrait" and len(approve) >= 2:
                     await self.submissionApproved(msg, orig_sender, orig_author, approve, silent)
-                    return False
+                    return None
 
             chosen_node = TrackerUtils.getNodeFromIdx(self.tracker, full_idx, 0)
-            pending_dict = chosen_node.__dict__[asset_type + "_pending"]
+            assert chosen_node is not None
+            pending_dict = chosen_node[asset_type + "_pending"]
             pending_dict[str(msg.id)] = msg.channel.id
 
             for reaction, user in remove_users:
                 await reaction.remove(user)
-            return False
+            return None
         else:
             if len(msg.attachments) != 1:
                 await msg.delete()
                 await self.getChatChannel(msg.guild.id).send(msg.author.mention + " Invalid submission. Attach one and only one file!")
-                return False
+                return None
 
             file_name = msg.attachments[0].filename
             name_valid, full_idx, asset_type, recolor = TrackerUtils.getStatsFromFilename(file_name)
@@ -1407,14 +1724,14 @@ class SpriteBot:
                 name_valid = False
             else:
                 assert asset_type is not None
-                if not chosen_node.__dict__[asset_type + "_required"]:
+                if not chosen_node[asset_type + "_required"]:
                     # if the node can be found, but it's not required, it's also invalid
                     name_valid = False
 
             if not name_valid:
                 await msg.delete()
                 await self.getChatChannel(msg.guild.id).send(msg.author.mention + " Invalid filename {0}. Do not change the filename from the original name given by !portrait or !sprite .".format(file_name))
-                return False
+                return None
 
             assert full_idx is not None
             assert asset_type is not None
@@ -1428,7 +1745,7 @@ class SpriteBot:
             if not mentioned:
                 await msg.delete()
                 await self.getChatChannel(msg.guild.id).send(msg.author.mention + " Please ping me in your submission. Slash command support coming soon. Your message:\n`{0}`".format(msg.content))
-                return False
+                return None
 
             try:
                 split_args = self.remove_self_mention(msg.content.split())
@@ -1436,12 +1753,12 @@ class SpriteBot:
             except SystemExit:
                 await msg.delete()
                 await self.getChatChannel(msg.guild.id).send(msg.author.mention + " Invalid arguments used in submission post.\n`{0}`".format(msg.content))
-                return False
+                return None
 
             base_idx = None
             if msg_args.base:
                 name_seq = [TrackerUtils.sanitizeName(i) for i in msg_args.base]
-                base_idx = TrackerUtils.findFullTrackerIdx(self.tracker, name_seq, 0)
+                base_idx = self.name_index.findFullTrackerIdx(name_seq)
                 if base_idx is None:
                     await msg.delete()
                     await self.getChatChannel(msg.guild.id).send(msg.author.mention + " No such Pokemon to base this sprite off.")
@@ -1458,10 +1775,16 @@ class SpriteBot:
 
 
             overcolor = msg_args.overcolor
-            # at this point, we confirm the file name is valid, now check the contents
-            verified, diffs = await self.verifySubmission(msg, full_idx, base_idx, asset_type, recolor, msg_args)
+            # at this point, we confirm the file name is valid, now download it once for checking and staging
+            try:
+                submission = await SpriteUtils.getLinkBuffer(msg.attachments[0].url)
+            except SpriteUtils.SpriteVerifyError as e:
+                await self.returnMsgFile(msg, None, msg.author.mention + " Submission was in the wrong format.\n{0}".format(str(e)), asset_type)
+                return None
+
+            verified, diffs = await self.verifySubmission(msg, submission, full_idx, base_idx, asset_type, recolor, msg_args)
             if not verified:
-                return False
+                return None
 
             # after other args have been consumed, check for one more arg: if the submission was made in someone else's stead
             author = "<@!{0}>".format(msg.author.id)
@@ -1472,16 +1795,18 @@ class SpriteBot:
                     decline_msg = "{0} does not have a profile.".format(sanitized_author)
 
                 if decline_msg is not None:
-                    await self.returnMsgFile(msg, None, msg.author.mention + " " + decline_msg, asset_type)
-                    return False
+                    await self.returnMsgFile(msg, None, msg.author.mention + " " + decline_msg, asset_type, submission=submission)
+                    return None
 
                 author = "{0}/{1}".format(author, sanitized_author)
 
-            await self.stageSubmission(msg, " ".join(split_args), full_idx, chosen_node, asset_type, author, recolor, diffs, overcolor)
-            return True
+            await self.stageSubmission(msg, submission, " ".join(split_args), full_idx, chosen_node, asset_type, author, recolor, diffs, overcolor)
+            return full_idx
 
 
-    async def sendInfoPosts(self, channel, posts: List[str], msg_ids, msg_idx):
+    async def sendInfoPosts(self, channel, posts: List[str], msg_ids, msg_idx, msg_contents=None):
+        if msg_contents is None:
+            msg_contents = {}
         changed = False
         line_idx = 0
         while line_idx < len(posts):
@@ -1500,21 +1825,35 @@ class SpriteBot:
             post_range = posts[line_idx:(line_idx+line_len)]
             post = "\n".join(post_range)
             if msg_idx < len(msg_ids):
-                try:
-                    msg = await channel.fetch_message(msg_ids[msg_idx])
-                except Exception as e:
-                    msg = None
+                msg_id = msg_ids[msg_idx]
+                if msg_id in msg_contents:
+                    # the message was sent or edited by us, no need to fetch it
+                    if msg_contents[msg_id] != post:
+                        try:
+                            await channel.get_partial_message(msg_id).edit(content=post)
+                        except discord.NotFound:
+                            del msg_contents[msg_id]
+                            msg_ids.pop(msg_idx)
+                            changed = True
+                            continue
+                else:
+                    try:
+                        msg = await channel.fetch_message(msg_id)
+                    except Exception as e:
+                        msg = None
 
-                if msg is None:
-                    msg_ids.pop(msg_idx)
-                    changed = True
-                    continue
+                    if msg is None:
+                        msg_ids.pop(msg_idx)
+                        changed = True
+                        continue
 
-                if msg.content != post:
-                    await msg.edit(content=post)
+                    if msg.content != post:
+                        await msg.edit(content=post)
+                msg_contents[msg_id] = post
             else:
                 msg = await channel.send(content=post)
                 msg_ids.append(msg.id)
+                msg_contents[msg.id] = post
                 changed = True
             line_idx += line_len
             msg_idx += 1
@@ -1529,59 +1868,35 @@ class SpriteBot:
         channel = self.client.get_channel(int(server.info))
 
         posts: List[str] = []
-        over_dict = TrackerUtils.initSubNode("", True)
-        over_dict.subgroups = self.tracker
-        self.getPostsFromDict(True, True, True, over_dict, posts, [])
+        for species_idx in self.tracker:
+            # only the species changed since the last update need to be rendered again
+            if species_idx not in self.info_lines:
+                species_posts: List[str] = []
+                self.getPostsFromDict(True, True, True, self.tracker[species_idx], species_posts, [species_idx], [])
+                self.info_lines[species_idx] = species_posts
+            posts += self.info_lines[species_idx]
 
         msgs_used = 0
-        msgs_used, changed = await self.sendInfoPosts(channel, posts, msg_ids, msgs_used)
+        msgs_used, changed = await self.sendInfoPosts(channel, posts, msg_ids, msgs_used, self.info_contents)
         changed_list |= changed
-        msgs_used, changed = await self.sendInfoPosts(channel, self.info_post, msg_ids, msgs_used)
+        msgs_used, changed = await self.sendInfoPosts(channel, self.info_post, msg_ids, msgs_used, self.info_contents)
         changed_list |= changed
 
         # remove unneeded posts from the list
         while msgs_used < len(msg_ids):
-            msg = await channel.fetch_message(msg_ids[-1])
-            await msg.delete()
-            msg_ids.pop()
+            msg_id = msg_ids.pop()
+            self.info_contents.pop(msg_id, None)
             changed_list = True
+            try:
+                await channel.get_partial_message(msg_id).delete()
+            except discord.NotFound:
+                pass
+            except:
+                await self.sendError("Error deleting {0}!\n{1}".format(msg_id, traceback.format_exc()))
 
         if changed_list:
             self.saveConfig()
 
-        # remove unneeded posts from the channel
-        prevMsg = None
-        total = 0
-        msgs = []
-        while True:
-            count = 0
-            ended = False
-            async for message in channel.history(limit=100, before=prevMsg):
-                prevMsg = message
-                count += 1
-                if message.id in msg_ids:
-                    continue
-                if message.author.id != self.client.user.id:
-                    continue
-                msgs.append(message)
-
-            total += count
-            if count == 0:
-                ended = True
-            #print("Scanned " + str(total))
-            if ended:
-                #print("Scanned back to " + str(prevMsg.created_at))
-                break
-            #print("Continuing...")
-
-        # deletion
-        for ii in range(0, len(msgs)):
-            message = msgs[ii]
-            try:
-                await message.delete()
-            except:
-                await self.sendError("Error deleting {0}!\n{1}".format(message.id, traceback.format_exc()))
-
     async def updateThreads(self, server_id):
         server = self.config.servers[server_id]
         if int(server.submit) == 0:
@@ -1597,7 +1912,7 @@ class SpriteBot:
             name_args = thread.name.split()
             asset_name = name_args[0].lower()
             name_seq = [TrackerUtils.sanitizeName(i) for i in name_args[1:]]
-            full_idx = TrackerUtils.findFullTrackerIdx(self.tracker, name_seq, 0)
+            full_idx = self.name_index.findFullTrackerIdx(name_seq)
             if full_idx is None:
                 # this thread should not exist!  But we'll just set it to archived?
                 await thread.edit(archived=True)
@@ -1607,7 +1922,7 @@ class SpriteBot:
             if chosen_node is None:
                 await self.sendError("Could not get node when updating thread {0}!".format(thread.name))
                 continue
-            pending_dict = chosen_node.__dict__[asset_name+"_pending"]
+            pending_dict = chosen_node[asset_name+"_pending"]
 
             if len(pending_dict) > 0:
                 # no need to archive, the submission is active
@@ -1633,8 +1948,8 @@ class SpriteBot:
         req_base = asset_type
         req_link = req_base + "_talk"
 
-        if guild_id_str in chosen_node.__dict__[req_link]:
-            talk_id = chosen_node.__dict__[req_link][guild_id_str]
+        if guild_id_str in chosen_node[req_link]:
+            talk_id = chosen_node[req_link][guild_id_str]
             guild = self.client.get_guild(guild_id)
             try:
                 thread = await guild.fetch_channel(talk_id)
@@ -1660,7 +1975,8 @@ class SpriteBot:
         thread = await msg.create_thread(name=new_name_str)
         await thread.send("Discussion: {0}".format(new_name_str))
         await msg.delete()
-        chosen_node.__dict__[req_link][guild_id_str] = thread.id
+        chosen_node[req_link][guild_id_str] = thread.id
+        self.saveTracker(full_idx)
         return thread
 
 
@@ -1672,49 +1988,96 @@ class SpriteBot:
         req_link = req_base + "_link"
 
         # if we already have a link, send that link
-        if chosen_node.__dict__[req_link] != "":
-            old_link = chosen_node.__dict__[req_link]
+        if chosen_node[req_link] != "":
+            old_link = chosen_node[req_link]
             # TODO: we might be able to get a new link by returning to the message used?
-            if SpriteUtils.testLinkFile(old_link):
+            if await SpriteUtils.testLinkFile(old_link):
                 return old_link
 
         # otherwise, generate that link
+        file_data, file_name = self.getAssetFile(full_idx, chosen_node, asset_type, recolor)
+
+        new_link = await self.generateLink(file_data, file_name)
+        chosen_node[req_link] = new_link
+        self.saveTracker(full_idx)
+        return new_link
+
+    def getAssetFile(self, full_idx, chosen_node, asset_type, recolor):
+        """
+        Returns the generated zip or sheet for a node, along with the file name its link would have.
+        Files are generated once per change to their source files and kept in the asset cache.
+        """
+        req_base = asset_type
+        if recolor:
+            req_base += "_recolor"
+
         # if there is no data in the folder (aka no credit)
         # create a dummy template using missingno
-        gen_path = os.path.join(self.config.path, asset_type, "0000")
+        gen_idx = ["0000"]
         # otherwise, use the provided path
-        if chosen_node.__dict__[asset_type + "_credit"].primary != "":
-            gen_path = TrackerUtils.getDirFromIdx(self.config.path, asset_type, full_idx)
+        if chosen_node[asset_type + "_credit"].primary != "":
+            gen_idx = full_idx
+        gen_path = TrackerUtils.getDirFromIdx(self.config.path, asset_type, gen_idx)
 
         if recolor:
             target_idx = TrackerUtils.createShinyIdx(full_idx, True)
         else:
             target_idx = full_idx
-        file_data, ext = SpriteUtils.generateFileData(gen_path, asset_type, recolor)
-        file_data.seek(0)
+
+        cache_key = self.getAssetKey(gen_path, asset_type, recolor)
+        file_data = self.asset_cache.get(cache_key)
+        if file_data is None:
+            gen_file, ext = SpriteUtils.generateFileData(gen_path, asset_type, recolor)
+            file_data = gen_file.getvalue()
+            self.asset_cache.put(cache_key, file_data)
+
+        ext = ".png"
+        if asset_type == "sprite" and not recolor:
+            ext = ".zip"
         file_name = "{0}-{1}{2}".format(req_base, "-".join(target_idx), ext)
+        return io.BytesIO(file_data), file_name
 
-        new_link = await self.generateLink(file_data, file_name)
-        chosen_node.__dict__[req_link] = new_link
-        self.saveTracker()
-        return new_link
+    def getAssetKey(self, gen_path, asset_type, recolor):
+        # the stats of the source files change whenever they are approved, moved, replaced or cloned
+        req_base = asset_type
+        if recolor:
+            req_base += "_recolor"
+        return "{0}/{1}".format(req_base, SpriteUtils.getContentKey(gen_path, False))
+
+    def clearAssetCache(self, full_idx, chosen_node):
+        """
+        Drops the generated files of a node and its subnodes, so that they are made again from the files on disk.
+        """
+        for asset_type in TrackerUtils.ASSET_TYPES:
+            if chosen_node[asset_type + "_credit"].primary != "":
+                gen_path = TrackerUtils.getDirFromIdx(self.config.path, asset_type, full_idx)
+                self.asset_cache.remove(self.getAssetKey(gen_path, asset_type, False))
+                self.asset_cache.remove(self.getAssetKey(gen_path, asset_type, True))
+
+        for subgroup in chosen_node.subgroups:
+            self.clearAssetCache(full_idx + [subgroup], chosen_node.subgroups[subgroup])
+
+    def getAssetImg(self, full_idx, chosen_node, asset_type, recolor):
+        file_data, _ = self.getAssetFile(full_idx, chosen_node, asset_type, recolor)
+        return Image.open(file_data).convert("RGBA")
 
 
     async def checkMoveLock(self, full_idx_from, chosen_node_from, full_idx_to, chosen_node_to, asset_type):
 
         chosen_path_from = TrackerUtils.getDirFromIdx(self.config.path, asset_type, full_idx_from)
-        chosen_img_to_link = await self.retrieveLinkMsg(full_idx_to, chosen_node_to, asset_type, False)
+        digests = self.digest_cache.getFolder(chosen_path_from)
         if asset_type == "sprite":
-            chosen_zip_to = SpriteUtils.getLinkZipGroup(chosen_img_to_link)
-            SpriteUtils.verifySpriteLock(chosen_node_from, chosen_path_from, None, chosen_zip_to, False)
+            chosen_zip_to, _ = self.getAssetFile(full_idx_to, chosen_node_to, asset_type, False)
+            SpriteUtils.verifySpriteLock(chosen_node_from, chosen_path_from, None, SpriteUtils.DecodedSprite(chosen_zip_to), False, digests)
         elif asset_type == "portrait":
-            chosen_img_to = SpriteUtils.getLinkImg(chosen_img_to_link)
-            SpriteUtils.verifyPortraitLock(chosen_node_from, chosen_path_from, chosen_img_to, False)
+            chosen_img_to = self.getAssetImg(full_idx_to, chosen_node_to, asset_type, False)
+            SpriteUtils.verifyPortraitLock(chosen_node_from, chosen_path_from, chosen_img_to, False, digests)
+        self.digest_cache.update(chosen_path_from, digests)
 
 
     async def postSocialMedia(self, full_idx, asset_type, update_verb, author, file_name = "Idle"):
         chosen_node = TrackerUtils.getNodeFromIdx(self.tracker, full_idx, 0)
-        chosen_link = await self.retrieveLinkMsg(full_idx, chosen_node, asset_type, False)
+        chosen_file, _ = self.getAssetFile(full_idx, chosen_node, asset_type, False)
 
         name_arr = TrackerUtils.getIdxName(self.tracker, full_idx)
         name_str = " ".join(name_arr)
@@ -1725,7 +2088,7 @@ class SpriteBot:
                                                             author,
                                                             int(full_idx[0]), name_str, status)
 
-        img_file = SpriteUtils.getSocialMediaImage(chosen_link, asset_type, file_name)
+        img_file = SpriteUtils.getSocialMediaImage(chosen_file, asset_type, file_name)
 
         urls = []
         masto_img = None
@@ -1741,7 +2104,7 @@ class SpriteBot:
                 bsky_file = img_file
                 # a little hack workaround for bsky not supporting gifs: use mastodon's conversion
                 if asset_type == "sprite" and masto_img is not None:
-                    bsky_file, bsky_name = SpriteUtils.getLinkData(masto_img)
+                    bsky_file, bsky_name = await SpriteUtils.getLinkData(masto_img)
                 url = await BlueSkyUtils.post_image(self.bsky_api, tl_msg, name_str, bsky_file, asset_type)
                 urls.append(url)
             except:
@@ -1756,7 +2119,7 @@ class SpriteBot:
         failed_file_names = []
         for file_name in file_names:
             failed = True
-            for k in chosen_node.__dict__[asset_type + "_files"]:
+            for k in chosen_node[asset_type + "_files"]:
                 if file_name.lower() == k.lower():
                     final_file_names.append(k)
                     failed = False
@@ -1819,14 +2182,14 @@ class SpriteBot:
 
         wanted_author = self.getFormattedCredit(name_args[0])
         name_seq = [TrackerUtils.sanitizeName(i) for i in name_args[1:]]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.tracker, name_seq, 0)
+        full_idx = self.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
 
-        chosen_node = TrackerUtils.getNodeFromIdx(self.tracker, full_idx, 0)
+        chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.tracker, full_idx, 0))
 
-        if chosen_node.__dict__[asset_type + "_credit"].primary == "":
+        if chosen_node[asset_type + "_credit"].primary == "":
             await msg.channel.send(msg.author.mention + " No credit found.")
             return
         gen_path = TrackerUtils.getDirFromIdx(self.config.path, asset_type, full_idx)
@@ -1838,7 +2201,7 @@ class SpriteBot:
             return
 
         # make the credit array into the most current author by itself
-        credit_data = chosen_node.__dict__[asset_type + "_credit"]
+        credit_data = chosen_node[asset_type + "_credit"]
         if credit_data.primary == "CHUNSOFT":
             await msg.channel.send(msg.author.mention + " Cannot reset credit for a CHUNSOFT {0}.".format(asset_type))
             return
@@ -1848,7 +2211,7 @@ class SpriteBot:
 
         await msg.channel.send(msg.author.mention + " Credit display has been reset for {0} {1}:\n{2}".format(asset_type, " ".join(name_seq), self.createCreditBlock(credit_data, None)))
 
-        self.saveTracker()
+        self.saveTracker(full_idx)
         self.changed = True
 
 
@@ -2011,6 +2374,8 @@ async def on_message(msg: discord.Message):
             return
 
         server = sprite_bot.config.servers[guild_id_str]
+        if isinstance(msg.author, discord.Member):
+            sprite_bot.cacheMember(msg.author)
 
         if msg.channel.id == server.chat:
             prefix = server.prefix
@@ -2047,9 +2412,10 @@ async def on_message(msg: discord.Message):
                 await msg.channel.send(msg.author.mention + " Unknown Command. Run \"" + sprite_bot.client.user.mention + " help\" for commands.")
 
         elif msg.channel.id == sprite_bot.config.servers[guild_id_str].submit:
-            changed_tracker = await sprite_bot.pollSubmission(msg)
-            if changed_tracker:
-                sprite_bot.saveTracker()
+            async with sprite_bot.node_locks.lock(sprite_bot.getSubmissionIdx(msg)):
+                changed_idx = await sprite_bot.pollSubmission(msg)
+            if changed_idx is not None:
+                sprite_bot.saveTracker(changed_idx)
 
     except Exception as e:
         await sprite_bot.sendError(traceback.format_exc())
@@ -2062,14 +2428,22 @@ async def on_raw_reaction_add(payload):
             return
         guild_id_str = str(payload.guild_id)
         if payload.channel_id == sprite_bot.config.servers[guild_id_str].submit:
-            msg = await client.get_channel(payload.channel_id).fetch_message(payload.message_id) # type: ignore
-            changed_tracker = await sprite_bot.pollSubmission(msg)
-            if changed_tracker:
-                sprite_bot.saveTracker()
+            # the gateway sends the reacting member along, which saves fetching it
+            if payload.member is not None:
+                sprite_bot.cacheMember(payload.member)
+            sprite_bot.queueApproval(payload.channel_id, payload.message_id)
 
     except Exception as e:
         await sprite_bot.sendError(traceback.format_exc())
 
+@client.event
+async def on_guild_role_update(before, after):
+    sprite_bot.clearMemberCache(after.guild.id)
+
+@client.event
+async def on_guild_role_delete(role):
+    sprite_bot.clearMemberCache(role.guild.id)
+
 
 async def periodic_update_status():
     await client.wait_until_ready()
@@ -2084,10 +2458,13 @@ async def periodic_update_status():
                     await sprite_bot.gitCommit("Tracker update from restart.")
                 # update push
                 sprite_bot.writeLog("Performing Push")
+                sprite_bot.digest_cache.save()
                 sprite_bot.generateCreditCompilation()
                 await sprite_bot.gitCommit("Update credits.")
                 await sprite_bot.gitPush()
                 sprite_bot.writeLog("Push Complete")
+                sprite_bot.writeLog(sprite_bot.getApprovalStats())
+                sprite_bot.writeLog(sprite_bot.getMemberStats())
 
         except Exception as e:
             await sprite_bot.sendError(traceback.format_exc())
@@ -2136,23 +2513,25 @@ async def periodic_update_status():
         sprite_bot.writeLog("Client Closed Status: {0}".format(client.is_closed()))
 
 
-sprite_bot = SpriteBot(scdir, client)
+# verification workers import this script again, and must not start a bot of their own
+if __name__ == "__main__":
+    sprite_bot = SpriteBot(scdir, client)
 
-with open(os.path.join(scdir, "tokens", TOKEN_FILE_PATH)) as token_file:
-    token = token_file.read()
+    with open(os.path.join(scdir, "tokens", TOKEN_FILE_PATH)) as token_file:
+        token = token_file.read()
 
-try:
-    client.run(token)
-except Exception as e:
-    trace = traceback.format_exc()
-    print(trace)
+    try:
+        client.run(token)
+    except Exception as e:
+        trace = traceback.format_exc()
+        print(trace)
 
 
-if sprite_bot.need_restart:
-    # restart
-    args = sys.argv[:]
-    args.insert(0, sys.executable)
-    if sys.platform == 'win32':
-        args = ['"%s"' % arg for arg in args]
+    if sprite_bot.need_restart:
+        # restart
+        args = sys.argv[:]
+        args.insert(0, sys.executable)
+        if sys.platform == 'win32':
+            args = ['"%s"' % arg for arg in args]
 
-    os.execv(sys.executable, args)
+        os.execv(sys.executable, args)
@@ -2,10 +2,10 @@ import os
 import re
 import shutil
 import math
-import time
-import urllib
-import urllib.request
+import asyncio
+import aiohttp
 from PIL import Image, ImageDraw, ImageFont
+import numpy as np
 import datetime
 import json
 from io import BytesIO
@@ -13,12 +13,21 @@ import zipfile
 import xml.etree.ElementTree as ET
 import utils as exUtils
 import Constants
-from typing import Dict, List, Tuple
+import CacheUtils
+from typing import Dict, List, Tuple, Optional
 
 RETRIEVE_HEADERS = { 'User-Agent': 'Mozilla/5.0 (Windows; U; Windows NT 5.1; en-US; rv:1.9.0.7) Gecko/2009021910 Firefox/3.0.7'}
 
 
 ZIP_SIZE_LIMIT = 5000000
+# decoded frames of recently read sprites, since one approval reads the same sprite several times
+frame_cache = CacheUtils.MemoryCache(200000000)
+# assembled portrait sheets as png, for the same reason
+sheet_cache = CacheUtils.MemoryCache(50000000)
+# emotion file names to their sheet index and whether they are flipped, for the current emotions
+emotion_slots: Dict[str, Tuple[int, bool]] = {}
+emotion_slots_key: Tuple[str, ...] = ()
+http_session: Optional[aiohttp.ClientSession] = None
 DRAW_CENTER_X = 0
 DRAW_CENTER_Y = -4
 
@@ -29,6 +38,10 @@ class SpriteVerifyError(Exception):
         self.preview_img = preview_img
         super().__init__(self.message)
 
+    def __reduce__(self):
+        # keep the preview image when sent back from a verification worker
+        return SpriteVerifyError, (self.message, self.preview_img)
+
 class AnimStat:
 
     def __init__(self, index, name, size, backref):
@@ -82,27 +95,33 @@ def comparePalette(img1, img2):
 
     return len(palette2) - len(palette1)
 
-def comparePixels(img1, img2):
-    inData1 = img1.getdata()
-    inData2 = img2.getdata()
-    diffs = []
-    for ii in range(len(inData1)):
-        data1 = inData1[ii]
-        data2 = inData2[ii]
-        if data1[3] != data2[3]:
-            diffs.append((ii % img1.size[0], ii // img1.size[0]))
-
-    return diffs
-
 def getPalette(inImg):
-    inData = inImg.getdata()
-    palette = {}
-    for data in inData:
-        if data[3] > 0:
-            if data not in palette:
-                palette[data] = 0
-            palette[data] = palette[data]+1
-    return palette
+    """
+    Counts of all visible colors, in order of first appearance.
+    """
+    arr = exUtils.getImgArray(inImg)
+    packed = exUtils.getPackedColors(arr)[arr[:, :, 3] > 0]
+    colors, first_idx, counts = np.unique(packed, return_index=True, return_counts=True)
+    order = np.argsort(first_idx)
+    return dict(zip(exUtils.unpackColors(colors[order]), counts[order].tolist()))
+
+def getPixelDiffReport(pixel_diffs, limit):
+    """
+    Lists the differing pixels of each named mask, row by row, truncated to the limit.
+    Only as many pixels as can fit are converted to coordinates.
+    """
+    # every pixel takes at least 8 characters, so the rest would be truncated away
+    max_pixels = limit // 8 + 1
+    px_strings = []
+    length = 0
+    for name in pixel_diffs:
+        ys, xs = np.nonzero(pixel_diffs[name])
+        px_string = name + ": " + ", ".join([str(a) for a in zip(xs[:max_pixels].tolist(), ys[:max_pixels].tolist())])
+        px_strings.append(px_string)
+        length += len(px_string) + 1
+        if length > limit:
+            break
+    return "\n".join(px_strings)[:limit]
 
 def insertPalette(inImg):
     outImg = Image.new('RGBA', (inImg.size[0], inImg.size[1]+1), (0,0,0,0))
@@ -142,15 +161,28 @@ def thumbnailFileImg(inFile):
     file_data.seek(0)
     return file_data
 
-def animateFileZip(inFile, anim):
-    img_list = []
-    total_durations = []
-
-    # WARNING: while increasing these values will result in crisper images uploaded,
-    # they run the risk of using too much memory and causing the entire program to OOM and be killed.
-    # BE CAREFUL
-    factor = 3
-    area_size = (120, 120)
+def getSharedPaletteImg(img, background):
+    """
+    Converts an opaque image to palette mode, with the background color included in the palette.
+    Returns the image and the background's index, for building frames that all share the palette.
+    """
+    arr = exUtils.getImgArray(img)
+    background_packed = exUtils.getPackedColors(np.array(background, np.uint8))
+    colors, inverse = np.unique(np.append(exUtils.getPackedColors(arr).reshape(-1), background_packed), return_inverse=True)
+    if len(colors) > 256:
+        palette_img = img.convert("RGB").quantize(256, dither=Image.Dither.NONE)
+        background_img = Image.new("RGB", (1, 1), background[:3]).quantize(palette=palette_img, dither=Image.Dither.NONE)
+        return palette_img, background_img.getpixel((0, 0))
+
+    inverse = inverse.reshape(-1)
+    palette_img = Image.fromarray(inverse[:-1].reshape(arr.shape[:2]).astype(np.uint8), 'P')
+    palette_img.putpalette(np.ascontiguousarray(colors).view(np.uint8).reshape(-1, 4)[:, :3].tobytes(), "RGB")
+    return palette_img, int(inverse[-1])
+
+def animateFileZip(inFile, anim, factor=3, area_size=(120, 120)):
+    # frames are drawn onto one palette canvas and handed to the GIF encoder one at a time,
+    # so memory grows by one byte per pixel of each frame instead of holding every frame in RGBA
+    background = (0, 128, 128, 255)
 
     with zipfile.ZipFile(inFile, 'r') as zip:
         name_list = zip.namelist()
@@ -173,92 +205,136 @@ def animateFileZip(inFile, anim):
         anim_img = readZipImg(zip, anim_png_name)
         shadow_img = readZipImg(zip, shadow_png_name)
 
-        datas = shadow_img.getdata()
-        shadow_datas = [(0,0,0,0)] * len(datas)
-        for idx in range(len(datas)):
-            color = datas[idx]
-            if color[3] != 255:
-                continue
-
-            if color[1] == 255:
-                shadow_datas[idx] = (0,0,0,255)
-            elif color[0] == 255 and sdw_size > 0:
-                shadow_datas[idx] = (0,0,0,255)
-            elif color[2] == 255 and sdw_size > 1:
-                shadow_datas[idx] = (0,0,0,255)
+    # shadow pixels used by this shadow size are drawn black under the sprite
+    shadow_arr = exUtils.getImgArray(shadow_img.crop((0, 0, anim_img.size[0], anim_img.size[1])))
+    opaque = shadow_arr[:, :, 3] == 255
+    shadow_mask = opaque & (shadow_arr[:, :, 1] == 255)
+    if sdw_size > 0:
+        shadow_mask |= opaque & (shadow_arr[:, :, 0] == 255)
+    if sdw_size > 1:
+        shadow_mask |= opaque & (shadow_arr[:, :, 2] == 255)
+
+    # compose the whole sheet at its original size, then convert it to a palette once
+    sheet_arr = np.empty(shadow_arr.shape, np.uint8)
+    sheet_arr[:] = background
+    sheet_arr[shadow_mask] = (0, 0, 0, 255)
+    sheet_img = Image.fromarray(sheet_arr, 'RGBA')
+    sheet_img.paste(anim_img, (0, 0), anim_img)
+    sheet_img, background_idx = getSharedPaletteImg(sheet_img, background)
+
+    tileSize = anim_stat.size
+    newTileSize = (tileSize[0] * factor, tileSize[1] * factor)
+    final_size = (area_size[0] * factor, area_size[1] * factor)
+    paste_loc = ((final_size[0] - newTileSize[0]) // 2, (final_size[1] - newTileSize[1]) // 2 )
+    durations = anim_stat.durations
+
+    total_frames = anim_img.size[0] // tileSize[0]
+    total_dirs = anim_img.size[1] // tileSize[1]
 
-        shadow_img = Image.new('RGBA', shadow_img.size, (0, 0, 0, 0))
-        shadow_img.putdata(shadow_datas)
-
-        tileSize = anim_stat.size
-        newTileSize = (tileSize[0] * factor, tileSize[1] * factor)
-        final_size = (area_size[0] * factor, area_size[1] * factor)
-        paste_loc = ((final_size[0] - newTileSize[0]) // 2, (final_size[1] - newTileSize[1]) // 2 )
-        durations = anim_stat.durations
+    total_durations = []
+    for dir in range(total_dirs):
+        for jj in range(total_frames):
+            total_durations.append(durations[jj] * 20)
 
-        total_frames = anim_img.size[0] // tileSize[0]
-        total_dirs = anim_img.size[1] // tileSize[1]
+    canvas = Image.new('P', final_size, background_idx)
+    canvas.putpalette(sheet_img.getpalette())
 
+    def renderFrames():
+        # every tile covers the same area of the canvas, so it never needs clearing
         for dir in range(total_dirs):
             for jj in range(total_frames):
-                tile_rect = (jj * tileSize[0], dir * tileSize[1], tileSize[0], tileSize[1])
-                tile_bounds = (tile_rect[0], tile_rect[1], tile_rect[0] + tile_rect[2], tile_rect[1] + tile_rect[3])
-                tile_tex = anim_img.crop(tile_bounds)
-                shadow_tex = shadow_img.crop(tile_bounds)
-
-                new_tile_tex = tile_tex.resize(newTileSize, resample=Image.NEAREST) # type: ignore
-                new_shadow_tex = shadow_tex.resize(newTileSize, resample=Image.NEAREST) # type: ignore
-
-                total_durations.append(durations[jj] * 20)
+                tile_bounds = (jj * tileSize[0], dir * tileSize[1], (jj + 1) * tileSize[0], (dir + 1) * tileSize[1])
+                tile_tex = sheet_img.crop(tile_bounds).resize(newTileSize, resample=Image.NEAREST) # type: ignore
+                canvas.paste(tile_tex, paste_loc)
+                yield canvas
 
-                full_frame = Image.new('RGBA', final_size, (0, 128, 128, 255))
-                full_frame.paste(new_shadow_tex, (paste_loc[0], paste_loc[1]), new_shadow_tex)
-                full_frame.paste(new_tile_tex, (paste_loc[0], paste_loc[1]), new_tile_tex)
-                img_list.append(full_frame)
+    frames = renderFrames()
+    first_frame = next(frames).copy()
 
     file_data = BytesIO()
-    img_list[0].save(file_data, format='GIF', save_all=True, append_images=img_list[1:], duration=total_durations, loop=0)
+    # the encoder copies each frame as it takes it, so the canvas can be drawn over for the next one
+    first_frame.save(file_data, format='GIF', save_all=True, append_images=frames, duration=total_durations, loop=0)
     file_data.seek(0)
-
-    #img_list[0].save("test.gif", format='GIF', save_all=True, append_images=img_list[1:], optimize=True, duration=20, loop=0)
     return file_data
 
-def getLinkData(url):
+def getHttpSession() -> aiohttp.ClientSession:
+    """
+    Returns the shared session, so all downloads reuse one connection pool.
+    """
+    global http_session
+    if http_session is None or http_session.closed:
+        http_session = aiohttp.ClientSession(headers=RETRIEVE_HEADERS)
+    return http_session
+
+async def closeHttpSession():
+    global http_session
+    if http_session is not None:
+        await http_session.close()
+        http_session = None
+
+async def readLink(url, size_limit=ZIP_SIZE_LIMIT) -> bytes:
+    async with getHttpSession().get(url, raise_for_status=True) as response:
+        if response.content_length is not None and response.content_length > size_limit:
+            raise SpriteVerifyError("Linked file is too large, at {0} bytes.".format(response.content_length))
+        data = bytearray()
+        async for chunk in response.content.iter_chunked(65536):
+            data += chunk
+            if len(data) > size_limit:
+                raise SpriteVerifyError("Linked file is too large, exceeding {0} bytes.".format(size_limit))
+        return bytes(data)
+
+class SubmissionBuffer:
+    """
+    A downloaded file, held once and read in place.
+    Each open() is a separate read-only file over the same bytes, so it can be read any number of times without copies.
+    """
+    def __init__(self, data: bytes, file_name: str):
+        self.data = data
+        self.file_name = file_name
+        # png of the sprite's frames, made during verification
+        self.preview_data: Optional[bytes] = None
+
+    def open(self) -> BytesIO:
+        # a BytesIO made from bytes shares their buffer until written to
+        return BytesIO(self.data)
+
+    def getImg(self) -> Image.Image:
+        file, ext = os.path.splitext(self.file_name)
+        try:
+            if ext == ".zip":
+                with zipfile.ZipFile(self.open(), 'r') as zip:
+                    return readZipImg(zip, file + ".png")
+            else:
+                return Image.open(self.open()).convert("RGBA")
+        except zipfile.BadZipfile as e:
+            raise SpriteVerifyError(str(e))
+
+    def getFile(self, asset_type):
+        file, ext = os.path.splitext(self.file_name)
+        if ext == ".zip" and asset_type == "portrait":
+            try:
+                with zipfile.ZipFile(self.open(), 'r') as zip:
+                    verifyZipFile(zip, file + ".png")
+                    return BytesIO(zip.read(file + ".png")), file + ".png"
+            except zipfile.BadZipfile as e:
+                raise SpriteVerifyError(str(e))
+        return self.open(), self.file_name
+
+async def getLinkBuffer(url, size_limit=ZIP_SIZE_LIMIT) -> SubmissionBuffer:
     clean_url = sanitizeLink(url)
     _, file = os.path.split(clean_url)
-    req = urllib.request.Request(url, None, RETRIEVE_HEADERS)
-
-    with urllib.request.urlopen(req) as response:
-        file_data = BytesIO()
-        file_data.write(response.read())
-        file_data.seek(0)
-        return file_data, file
+    return SubmissionBuffer(await readLink(url, size_limit), file)
 
-def getLinkImg(url):
-    clean_url = sanitizeLink(url)
-    full_path, ext = os.path.splitext(clean_url)
-    unzip = ext == ".zip"
-    _, file = os.path.split(full_path)
-    req = urllib.request.Request(url, None, RETRIEVE_HEADERS)
-    try:
-        with urllib.request.urlopen(req) as response:
-            if unzip:
-                zip_data = BytesIO()
-                zip_data.write(response.read())
-                zip_data.seek(0)
-                with zipfile.ZipFile(zip_data, 'r') as zip:
-                    img = readZipImg(zip, file + ".png")
-            else:
-                img = Image.open(response).convert("RGBA")
-    except zipfile.BadZipfile as e:
-        raise SpriteVerifyError(str(e))
+async def getLinkData(url, size_limit=ZIP_SIZE_LIMIT):
+    link_buffer = await getLinkBuffer(url, size_limit)
+    return link_buffer.open(), link_buffer.file_name
 
-    return img
+async def getLinkImg(url):
+    return (await getLinkBuffer(url)).getImg()
 
 def getCombinedZipImg(zip_data):
-    with zipfile.ZipFile(zip_data, 'r') as shiny_zip:
-        combinedImg, _ = getCombinedImg(shiny_zip, True)
-        return combinedImg
+    combinedImg, _ = getCombinedImg(DecodedSprite(zip_data), True)
+    return combinedImg
 
 def verifyZipFile(zip, file_name):
     try:
@@ -269,82 +345,87 @@ def verifyZipFile(zip, file_name):
         raise SpriteVerifyError("Zipped file {0} is too large, at {1} bytes.".format(file_name, info.file_size))
 
 def readZipImg(zip, file_name: str) -> Image.Image:
+    # the size is checked before anything is decompressed
     verifyZipFile(zip, file_name)
+    return Image.open(BytesIO(zip.read(file_name))).convert("RGBA")
 
-    file_data = BytesIO()
-    file_data.write(zip.read(file_name))
-    file_data.seek(0)
-    return Image.open(file_data).convert("RGBA")
-
-def getLinkZipGroup(url):
-    clean_url = sanitizeLink(url)
-    full_path, ext = os.path.splitext(clean_url)
-    _, file = os.path.split(full_path)
-    req = urllib.request.Request(url, None, RETRIEVE_HEADERS)
-    zip_data = BytesIO()
-    with urllib.request.urlopen(req) as response:
-        zip_data.write(response.read())
-    zip_data.seek(0)
-
-    return zip_data
-
-def testLinkFile(url):
-    req = urllib.request.Request(url, None, RETRIEVE_HEADERS)
+class DecodedSprite:
+    """
+    A sprite zip that keeps everything read out of it, so that the checks and previews of one submission
+    decompress and decode each file at most once.
+    """
+    def __init__(self, zip_data):
+        try:
+            self.zip = zipfile.ZipFile(zip_data, 'r')
+        except zipfile.BadZipfile as e:
+            raise SpriteVerifyError(str(e))
+        self.name_list = self.zip.namelist()
+        self.xml_data: Optional[bytes] = None
+        self.stats: Optional[Tuple[int, Dict[str, int], Dict[int, AnimStat]]] = None
+        self.imgs: Dict[str, Image.Image] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+
+    def getXml(self) -> bytes:
+        if self.xml_data is None:
+            verifyZipFile(self.zip, Constants.MULTI_SHEET_XML)
+            try:
+                self.xml_data = self.zip.read(Constants.MULTI_SHEET_XML)
+            except zipfile.BadZipfile as e:
+                raise SpriteVerifyError(str(e))
+        return self.xml_data
+
+    def getStats(self) -> Tuple[int, Dict[str, int], Dict[int, AnimStat]]:
+        if self.stats is None:
+            self.stats = getStatsFromTree(BytesIO(self.getXml()))
+        return self.stats
+
+    def getImg(self, file_name: str) -> Image.Image:
+        """
+        The decoded image is shared by all callers, and must not be modified.
+        """
+        if file_name not in self.imgs:
+            try:
+                self.imgs[file_name] = readZipImg(self.zip, file_name)
+            except zipfile.BadZipfile as e:
+                raise SpriteVerifyError(str(e))
+        return self.imgs[file_name]
+
+    def getArray(self, file_name: str) -> np.ndarray:
+        if file_name not in self.arrays:
+            self.arrays[file_name] = exUtils.getImgArray(self.getImg(file_name))
+        return self.arrays[file_name]
+
+async def getLinkZipGroup(url):
+    return (await getLinkBuffer(url)).open()
+
+async def testLinkFile(url):
     try:
-        with urllib.request.urlopen(req) as response:
-            return True
+        async with getHttpSession().head(url) as response:
+            return response.status < 400
     except:
         return False
 
-def getSocialMediaImage(chosen_link, asset_type, file_name = "Idle"):
-    base_file, base_name = getLinkFile(chosen_link, asset_type)
+def getSocialMediaImage(base_file, asset_type, file_name = "Idle"):
     if asset_type == "sprite":
         base_file = animateFileZip(base_file, file_name)
     elif asset_type == "portrait":
         base_file = thumbnailFileImg(base_file)
     return base_file
 
-def getLinkFile(url, asset_type):
-    clean_url = sanitizeLink(url)
-    full_path, ext = os.path.splitext(clean_url)
-    unzip = ext == ".zip" and asset_type == "portrait"
-    _, file = os.path.split(full_path)
-    output_file = file + ext
+async def getLinkFile(url, asset_type):
+    return (await getLinkBuffer(url)).getFile(asset_type)
 
-    req = urllib.request.Request(url, None, RETRIEVE_HEADERS)
-    file_data = BytesIO()
-    try:
-        with urllib.request.urlopen(req) as response:
-            if unzip:
-                zip_data = BytesIO()
-                zip_data.write(response.read())
-                zip_data.seek(0)
-                with zipfile.ZipFile(zip_data, 'r') as zip:
-                    file_data.write(zip.read(file + ".png"))
-                    output_file = file + ".png"
-            else:
-                file_data.write(response.read())
-    except KeyError as e:
-        raise SpriteVerifyError(str(e))
-    except zipfile.BadZipfile as e:
-        raise SpriteVerifyError(str(e))
-
-    file_data.seek(0)
-    return file_data, output_file
-
-def downloadFromUrl(path, sprite_link):
+async def downloadFromUrl(path, sprite_link):
     if sprite_link == '':
         return
     file_name = os.path.join(path, sprite_link.split('/')[-1])
     print("Downloading from " + sprite_link)
-    request = urllib.request.Request(sprite_link, None, RETRIEVE_HEADERS)
-    with urllib.request.urlopen(request) as response:
+    async with getHttpSession().get(sprite_link, raise_for_status=True) as response:
         print("Saving to " + file_name)
         with open(file_name, 'wb') as out_file:
-            shutil.copyfileobj(response, out_file)
-    time.sleep(0.5)
-
-
+            async for chunk in response.content.iter_chunked(65536):
+                out_file.write(chunk)
+    await asyncio.sleep(0.5)
 
 def getStatsFromTree(file_data):
     tree = ET.parse(file_data)
@@ -429,10 +510,13 @@ def generateFileData(path, asset_type, recolor):
     if asset_type == "portrait":
         if recolor:
             portraitImg = preparePortraitRecolor(path)
+            fileData = BytesIO()
+            portraitImg.save(fileData, format='PNG')
         else:
-            portraitImg = preparePortraitImage(path)
-        fileData = BytesIO()
-        portraitImg.save(fileData, format='PNG')
+            sheet_data = getPortraitSheetData(path)
+            if sheet_data is None:
+                raise Exception("No portraits found in {0}.".format(path))
+            fileData = BytesIO(sheet_data)
         return fileData, ".png"
     elif asset_type == "sprite":
         if recolor:
@@ -451,30 +535,21 @@ File verification
 
 def compareSpriteRecolorDiff(orig_anim_img, shiny_anim_img, anim_name,
                              trans_diff, black_diff, orig_palette, shiny_palette):
-    orig_data = orig_anim_img.getdata()
-    shiny_data = shiny_anim_img.getdata()
-    for yy in range(orig_data.size[1]):
-        for xx in range(orig_data.size[0]):
-            orig_color = orig_data[yy * orig_data.size[0] + xx]
-            shiny_color = shiny_data[yy * orig_data.size[0] + xx]
-            # test against transparency, black pixel changes
-            if orig_color[3] != shiny_color[3]:
-                if anim_name not in trans_diff:
-                    trans_diff[anim_name] = []
-                trans_diff[anim_name].append((xx, yy))
-            if (orig_color == (0, 0, 0, 255)) != (shiny_color == (0, 0, 0, 255)):
-                if anim_name not in black_diff:
-                    black_diff[anim_name] = []
-                black_diff[anim_name].append((xx, yy))
-            # compile palette
-            if orig_color[3] == 255:
-                if orig_color not in orig_palette:
-                    orig_palette[orig_color] = 0
-                orig_palette[orig_color] += 1
-            if shiny_color[3] == 255:
-                if shiny_color not in shiny_palette:
-                    shiny_palette[shiny_color] = 0
-                shiny_palette[shiny_color] += 1
+    """
+    Stores masks of the pixels that changed transparency or black lineart, if any did, and compiles both palettes.
+    """
+    orig_arr = exUtils.getImgArray(orig_anim_img)
+    shiny_arr = exUtils.getImgArray(shiny_anim_img)
+    # test against transparency, black pixel changes
+    alpha_changed = orig_arr[:, :, 3] != shiny_arr[:, :, 3]
+    if alpha_changed.any():
+        trans_diff[anim_name] = alpha_changed
+    black_changed = np.all(orig_arr == (0, 0, 0, 255), axis=2) != np.all(shiny_arr == (0, 0, 0, 255), axis=2)
+    if black_changed.any():
+        black_diff[anim_name] = black_changed
+    # compile palette
+    exUtils.addArrayToPalette(orig_palette, orig_arr)
+    exUtils.addArrayToPalette(shiny_palette, shiny_arr)
 
 def verifySpriteRecolor(msg_args, precolor_zip, wan_zip, recolor, checkSilhouette):
     warnings = []
@@ -493,75 +568,57 @@ def verifySpriteRecolor(msg_args, precolor_zip, wan_zip, recolor, checkSilhouett
         compareSpriteRecolorDiff(precolor_zip, wan_zip, "sheet",
                                  trans_diff, black_diff, orig_palette, shiny_palette)
     else:
-        try:
-            with zipfile.ZipFile(precolor_zip, 'r') as zip:
-                with zipfile.ZipFile(wan_zip, 'r') as shiny_zip:
-                    name_list = zip.namelist()
-                    shiny_name_list = shiny_zip.namelist()
-                    if name_list != shiny_name_list:
-                        name_set = set(name_list)
-                        shiny_name_set = set(shiny_name_list)
-                        missing_shiny = name_set - shiny_name_set
-                        missing_orig = shiny_name_set - name_set
-                        report = ""
-                        if len(missing_shiny) > 0:
-                            report += "\nFiles missing: {0}".format(missing_shiny)
-                        if len(missing_orig) > 0:
-                            report += "\nFiles extra: {0}".format(missing_orig)
-                        if len(report) > 0:
-                            raise SpriteVerifyError("File list of recolor does not match original.{0}".format(report))
-
-                    bin_diff = []
-                    for shiny_name in shiny_name_list:
-                        if shiny_name == Constants.MULTI_SHEET_XML:
-                            verifyZipFile(shiny_zip, shiny_name)
-                            orig_anim_data = zip.read(shiny_name)
-                            shiny_anim_data = shiny_zip.read(shiny_name)
-                            if orig_anim_data != shiny_anim_data:
-                                bin_diff.append(shiny_name)
-                        elif not shiny_name.endswith("-Anim.png"):
-                            orig_anim_data = readZipImg(zip, shiny_name) # type: ignore
-                            shiny_anim_data = readZipImg(shiny_zip, shiny_name) # type: ignore
-                            if not exUtils.imgsEqual(orig_anim_data, shiny_anim_data):
-                                bin_diff.append(shiny_name)
-
-                    if len(bin_diff) > 0:
-                        raise SpriteVerifyError("The files below must remain identical to those of the original sprite."
-                                                "  Please copy them from the original zip:\n{0}".format(", ".join(bin_diff)[:1900]))
-
-                    for shiny_name in shiny_name_list:
-                        if shiny_name.endswith("-Anim.png"):
-                            anim_name = shiny_name.replace('-Anim.png', '')
-                            verifyZipFile(shiny_zip, shiny_name)
-                            orig_anim_img = readZipImg(zip, shiny_name)
-                            shiny_anim_img = readZipImg(shiny_zip, shiny_name)
-                            if orig_anim_img.size != shiny_anim_img.size:
-                                raise SpriteVerifyError(
-                                    "Anim {0} has a size {1}x{2} that is different"
-                                    " from the original's size of {3}x{4}".format(shiny_name, shiny_anim_img.size[0],
-                                                                                  shiny_anim_img.size[1],
-                                                                                  orig_anim_img.size[0],
-                                                                                  orig_anim_img.size[1]))
-                            compareSpriteRecolorDiff(orig_anim_img, shiny_anim_img, anim_name,
-                                                     trans_diff, black_diff, orig_palette, shiny_palette)
-
-        except zipfile.BadZipfile as e:
-            raise SpriteVerifyError(str(e))
+        name_list = precolor_zip.name_list
+        shiny_name_list = wan_zip.name_list
+        if name_list != shiny_name_list:
+            name_set = set(name_list)
+            shiny_name_set = set(shiny_name_list)
+            missing_shiny = name_set - shiny_name_set
+            missing_orig = shiny_name_set - name_set
+            report = ""
+            if len(missing_shiny) > 0:
+                report += "\nFiles missing: {0}".format(missing_shiny)
+            if len(missing_orig) > 0:
+                report += "\nFiles extra: {0}".format(missing_orig)
+            if len(report) > 0:
+                raise SpriteVerifyError("File list of recolor does not match original.{0}".format(report))
+
+        bin_diff = []
+        for shiny_name in shiny_name_list:
+            if shiny_name == Constants.MULTI_SHEET_XML:
+                if precolor_zip.getXml() != wan_zip.getXml():
+                    bin_diff.append(shiny_name)
+            elif not shiny_name.endswith("-Anim.png"):
+                if not exUtils.imgsEqual(precolor_zip.getImg(shiny_name), wan_zip.getImg(shiny_name)):
+                    bin_diff.append(shiny_name)
+
+        if len(bin_diff) > 0:
+            raise SpriteVerifyError("The files below must remain identical to those of the original sprite."
+                                    "  Please copy them from the original zip:\n{0}".format(", ".join(bin_diff)[:1900]))
+
+        for shiny_name in shiny_name_list:
+            if shiny_name.endswith("-Anim.png"):
+                anim_name = shiny_name.replace('-Anim.png', '')
+                shiny_anim_img = wan_zip.getImg(shiny_name)
+                orig_anim_img = precolor_zip.getImg(shiny_name)
+                if orig_anim_img.size != shiny_anim_img.size:
+                    raise SpriteVerifyError(
+                        "Anim {0} has a size {1}x{2} that is different"
+                        " from the original's size of {3}x{4}".format(shiny_name, shiny_anim_img.size[0],
+                                                                      shiny_anim_img.size[1],
+                                                                      orig_anim_img.size[0],
+                                                                      orig_anim_img.size[1]))
+                compareSpriteRecolorDiff(orig_anim_img, shiny_anim_img, anim_name,
+                                         trans_diff, black_diff, orig_palette, shiny_palette)
 
     if checkSilhouette and len(trans_diff) > 0:
-        px_strings = []
-        for anim_name in trans_diff:
-            px_strings.append(anim_name + ": " + ", ".join([str(a) for a in trans_diff[anim_name]]))
         raise SpriteVerifyError("Some pixels were found to have changed transparency:\n{0}".format(
-            "\n".join(px_strings)[:1900]))
+            getPixelDiffReport(trans_diff, 1900)))
 
     if len(black_diff) > 0:
         if not msg_args.lineart:
-            px_strings = []
-            for anim_name in black_diff:
-                px_strings.append(anim_name + ": " + ", ".join([str(a) for a in black_diff[anim_name]]))
             raise SpriteVerifyError("Some pixels were found to have changed from black to another color:\n{0}\nIf this was intended (very rare!), resubmit and include `--lineart` in the message.".format(
-                "\n".join(px_strings)[:1800]))
+                getPixelDiffReport(black_diff, 1800)))
 
     if len(orig_palette) != len(shiny_palette):
         palette_diff = len(shiny_palette) - len(orig_palette)
@@ -576,8 +633,7 @@ def verifySpriteRecolor(msg_args, precolor_zip, wan_zip, recolor, checkSilhouett
             if recolor:
                 combinedImg = wan_zip
             else:
-                with zipfile.ZipFile(wan_zip, 'r') as shiny_zip:
-                    combinedImg, _ = getCombinedImg(shiny_zip, True)
+                combinedImg, _ = getCombinedImg(wan_zip, True)
             reduced_img = simple_quant(combinedImg, 16)
             reduced_img = insertPalette(reduced_img)
             raise SpriteVerifyError("The sprite has {0} non-transparent colors with only 15 allowed.\n"
@@ -594,35 +650,27 @@ def verifyPortraitRecolor(msg_args, orig_img, img, recolor):
         orig_img = removePalette(orig_img)
         img = removePalette(img)
 
-    tileDiff = []
-    partialPixDiff = []
-    for xt in range(Constants.PORTRAIT_TILE_X):
-        for yt in range(Constants.PORTRAIT_TILE_Y):
-            xx = xt * Constants.PORTRAIT_SIZE
-            yy = yt * Constants.PORTRAIT_SIZE
-            if xx < orig_img.size[0] and yy < orig_img.size[1]:
-                orig_crop = orig_img.crop((xx, yy, xx + Constants.PORTRAIT_SIZE, yy + Constants.PORTRAIT_SIZE))
-            else:
-                orig_crop = Image.new('RGBA', (Constants.PORTRAIT_SIZE, Constants.PORTRAIT_SIZE), (0, 0, 0, 0))
-
-            if xx < img.size[0] and yy < img.size[1]:
-                img_crop = img.crop((xx, yy, xx + Constants.PORTRAIT_SIZE, yy + Constants.PORTRAIT_SIZE))
-            else:
-                img_crop = Image.new('RGBA', (Constants.PORTRAIT_SIZE, Constants.PORTRAIT_SIZE), (0, 0, 0, 0))
-
-            pixDiff = comparePixels(orig_crop, img_crop)
-            if len(pixDiff) == Constants.PORTRAIT_SIZE * Constants.PORTRAIT_SIZE:
-                # full tile missing or added
-                tileDiff.append((xt, yt))
-            elif len(pixDiff) > 0:
-                for px, py in pixDiff:
-                    partialPixDiff.append((xx + px, yy + py))
-
-
-    if recolor:
-        partialPixDiff = [xyPlusOne(x) for x in partialPixDiff]
-
-    if len(partialPixDiff) > 0:
+    # opacity changes over the whole sheet, as a (tiles_x, tiles_y, size, size) view
+    size = Constants.PORTRAIT_SIZE
+    sheet_size = (Constants.PORTRAIT_TILE_X * size, Constants.PORTRAIT_TILE_Y * size)
+    alpha_changed = np.zeros((sheet_size[1], sheet_size[0]), dtype=bool)
+    orig_alpha = exUtils.getImgArray(orig_img)[:sheet_size[1], :sheet_size[0], 3]
+    alpha = exUtils.getImgArray(img)[:sheet_size[1], :sheet_size[0], 3]
+    alpha_changed[:alpha.shape[0], :alpha.shape[1]] = orig_alpha != alpha
+    tile_changed = alpha_changed.reshape(Constants.PORTRAIT_TILE_Y, size, Constants.PORTRAIT_TILE_X, size).transpose(2, 0, 1, 3)
+    changed_counts = np.count_nonzero(tile_changed, axis=(2, 3))
+
+    # full tile missing or added
+    tileDiff = [(int(xt), int(yt)) for xt, yt in zip(*np.nonzero(changed_counts == size * size))]
+    partial_tiles = (changed_counts > 0) & (changed_counts < size * size)
+
+    if partial_tiles.any():
+        # every pixel takes at least 8 characters, so the rest would be truncated away
+        max_pixels = 1000 // 8 + 1
+        xts, yts, pys, pxs = [a[:max_pixels] for a in np.nonzero(tile_changed & partial_tiles[:, :, np.newaxis, np.newaxis])]
+        partialPixDiff = list(zip((xts * size + pxs).tolist(), (yts * size + pys).tolist()))
+        if recolor:
+            partialPixDiff = [xyPlusOne(x) for x in partialPixDiff]
         raise SpriteVerifyError("Recolor has differing opacity at pixels:\n {0}".format(str(partialPixDiff)[:1000]))
     if len(tileDiff) > 0:
         if not msg_args.lineart:
@@ -648,33 +696,56 @@ def verifyPortraitRecolor(msg_args, orig_img, img, recolor):
 
     return warnings
 
-def getPortraitOverpalette(img):
-    palette_counts = {}
-    in_data = img.getdata()
-    img_tile_size = (img.size[0] // Constants.PORTRAIT_SIZE, img.size[1] // Constants.PORTRAIT_SIZE)
-    for xx in range(Constants.PORTRAIT_TILE_X):
-        for yy in range(Constants.PORTRAIT_TILE_Y):
-            if xx >= img_tile_size[0] or yy >= img_tile_size[1]:
-                continue
-            first_pos = (xx * Constants.PORTRAIT_SIZE, yy * Constants.PORTRAIT_SIZE)
-            first_pixel = in_data[first_pos[1] * img.size[0] + first_pos[0]]
-            if first_pixel[3] == 0:
-                continue
-
-            palette = {}
-            for mx in range(Constants.PORTRAIT_SIZE):
-                for my in range(Constants.PORTRAIT_SIZE):
-                    cur_pos = (first_pos[0] + mx, first_pos[1] + my)
-                    cur_pixel = in_data[cur_pos[1] * img.size[0] + cur_pos[0]]
-                    palette[cur_pixel] = True
-            palette_counts[(xx, yy)] = len(palette)
-
-    overpalette = { }
-    for emote_loc in palette_counts:
-        if palette_counts[emote_loc] > 15:
-            overpalette[emote_loc] = palette_counts[emote_loc]
+class PortraitTiles:
+    """
+    Analysis of every tile of a portrait sheet, done in one pass over the whole sheet.
+    Tiles are listed by (x, y), column by column, and scanned column by column within, like the checks always have.
+    """
+    def __init__(self, img):
+        size = Constants.PORTRAIT_SIZE
+        tiles_x = min(img.size[0] // size, Constants.PORTRAIT_TILE_X)
+        tiles_y = min(img.size[1] // size, Constants.PORTRAIT_TILE_Y)
+        arr = exUtils.getImgArray(img)[:tiles_y * size, :tiles_x * size]
+
+        # (tiles_y, tiles_x, size, size, 4) view of the sheet, turned into (tiles_x, tiles_y, pixels) in scan order
+        tiles = arr.reshape(tiles_y, size, tiles_x, size, 4).swapaxes(1, 2)
+        scan = tiles.transpose(1, 0, 3, 2, 4).reshape(tiles_x, tiles_y, size * size, 4)
+        alpha = scan[:, :, :, 3]
+        occupied = alpha > 0
+
+        # whether each tile starts out filled
+        self.occupied = occupied[:, :, 0]
+        # tiles with both filled and transparent pixels, and how far their scan got before finding the first mismatch
+        mismatch = occupied != occupied[:, :, :1]
+        is_rogue = mismatch.any(axis=2)
+        scan_end = np.where(is_rogue, mismatch.argmax(axis=2) + 1, size * size)
+        self.rogue_tiles = [(int(xx), int(yy)) for xx, yy in zip(*np.nonzero(is_rogue))]
+
+        # semi-transparent pixels within each tile's scan
+        semi = occupied & (alpha < 255) & (np.arange(size * size) < scan_end[:, :, np.newaxis])
+        tile_xs, tile_ys, pixel_idx = np.nonzero(semi)
+        self.rogue_pixels = list(zip((tile_xs * size + pixel_idx // size).tolist(), (tile_ys * size + pixel_idx % size).tolist()))
+
+        # distinct colors in each whole tile
+        colors = np.sort(exUtils.getPackedColors(scan), axis=2)
+        self.color_counts = 1 + np.count_nonzero(colors[:, :, 1:] != colors[:, :, :-1], axis=2)
+
+    def getOverpalette(self, include_empty=False):
+        """
+        Returns the tiles with over 15 colors and their color counts.
+        Tiles that start out transparent are skipped unless include_empty is set.
+        """
+        overpalette = { }
+        for xx in range(self.color_counts.shape[0]):
+            for yy in range(self.color_counts.shape[1]):
+                if not include_empty and not self.occupied[xx, yy]:
+                    continue
+                if self.color_counts[xx, yy] > 15:
+                    overpalette[(xx, yy)] = int(self.color_counts[xx, yy])
+        return overpalette
 
-    return overpalette
+def getPortraitOverpalette(img):
+    return PortraitTiles(img).getOverpalette()
 
 
 def getEmotionFromTilePos(tile_pos):
@@ -690,386 +761,383 @@ def getLRSwappedOffset(offset):
 
 def mapDuplicateImportImgs(imgs, final_imgs, img_map, offset_diffs):
     map_back = {} # type: ignore
+    # final images are unique, so each frame can match at most one of them as-is and one of them flipped
+    final_lookup = {}
+    for final_idx, final_img in enumerate(final_imgs):
+        final_lookup[exUtils.getImgKey(final_img[0])] = final_idx
     for idx, img in enumerate(imgs):
         dupe = False
         flip = -1
-        for final_idx, final_img in enumerate(final_imgs):
-            imgs_equal = exUtils.imgsEqual(final_img[0], img[0])
+        equal_idx = final_lookup.get(exUtils.getImgKey(img[0]), len(final_imgs))
+        flip_idx = final_lookup.get(exUtils.getImgKey(img[0], True), len(final_imgs))
+        # a flipped match only counts if it comes before the exact match
+        if flip_idx < equal_idx:
+            offsets_flip = exUtils.offsetsEqual(final_imgs[flip_idx][1], img[1], img[0].size[0], True)
+            offsets_flip |= exUtils.offsetsEqual(final_imgs[flip_idx][1], getLRSwappedOffset(img[1]), img[0].size[0], True)
+            if not offsets_flip:
+                earlier_idx = map_back[flip_idx]
+                if earlier_idx not in offset_diffs:
+                    offset_diffs[earlier_idx] = []
+                offset_diffs[earlier_idx].append(idx)
+            flip = flip_idx
+        if equal_idx < len(final_imgs):
             # if offsets are not synchronized, they are counted as different
-            if imgs_equal:
-                offsets_equal = exUtils.offsetsEqual(final_img[1], img[1], img[0].size[0])
-                offsets_equal |= exUtils.offsetsEqual(final_img[1], getLRSwappedOffset(img[1]), img[0].size[0])
-                if not offsets_equal:
-                    earlier_idx = map_back[final_idx]
-                    if earlier_idx not in offset_diffs:
-                        offset_diffs[earlier_idx] = []
-                    offset_diffs[earlier_idx].append(idx)
-            if imgs_equal:
-                img_map[idx] = (final_idx, (0, 0))
-                dupe = True
-                break
-            imgs_flip = exUtils.imgsEqual(final_img[0], img[0], True)
-            if imgs_flip:
-                offsets_flip = exUtils.offsetsEqual(final_img[1], img[1], img[0].size[0], True)
-                offsets_flip |= exUtils.offsetsEqual(final_img[1], getLRSwappedOffset(img[1]), img[0].size[0], True)
-                if not offsets_flip:
-                    earlier_idx = map_back[final_idx]
-                    if earlier_idx not in offset_diffs:
-                        offset_diffs[earlier_idx] = []
-                    offset_diffs[earlier_idx].append(idx)
-            if imgs_flip:
-                flip = final_idx
+            offsets_equal = exUtils.offsetsEqual(final_imgs[equal_idx][1], img[1], img[0].size[0])
+            offsets_equal |= exUtils.offsetsEqual(final_imgs[equal_idx][1], getLRSwappedOffset(img[1]), img[0].size[0])
+            if not offsets_equal:
+                earlier_idx = map_back[equal_idx]
+                if earlier_idx not in offset_diffs:
+                    offset_diffs[earlier_idx] = []
+                offset_diffs[earlier_idx].append(idx)
+            img_map[idx] = (equal_idx, (0, 0))
+            dupe = True
 
         if not dupe:
             img_map[idx] = (len(final_imgs), (0, 0))
             map_back[len(final_imgs)] = idx
+            final_lookup[exUtils.getImgKey(img[0])] = len(final_imgs)
             final_imgs.append((img[0], img[1], img[2], flip))
 
 
 def verifySprite(msg_args, wan_zip):
     frames = []
-    palette = {}
+    palette: Dict[Tuple[int, int, int, int], int] = {}
     frameToSequence = []
     rogue_pixels = []
-    try:
-        with zipfile.ZipFile(wan_zip, 'r') as zip:
-            name_list = zip.namelist()
-            if Constants.MULTI_SHEET_XML not in name_list:
-                raise SpriteVerifyError("No {0} found.".format(Constants.MULTI_SHEET_XML))
-            verifyZipFile(zip, Constants.MULTI_SHEET_XML)
+    name_list = wan_zip.name_list
+    if Constants.MULTI_SHEET_XML not in name_list:
+        raise SpriteVerifyError("No {0} found.".format(Constants.MULTI_SHEET_XML))
+
+    sdw_size, anim_names, anim_stats = wan_zip.getStats()
+
+    for name in name_list:
+        if name.endswith('.png'):
+            anim_name = name.split('-')[0].lower()
+            if anim_name not in anim_names:
+                raise SpriteVerifyError("Unexpected Anim file: {0}".format(name))
+        elif name.endswith('.xml'):
+            pass
+        else:
+            raise SpriteVerifyError("Unexpected File {0}".format(name))
+
+    # verify internal indices 1-13 exist?
+    missing_anims = []
+    for idx in Constants.COMPLETION_ACTIONS[0]:
+        if Constants.ACTIONS[idx].lower() not in anim_names:
+            missing_anims.append(Constants.ACTIONS[idx])
+    if len(missing_anims) > 0:
+        raise SpriteVerifyError("Missing required anims:\n{0}".format(', '.join(missing_anims)))
+    violated_idx = []
+    for idx in Constants.ACTION_MAP:
+        if idx in anim_stats:
+            anim_stat = anim_stats[idx]
+            if anim_stat.name != Constants.ACTION_MAP[idx]:
+                violated_idx.append(Constants.ACTION_MAP[idx] + ' -> ' + str(idx))
+    if len(violated_idx) > 0:
+        raise SpriteVerifyError("Some anims are required to have specific indices:\n{0}".format('\n'.join(violated_idx)))
+
+    for anim_idx in anim_stats:
+        anim_stat = anim_stats[anim_idx]
+        if anim_stat.backref is not None:
+            continue
+        anim_name = anim_stat.name
+        anim_png_name = anim_name + "-Anim.png"
+        offset_png_name = anim_name + "-Offsets.png"
+        shadow_png_name = anim_name + "-Shadow.png"
+        if anim_png_name not in name_list:
+            raise SpriteVerifyError("Anim specified in XML has no Anim.png: {0}".format(anim_name))
+        if offset_png_name not in name_list:
+            raise SpriteVerifyError("Anim specified in XML has no Offsets.png: {0}".format(anim_name))
+        if shadow_png_name not in name_list:
+            raise SpriteVerifyError("Anim specified in XML has no Shadow.png: {0}".format(anim_name))
 
-            file_data = BytesIO()
-            file_data.write(zip.read(Constants.MULTI_SHEET_XML))
-            file_data.seek(0)
-
-            sdw_size, anim_names, anim_stats = getStatsFromTree(file_data)
-
-            for name in name_list:
-                if name.endswith('.png'):
-                    anim_name = name.split('-')[0].lower()
-                    if anim_name not in anim_names:
-                        raise SpriteVerifyError("Unexpected Anim file: {0}".format(name))
-                elif name.endswith('.xml'):
-                    pass
-                else:
-                    raise SpriteVerifyError("Unexpected File {0}".format(name))
-
-            # verify internal indices 1-13 exist?
-            missing_anims = []
-            for idx in Constants.COMPLETION_ACTIONS[0]:
-                if Constants.ACTIONS[idx].lower() not in anim_names:
-                    missing_anims.append(Constants.ACTIONS[idx])
-            if len(missing_anims) > 0:
-                raise SpriteVerifyError("Missing required anims:\n{0}".format(', '.join(missing_anims)))
-            violated_idx = []
-            for idx in Constants.ACTION_MAP:
-                if idx in anim_stats:
-                    anim_stat = anim_stats[idx]
-                    if anim_stat.name != Constants.ACTION_MAP[idx]:
-                        violated_idx.append(Constants.ACTION_MAP[idx] + ' -> ' + str(idx))
-            if len(violated_idx) > 0:
-                raise SpriteVerifyError("Some anims are required to have specific indices:\n{0}".format('\n'.join(violated_idx)))
-
-            for anim_idx in anim_stats:
-                anim_stat = anim_stats[anim_idx]
-                if anim_stat.backref is not None:
+        anim_img = wan_zip.getImg(anim_png_name)
+        offset_img = wan_zip.getImg(offset_png_name)
+        shadow_img = wan_zip.getImg(shadow_png_name)
+
+        tileSize = anim_stat.size
+        durations = anim_stat.durations
+
+        # check against inconsistent sizing
+        if anim_img.size != offset_img.size or anim_img.size != shadow_img.size:
+            raise SpriteVerifyError("Anim, Offset, and Shadow sheets for {0} must be the same size!".format(anim_name))
+
+        if anim_img.size[0] % tileSize[0] != 0 or anim_img.size[1] % tileSize[1] != 0:
+            raise SpriteVerifyError("Sheet for {4} is {0}x{1} pixels and is not divisible by {2}x{3} in xml!".format(
+                anim_img.size[0], anim_img.size[1], tileSize[0], tileSize[1], anim_name))
+
+        total_frames = anim_img.size[0] // tileSize[0]
+        total_dirs = anim_img.size[1] // tileSize[1]
+        if total_dirs != 1 and total_dirs != 8:
+            raise SpriteVerifyError("Sheet for {0} must be one-directional or 8-directional!".format(anim_name))
+        # check against inconsistent duration counts
+        if total_frames != len(durations):
+            raise SpriteVerifyError("Number of frames in {0} does not match count of durations ({1}) specified in xml!".format(anim_name, len(durations)))
+
+        if anim_stat.rushFrame >= len(durations):
+            raise SpriteVerifyError("RushFrame of {0} is greater than the number of frames ({1}) in {2}!".format(anim_stat.rushFrame, len(durations), anim_name))
+        if anim_stat.hitFrame >= len(durations):
+            raise SpriteVerifyError("HitFrame of {0} is greater than the number of frames ({1}) in {2}!".format(anim_stat.hitFrame, len(durations), anim_name))
+        if anim_stat.returnFrame >= len(durations):
+            raise SpriteVerifyError("ReturnFrame of {0} is greater than the number of frames ({1}) in {2}!".format(anim_stat.returnFrame, len(durations), anim_name))
+
+        anim_arr = wan_zip.getArray(anim_png_name)
+        offset_arr = wan_zip.getArray(offset_png_name)
+        shadow_arr = wan_zip.getArray(shadow_png_name)
+
+        rogue_pixels += exUtils.getRoguePixels(anim_arr)
+        exUtils.addArrayToPalette(palette, anim_arr)
+
+        anim_bounds = exUtils.getTileBounds(anim_arr, tileSize)
+        for dir in range(total_dirs):
+            for jj in range(total_frames):
+                rel_center = (tileSize[0] // 2 - DRAW_CENTER_X, tileSize[1] // 2 - DRAW_CENTER_Y)
+                tile_rect = (jj * tileSize[0], dir * tileSize[1], tileSize[0], tileSize[1])
+                tile_bounds = (tile_rect[0], tile_rect[1], tile_rect[0] + tile_rect[2], tile_rect[1] + tile_rect[3])
+                bounds = anim_bounds[dir][jj]
+                emptyBounds = False
+                if bounds[0] >= bounds[2]:
+                    bounds = (rel_center[0], rel_center[1], rel_center[0]+1, rel_center[1]+1)
+                    emptyBounds = True
+                rect = (bounds[0], bounds[1], bounds[2] - bounds[0], bounds[3] - bounds[1])
+                abs_bounds = exUtils.addToBounds(bounds, (tile_rect[0], tile_rect[1]))
+                frame_tex = anim_img.crop(abs_bounds)
+
+                try:
+                    shadow_offset = exUtils.getOffsetFromArray(shadow_arr[tile_bounds[1]:tile_bounds[3], tile_bounds[0]:tile_bounds[2]],
+                                                               tile_bounds, False, False, False, False, True)
+                    frame_offset = exUtils.getOffsetFromArray(offset_arr[tile_bounds[1]:tile_bounds[3], tile_bounds[0]:tile_bounds[2]],
+                                                              tile_bounds, True, True, True, True, False)
+                except exUtils.MultipleOffsetError as e:
+                    raise SpriteVerifyError(e.message + '\n' + str((anim_name, Constants.DIRECTIONS[dir], jj)))
+
+                if emptyBounds and shadow_offset[4] is None and frame_offset[2] is None:
                     continue
-                anim_name = anim_stat.name
-                anim_png_name = anim_name + "-Anim.png"
-                offset_png_name = anim_name + "-Offsets.png"
-                shadow_png_name = anim_name + "-Shadow.png"
-                if anim_png_name not in name_list:
-                    raise SpriteVerifyError("Anim specified in XML has no Anim.png: {0}".format(anim_name))
-                if offset_png_name not in name_list:
-                    raise SpriteVerifyError("Anim specified in XML has no Offsets.png: {0}".format(anim_name))
-                if shadow_png_name not in name_list:
-                    raise SpriteVerifyError("Anim specified in XML has no Shadow.png: {0}".format(anim_name))
-
-                anim_img = readZipImg(zip, anim_png_name)
-                offset_img = readZipImg(zip, offset_png_name)
-                shadow_img = readZipImg(zip, shadow_png_name)
-
-                tileSize = anim_stat.size
-                durations = anim_stat.durations
-
-                # check against inconsistent sizing
-                if anim_img.size != offset_img.size or anim_img.size != shadow_img.size:
-                    raise SpriteVerifyError("Anim, Offset, and Shadow sheets for {0} must be the same size!".format(anim_name))
-
-                if anim_img.size[0] % tileSize[0] != 0 or anim_img.size[1] % tileSize[1] != 0:
-                    raise SpriteVerifyError("Sheet for {4} is {0}x{1} pixels and is not divisible by {2}x{3} in xml!".format(
-                        anim_img.size[0], anim_img.size[1], tileSize[0], tileSize[1], anim_name))
-
-                total_frames = anim_img.size[0] // tileSize[0]
-                total_dirs = anim_img.size[1] // tileSize[1]
-                if total_dirs != 1 and total_dirs != 8:
-                    raise SpriteVerifyError("Sheet for {0} must be one-directional or 8-directional!".format(anim_name))
-                # check against inconsistent duration counts
-                if total_frames != len(durations):
-                    raise SpriteVerifyError("Number of frames in {0} does not match count of durations ({1}) specified in xml!".format(anim_name, len(durations)))
-
-                if anim_stat.rushFrame >= len(durations):
-                    raise SpriteVerifyError("RushFrame of {0} is greater than the number of frames ({1}) in {2}!".format(anim_stat.rushFrame, len(durations), anim_name))
-                if anim_stat.hitFrame >= len(durations):
-                    raise SpriteVerifyError("HitFrame of {0} is greater than the number of frames ({1}) in {2}!".format(anim_stat.hitFrame, len(durations), anim_name))
-                if anim_stat.returnFrame >= len(durations):
-                    raise SpriteVerifyError("ReturnFrame of {0} is greater than the number of frames ({1}) in {2}!".format(anim_stat.returnFrame, len(durations), anim_name))
-
-                datas = anim_img.getdata()
-                for xx in range(anim_img.size[0]):
-                    for yy in range(anim_img.size[1]):
-                        cur_pixel = datas[yy * anim_img.size[0] + xx]
-                        cur_occupied = (cur_pixel[3] > 0)
-                        if cur_occupied:
-                            if cur_pixel[3] < 255:
-                                rogue_pixels.append((xx, yy))
-                            else:
-                                if cur_pixel not in palette:
-                                    palette[cur_pixel] = 0
-                                palette[cur_pixel] += 1
-
-                for dir in range(total_dirs):
-                    for jj in range(total_frames):
-                        rel_center = (tileSize[0] // 2 - DRAW_CENTER_X, tileSize[1] // 2 - DRAW_CENTER_Y)
-                        tile_rect = (jj * tileSize[0], dir * tileSize[1], tileSize[0], tileSize[1])
-                        tile_bounds = (tile_rect[0], tile_rect[1], tile_rect[0] + tile_rect[2], tile_rect[1] + tile_rect[3])
-                        bounds = exUtils.getCoveredBounds(anim_img, tile_bounds)
-                        emptyBounds = False
-                        if bounds[0] >= bounds[2]:
-                            bounds = (rel_center[0], rel_center[1], rel_center[0]+1, rel_center[1]+1)
-                            emptyBounds = True
-                        rect = (bounds[0], bounds[1], bounds[2] - bounds[0], bounds[3] - bounds[1])
-                        abs_bounds = exUtils.addToBounds(bounds, (tile_rect[0], tile_rect[1]))
-                        frame_tex = anim_img.crop(abs_bounds)
-
-                        try:
-                            shadow_offset = exUtils.getOffsetFromRGB(shadow_img, tile_bounds, False, False, False, False, True)
-                            frame_offset = exUtils.getOffsetFromRGB(offset_img, tile_bounds, True, True, True, True, False)
-                        except exUtils.MultipleOffsetError as e:
-                            raise SpriteVerifyError(e.message + '\n' + str((anim_name, Constants.DIRECTIONS[dir], jj)))
-
-                        if emptyBounds and shadow_offset[4] is None and frame_offset[2] is None:
-                            continue
-
-                        offsets = FrameOffset(None, None, None, None)
-                        if frame_offset[2] is None:
-                            # raise warning if there's missing shadow or offsets
-                            raise SpriteVerifyError("No frame offset found in frame {0} for {1}".format((Constants.DIRECTIONS[dir], jj), anim_name))
-                        else:
-                            offsets.center = frame_offset[2]
-                            if frame_offset[0] is None:
-                                offsets.head = frame_offset[2]
-                            else:
-                                offsets.head = frame_offset[0]
-                            offsets.lhand = frame_offset[1]
-                            offsets.rhand = frame_offset[3]
-                        offsets.AddLoc((-rect[0], -rect[1]))
-
-                        shadow = rel_center
-                        if shadow_offset[4] is not None:
-                            shadow = shadow_offset[4]
-                        else:
-                            raise SpriteVerifyError("No shadow offset found in frame {0} for {1}".format((jj, dir), anim_name))
-                        shadow_diff = exUtils.addLoc(shadow, rect, True)
-
-                        frames.append((frame_tex, offsets, shadow_diff))
-                        frameToSequence.append((anim_name, Constants.DIRECTIONS[dir], jj))
-
-        # check for semitransparent pixels
-        if len(rogue_pixels) > 0:
-            raise SpriteVerifyError("Semi-transparent pixels found at: {0}".format(str(rogue_pixels)[:1900]))
-
-        offset_diffs = {} # type: ignore
-        frame_map = [None] * len(frames)
-        final_frames = [] # type: ignore
-        mapDuplicateImportImgs(frames, final_frames, frame_map, offset_diffs)
-        if len(offset_diffs) > 0:
-            if not msg_args.multioffset:
-                offset_diff_names = []
-                for orig_idx in offset_diffs:
-                    offset_group = [frameToSequence[orig_idx]]
-                    for idx in offset_diffs[orig_idx]:
-                        offset_group.append(frameToSequence[idx])
-                    offset_diff_names.append(offset_group)
-
-                raise SpriteVerifyError("Some frames have identical sprites but different offsets.\n"
-                                        "If intended, include `--multioffset` in the message (very rare!)."
-                                        "  Otherwise make these frame offsets consistent (you can use Collapse Offsets):\n{0}".format(str(offset_diff_names)[:1700]))
-
-        # then, check the colors
-        if len(palette) > 15:
-            if msg_args.colors != len(palette):
-                with zipfile.ZipFile(wan_zip, 'r') as zip:
-                    combinedImg, _ = getCombinedImg(zip, True)
-                    reduced_img = simple_quant(combinedImg, 16)
-                raise SpriteVerifyError("The sprite has {0} non-transparent colors with only 15 allowed.\n"
-                                        "If this is acceptable, include `--colors {0}` in the message."
-                                        "  Otherwise reduce colors for the sprite.".format(len(palette)), reduced_img)
-    except zipfile.BadZipfile as e:
-        raise SpriteVerifyError(str(e))
 
-def verifySpriteLock(dict, chosen_path, precolor_zip, wan_zip, recolor):
+                offsets = FrameOffset(None, None, None, None)
+                if frame_offset[2] is None:
+                    # raise warning if there's missing shadow or offsets
+                    raise SpriteVerifyError("No frame offset found in frame {0} for {1}".format((Constants.DIRECTIONS[dir], jj), anim_name))
+                else:
+                    offsets.center = frame_offset[2]
+                    if frame_offset[0] is None:
+                        offsets.head = frame_offset[2]
+                    else:
+                        offsets.head = frame_offset[0]
+                    offsets.lhand = frame_offset[1]
+                    offsets.rhand = frame_offset[3]
+                offsets.AddLoc((-rect[0], -rect[1]))
+
+                shadow = rel_center
+                if shadow_offset[4] is not None:
+                    shadow = shadow_offset[4]
+                else:
+                    raise SpriteVerifyError("No shadow offset found in frame {0} for {1}".format((jj, dir), anim_name))
+                shadow_diff = exUtils.addLoc(shadow, (rect[0], rect[1]), True)
+
+                frames.append((frame_tex, offsets, shadow_diff))
+                frameToSequence.append((anim_name, Constants.DIRECTIONS[dir], jj))
+
+    # check for semitransparent pixels
+    if len(rogue_pixels) > 0:
+        raise SpriteVerifyError("Semi-transparent pixels found at: {0}".format(str(rogue_pixels)[:1900]))
+
+    offset_diffs = {} # type: ignore
+    frame_map = [None] * len(frames)
+    final_frames = [] # type: ignore
+    mapDuplicateImportImgs(frames, final_frames, frame_map, offset_diffs)
+    if len(offset_diffs) > 0:
+        if not msg_args.multioffset:
+            offset_diff_names = []
+            for orig_idx in offset_diffs:
+                offset_group = [frameToSequence[orig_idx]]
+                for idx in offset_diffs[orig_idx]:
+                    offset_group.append(frameToSequence[idx])
+                offset_diff_names.append(offset_group)
+
+            raise SpriteVerifyError("Some frames have identical sprites but different offsets.\n"
+                                    "If intended, include `--multioffset` in the message (very rare!)."
+                                    "  Otherwise make these frame offsets consistent (you can use Collapse Offsets):\n{0}".format(str(offset_diff_names)[:1700]))
+
+    # then, check the colors
+    if len(palette) > 15:
+        if msg_args.colors != len(palette):
+            combinedImg, _ = getCombinedImg(wan_zip, True)
+            reduced_img = simple_quant(combinedImg, 16)
+            raise SpriteVerifyError("The sprite has {0} non-transparent colors with only 15 allowed.\n"
+                                    "If this is acceptable, include `--colors {0}` in the message."
+                                    "  Otherwise reduce colors for the sprite.".format(len(palette)), reduced_img)
+
+def getFileStamp(file_path):
+    file_stat = os.stat(file_path)
+    return [file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino]
+
+def imgMatchesFile(img, file_path, digests):
+    """
+    Checks an image against the png at the path by their pixel digests.
+    digests holds those of the files in the same folder by name.
+    The file is only read if its digest is missing or outdated, and the new one is stored there.
+    """
+    file_name = os.path.basename(file_path)
+    file_stamp = getFileStamp(file_path)
+    file_digest = digests.get(file_name)
+    if file_digest is None or file_digest[:3] != file_stamp:
+        file_img = Image.open(file_path).convert("RGBA")
+        file_digest = file_stamp + [exUtils.getImgDigest(file_img)]
+        digests[file_name] = file_digest
+    return file_digest[3] == exUtils.getImgDigest(img)
+
+def verifySpriteLock(dict, chosen_path, precolor_zip, wan_zip, recolor, digests):
     # make sure all locked sprites are the same as their original counterparts
     changed_files = []
 
-    try:
-        cmp_zip = wan_zip
-        shiny_frames = None
-        frame_mapping = None
-        if recolor:
-            cmp_zip = precolor_zip
-            wan_zip = removePalette(wan_zip)
-
-            if precolor_zip is None:
-                raise Exception("The file was submitted in recolor format, but no base file was supplied.")
-
-            with zipfile.ZipFile(precolor_zip, 'r') as opened_zip:
-                frames, frame_mapping = getFramesAndMappings(opened_zip, True)
-            frame_size = getFrameSizeFromFrames(frames)
-
-            # obtain a mapping from the color image of the shiny path
-            shiny_frames = [] # type: ignore
-            for yy in range(0, wan_zip.size[1], frame_size[1]):
-                for xx in range(0, wan_zip.size[0], frame_size[0]):
-                    tile_bounds = (xx, yy, xx + frame_size[0], yy + frame_size[1])
-                    bounds = exUtils.getCoveredBounds(wan_zip, tile_bounds)
-                    if bounds[0] >= bounds[2]:
-                        bounds = (frame_size[0] // 2, frame_size[1] // 2, frame_size[0] // 2 + 1, frame_size[1] // 2 + 1)
-                        # reached the end of actual frames
-                        if len(shiny_frames) >= len(frames):
-                            continue
-                    abs_bounds = exUtils.addToBounds(bounds, (xx, yy))
-                    frame_tex = wan_zip.crop(abs_bounds)
-                    shiny_frames.append(frame_tex)
-
-        with zipfile.ZipFile(cmp_zip, 'r') as zip:
-            name_list = zip.namelist()
-            if Constants.MULTI_SHEET_XML not in name_list:
-                raise SpriteVerifyError("No {0} found.".format(Constants.MULTI_SHEET_XML))
-            verifyZipFile(zip, Constants.MULTI_SHEET_XML)
+    cmp_zip = wan_zip
+    shiny_frames = None
+    frame_mapping = None
+    if recolor:
+        cmp_zip = precolor_zip
+        wan_zip = removePalette(wan_zip)
 
-            file_data = BytesIO()
-            file_data.write(zip.read(Constants.MULTI_SHEET_XML))
-            file_data.seek(0)
+        if precolor_zip is None:
+            raise Exception("The file was submitted in recolor format, but no base file was supplied.")
 
-            sdw_size, anim_names, anim_stats = getStatsFromTree(file_data)
-            if os.path.exists(os.path.join(chosen_path, Constants.MULTI_SHEET_XML)):
-                sdw_size_cur, anim_names_cur, anim_stats_cur = getStatsFromTree(
-                    os.path.join(chosen_path, Constants.MULTI_SHEET_XML))
-            else:
-                sdw_size_cur = 0
-                anim_names_cur = {}
-                anim_stats_cur = {}
-
-            has_lock = False
-            for anim_name in Constants.ACTIONS:
-                if anim_name in dict.sprite_files and dict.sprite_files[anim_name]:
-                    has_lock = True
-
-                exists_old = anim_name.lower() in anim_names_cur
-                exists_new = anim_name.lower() in anim_names
-                # anim has been added or removed
-                if exists_old != exists_new:
-                    changed_files.append(anim_name)
-                    continue
+        frames, frame_mapping = getFramesAndMappings(precolor_zip, True)
+        frame_size = getFrameSizeFromFrames(frames)
 
-                # anim does not exist in either
-                if not exists_old:
-                    continue
+        # obtain a mapping from the color image of the shiny path
+        shiny_frames = [] # type: ignore
+        for yy in range(0, wan_zip.size[1], frame_size[1]):
+            for xx in range(0, wan_zip.size[0], frame_size[0]):
+                tile_bounds = (xx, yy, xx + frame_size[0], yy + frame_size[1])
+                bounds = exUtils.getCoveredBounds(wan_zip, tile_bounds)
+                if bounds[0] >= bounds[2]:
+                    bounds = (frame_size[0] // 2, frame_size[1] // 2, frame_size[0] // 2 + 1, frame_size[1] // 2 + 1)
+                    # reached the end of actual frames
+                    if len(shiny_frames) >= len(frames):
+                        continue
+                abs_bounds = exUtils.addToBounds(bounds, (xx, yy))
+                frame_tex = wan_zip.crop(abs_bounds)
+                shiny_frames.append(frame_tex)
 
-                # check to ensure the indices are the same
-                anim_idx = anim_names[anim_name.lower()]
-                anim_idx_cur = anim_names_cur[anim_name.lower()]
-                if anim_idx != anim_idx_cur:
-                    changed_files.append(anim_name)
-                    continue
+    name_list = cmp_zip.name_list
+    if Constants.MULTI_SHEET_XML not in name_list:
+        raise SpriteVerifyError("No {0} found.".format(Constants.MULTI_SHEET_XML))
 
-                # anim is a backreference in both situations
-                if anim_idx == -1:
-                    continue
+    sdw_size, anim_names, anim_stats = cmp_zip.getStats()
+    if os.path.exists(os.path.join(chosen_path, Constants.MULTI_SHEET_XML)):
+        sdw_size_cur, anim_names_cur, anim_stats_cur = getStatsFromTree(
+            os.path.join(chosen_path, Constants.MULTI_SHEET_XML))
+    else:
+        sdw_size_cur = 0
+        anim_names_cur = {}
+        anim_stats_cur = {}
+
+    has_lock = False
+    for anim_name in Constants.ACTIONS:
+        if anim_name in dict.sprite_files and dict.sprite_files[anim_name]:
+            has_lock = True
+
+        exists_old = anim_name.lower() in anim_names_cur
+        exists_new = anim_name.lower() in anim_names
+        # anim has been added or removed
+        if exists_old != exists_new:
+            changed_files.append(anim_name)
+            continue
 
-                # check to make sure the stats are the same
-                anim_stat = anim_stats[anim_idx]
-                anim_stat_cur = anim_stats_cur[anim_idx_cur]
-
-                stat_violated = False
-                stat_violated |= anim_stat.index != anim_stat_cur.index
-                stat_violated |= anim_stat.name != anim_stat_cur.name
-                stat_violated |= anim_stat.size != anim_stat_cur.size
-                stat_violated |= anim_stat.backref != anim_stat_cur.backref
-                stat_violated |= anim_stat.rushFrame != anim_stat_cur.rushFrame
-                stat_violated |= anim_stat.hitFrame != anim_stat_cur.hitFrame
-                stat_violated |= anim_stat.returnFrame != anim_stat_cur.returnFrame
-                stat_violated |= len(anim_stat.durations) != len(anim_stat_cur.durations)
-                if not stat_violated:
-                    for idx, dur in enumerate(anim_stat.durations):
-                        stat_violated |= dur != anim_stat_cur.durations[idx]
-
-                if stat_violated:
-                    changed_files.append(anim_name)
-                    continue
+        # anim does not exist in either
+        if not exists_old:
+            continue
 
-                if anim_stat.backref is not None:
-                    continue
+        # check to ensure the indices are the same
+        anim_idx = anim_names[anim_name.lower()]
+        anim_idx_cur = anim_names_cur[anim_name.lower()]
+        if anim_idx != anim_idx_cur:
+            changed_files.append(anim_name)
+            continue
 
-                # check to make sure the images are the same
-                anim_png_name = anim_name + "-Anim.png"
-                offset_png_name = anim_name + "-Offsets.png"
-                shadow_png_name = anim_name + "-Shadow.png"
-                if anim_png_name not in name_list:
-                    raise SpriteVerifyError("Anim specified in XML has no Anim.png: {0}".format(anim_name))
-                if offset_png_name not in name_list:
-                    raise SpriteVerifyError("Anim specified in XML has no Offsets.png: {0}".format(anim_name))
-                if shadow_png_name not in name_list:
-                    raise SpriteVerifyError("Anim specified in XML has no Shadow.png: {0}".format(anim_name))
-
-                # absent file is counted as changed
-                if not os.path.exists(os.path.join(chosen_path, anim_png_name)):
-                    changed_files.append(anim_name)
-                    continue
+        # anim is a backreference in both situations
+        if anim_idx == -1:
+            continue
 
-                # check for actual change
-                if recolor:
-                    assert frame_mapping is not None
-                    prev_img = readZipImg(zip, anim_png_name)
-                    anim_img = createRecolorAnim(prev_img, frame_mapping[anim_name], shiny_frames)
-                else:
-                    anim_img = readZipImg(zip, anim_png_name)
+        # check to make sure the stats are the same
+        anim_stat = anim_stats[anim_idx]
+        anim_stat_cur = anim_stats_cur[anim_idx_cur]
+
+        stat_violated = False
+        stat_violated |= anim_stat.index != anim_stat_cur.index
+        stat_violated |= anim_stat.name != anim_stat_cur.name
+        stat_violated |= anim_stat.size != anim_stat_cur.size
+        stat_violated |= anim_stat.backref != anim_stat_cur.backref
+        stat_violated |= anim_stat.rushFrame != anim_stat_cur.rushFrame
+        stat_violated |= anim_stat.hitFrame != anim_stat_cur.hitFrame
+        stat_violated |= anim_stat.returnFrame != anim_stat_cur.returnFrame
+        stat_violated |= len(anim_stat.durations) != len(anim_stat_cur.durations)
+        if not stat_violated:
+            for idx, dur in enumerate(anim_stat.durations):
+                stat_violated |= dur != anim_stat_cur.durations[idx]
+
+        if stat_violated:
+            changed_files.append(anim_name)
+            continue
 
-                anim_img_cur = Image.open(os.path.join(chosen_path, anim_png_name)).convert("RGBA")
-                if not exUtils.imgsEqual(anim_img, anim_img_cur):
-                    changed_files.append(anim_name)
-                    continue
+        if anim_stat.backref is not None:
+            continue
 
-                # absent file is counted as changed
-                if not os.path.exists(os.path.join(chosen_path, offset_png_name)):
-                    changed_files.append(anim_name)
-                    continue
+        # check to make sure the images are the same
+        anim_png_name = anim_name + "-Anim.png"
+        offset_png_name = anim_name + "-Offsets.png"
+        shadow_png_name = anim_name + "-Shadow.png"
+        if anim_png_name not in name_list:
+            raise SpriteVerifyError("Anim specified in XML has no Anim.png: {0}".format(anim_name))
+        if offset_png_name not in name_list:
+            raise SpriteVerifyError("Anim specified in XML has no Offsets.png: {0}".format(anim_name))
+        if shadow_png_name not in name_list:
+            raise SpriteVerifyError("Anim specified in XML has no Shadow.png: {0}".format(anim_name))
+
+        # absent file is counted as changed
+        if not os.path.exists(os.path.join(chosen_path, anim_png_name)):
+            digests.pop(anim_png_name, None)
+            changed_files.append(anim_name)
+            continue
 
-                # check for actual change
-                offset_img = readZipImg(zip, offset_png_name)
-                offset_img_cur = Image.open(os.path.join(chosen_path, offset_png_name)).convert("RGBA")
-                if not exUtils.imgsEqual(offset_img, offset_img_cur):
-                    changed_files.append(anim_name)
-                    continue
+        # check for actual change
+        if recolor:
+            assert frame_mapping is not None
+            prev_img = cmp_zip.getImg(anim_png_name)
+            anim_img = createRecolorAnim(prev_img, frame_mapping[anim_name], shiny_frames)
+        else:
+            anim_img = cmp_zip.getImg(anim_png_name)
 
-                # absent file is counted as changed
-                if not os.path.exists(os.path.join(chosen_path, shadow_png_name)):
-                    changed_files.append(anim_name)
-                    continue
+        if not imgMatchesFile(anim_img, os.path.join(chosen_path, anim_png_name), digests):
+            changed_files.append(anim_name)
+            continue
 
-                # check for actual change
-                shadow_img = readZipImg(zip, shadow_png_name)
-                shadow_img_cur = Image.open(os.path.join(chosen_path, shadow_png_name)).convert("RGBA")
-                if not exUtils.imgsEqual(shadow_img, shadow_img_cur):
-                    changed_files.append(anim_name)
-                    continue
+        # absent file is counted as changed
+        if not os.path.exists(os.path.join(chosen_path, offset_png_name)):
+            digests.pop(offset_png_name, None)
+            changed_files.append(anim_name)
+            continue
 
-            if has_lock and sdw_size != sdw_size_cur:
-                raise SpriteVerifyError("The shadow size for this sprite is locked and cannot be changed.")
+        # check for actual change
+        offset_img = cmp_zip.getImg(offset_png_name)
+        if not imgMatchesFile(offset_img, os.path.join(chosen_path, offset_png_name), digests):
+            changed_files.append(anim_name)
+            continue
 
-    except zipfile.BadZipfile as e:
-        raise SpriteVerifyError(str(e))
+        # absent file is counted as changed
+        if not os.path.exists(os.path.join(chosen_path, shadow_png_name)):
+            digests.pop(shadow_png_name, None)
+            changed_files.append(anim_name)
+            continue
+
+        # check for actual change
+        shadow_img = cmp_zip.getImg(shadow_png_name)
+        if not imgMatchesFile(shadow_img, os.path.join(chosen_path, shadow_png_name), digests):
+            changed_files.append(anim_name)
+            continue
+
+    if has_lock and sdw_size != sdw_size_cur:
+        raise SpriteVerifyError("The shadow size for this sprite is locked and cannot be changed.")
 
     violated_files = []
     for change in changed_files:
@@ -1092,53 +1160,25 @@ def verifyPortrait(msg_args, img):
     if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
         raise SpriteVerifyError("Portrait has an invalid size of {0}, exceeding max of {1}".format(str(img.size), str(max_size)))
 
-    in_data = img.getdata()
+    # analyze every portrait and ensure that all pixels in that portrait are either solid or transparent
+    portrait_tiles = PortraitTiles(img)
     occupied: List[List[bool]] = [[]] * Constants.PORTRAIT_TILE_X
     for ii in range(Constants.PORTRAIT_TILE_X):
         occupied[ii] = [False] * Constants.PORTRAIT_TILE_Y
+    for xx in range(portrait_tiles.occupied.shape[0]):
+        for yy in range(portrait_tiles.occupied.shape[1]):
+            occupied[xx][yy] = bool(portrait_tiles.occupied[xx, yy])
 
-    # iterate every portrait and ensure that all pixels in that portrait are either solid or transparent
-    rogue_pixels = []
-    rogue_tiles = []
-    palette_counts = {}
-    for xx in range(Constants.PORTRAIT_TILE_X):
-        for yy in range(Constants.PORTRAIT_TILE_Y):
-            if xx >= img_tile_size[0] or yy >= img_tile_size[1]:
-                continue
-            first_pos = (xx * Constants.PORTRAIT_SIZE, yy * Constants.PORTRAIT_SIZE)
-            first_pixel = in_data[first_pos[1] * img.size[0] + first_pos[0]]
-            occupied[xx][yy] = (first_pixel[3] > 0)
-
-            palette = {}
-            is_rogue = False
-            for mx in range(Constants.PORTRAIT_SIZE):
-                for my in range(Constants.PORTRAIT_SIZE):
-                    cur_pos = (first_pos[0] + mx, first_pos[1] + my)
-                    cur_pixel = in_data[cur_pos[1] * img.size[0] + cur_pos[0]]
-                    palette[cur_pixel] = True
-                    cur_occupied = (cur_pixel[3] > 0)
-                    if cur_occupied and cur_pixel[3] < 255:
-                        rogue_pixels.append(cur_pos)
-                    if cur_occupied != occupied[xx][yy]:
-                        is_rogue = True
-                        break
-                if is_rogue:
-                    break
-            if is_rogue:
-                rogue_tiles.append((xx, yy))
-            palette_counts[(xx, yy)] = len(palette)
-
-
+    rogue_pixels = portrait_tiles.rogue_pixels
+    rogue_tiles = portrait_tiles.rogue_tiles
     if len(rogue_pixels) > 0:
         raise SpriteVerifyError("Semi-transparent pixels found at: {0}".format(str(rogue_pixels)[:1900]))
     if len(rogue_tiles) > 0:
         rogue_emotes = [getEmotionFromTilePos(a) for a in rogue_tiles]
         raise SpriteVerifyError("The following emotions have transparent pixels: {0}".format(str(rogue_emotes)[:1900]))
 
-    overpalette = { }
-    for emote_loc in palette_counts:
-        if palette_counts[emote_loc] > 15:
-            overpalette[emote_loc] = palette_counts[emote_loc]
+    # no tile is partially filled at this point, so every color count covers its whole tile
+    overpalette = portrait_tiles.getOverpalette(True)
 
     if len(overpalette) > 0:
         if not msg_args.overcolor:
@@ -1172,7 +1212,7 @@ def verifyPortrait(msg_args, img):
             raise SpriteVerifyError("File is missing some flipped emotions." \
                    "If you want to submit incomplete, include `--noflip` in the message.")
 
-def verifyPortraitLock(dict, chosen_path, img, recolor):
+def verifyPortraitLock(dict, chosen_path, img, recolor, digests):
     # make sure all locked portraits are the same as their original counterparts
     if recolor:
         img = removePalette(img)
@@ -1206,24 +1246,16 @@ def verifyPortraitLock(dict, chosen_path, img, recolor):
                     if exists_new:
                         break
 
+            if not exists_old:
+                digests.pop(emote_name + ".png", None)
+
             if exists_old != exists_new:
                 violated = True
             elif not exists_old:
                 violated = False
             else:
-                chosen_img = Image.open(png_name).convert("RGBA")
-                chosen_data = chosen_img.getdata()
-                violated = False
-                for mx in range(Constants.PORTRAIT_SIZE):
-                    for my in range(Constants.PORTRAIT_SIZE):
-                        cur_pos = (first_pos[0] + mx, first_pos[1] + my)
-                        cur_pixel = in_data[cur_pos[1] * img.size[0] + cur_pos[0]]
-                        chosen_pixel = chosen_data[my * chosen_img.size[0] + mx]
-                        if cur_pixel != chosen_pixel:
-                            violated = True
-                            break
-                    if violated:
-                        break
+                tile_img = img.crop((first_pos[0], first_pos[1], first_pos[0] + Constants.PORTRAIT_SIZE, first_pos[1] + Constants.PORTRAIT_SIZE))
+                violated = not imgMatchesFile(tile_img, png_name, digests)
             if violated:
                 changed_files.append((xx, yy))
 
@@ -1376,16 +1408,57 @@ def prepareSpriteZip(path):
             zip.write(full_file, arcname=file)
     return fileData
 
+def getContentKey(path, is_zip):
+    """
+    Identifies the contents of a DecodedSprite or folder, without reading any images.
+    """
+    if is_zip:
+        return tuple((info.filename, info.CRC, info.file_size) for info in path.zip.infolist())
+
+    file_stats = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file():
+                stat = entry.stat()
+                file_stats.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return os.path.abspath(path), tuple(sorted(file_stats))
+
 def getFramesAndMappings(path, is_zip) -> Tuple[
     List[Tuple[Image.Image, FrameOffset]],
     Dict[str, Dict[Tuple[int, int, int, int], Tuple[int, bool]]]
+]:
+    """
+    Returns the unique frames of a sprite with their offsets, and where each one is placed in each anim.
+    The sprite is a DecodedSprite if is_zip, or a folder otherwise.
+    Results are cached by the sprite's contents; callers always get their own copies.
+    """
+    sprite_key = (is_zip, getContentKey(path, is_zip))
+    cached = frame_cache.get(sprite_key)
+    if cached is None:
+        frames, frame_mapping = loadFramesAndMappings(path, is_zip)
+
+        frame_arrays = []
+        total_size = 0
+        for frame_tex, offsets in frames:
+            frame_arr = exUtils.getImgArray(frame_tex)
+            frame_arrays.append((frame_arr, (offsets.head, offsets.lhand, offsets.rhand, offsets.center)))
+            total_size += frame_arr.nbytes
+        frame_cache.put(sprite_key, (frame_arrays, frame_mapping), total_size)
+        return frames, frame_mapping
+
+    frame_arrays, frame_mapping = cached
+    frames = []
+    for frame_arr, offsets in frame_arrays:
+        frames.append((Image.fromarray(frame_arr.copy(), 'RGBA'), FrameOffset(*offsets)))
+    return frames, { anim_name: dict(frame_mapping[anim_name]) for anim_name in frame_mapping }
+
+def loadFramesAndMappings(path, is_zip) -> Tuple[
+    List[Tuple[Image.Image, FrameOffset]],
+    Dict[str, Dict[Tuple[int, int, int, int], Tuple[int, bool]]]
 ]:
     anim_dims: Dict[str, Tuple[int, int]] = {}
     if is_zip:
-        file_data = BytesIO()
-        file_data.write(path.read(Constants.MULTI_SHEET_XML))
-        file_data.seek(0)
-        tree = ET.parse(file_data)
+        tree = ET.parse(BytesIO(path.getXml()))
     else:
         tree = ET.parse(os.path.join(path, Constants.MULTI_SHEET_XML))
     root = tree.getroot()
@@ -1411,8 +1484,8 @@ def getFramesAndMappings(path, is_zip) -> Tuple[
         anim_map: Dict[Tuple[int, int, int, int], Tuple[int, bool]] = {}
         frame_size = anim_dims[anim_name]
         if is_zip:
-            img = readZipImg(path, anim_name + '-Anim.png')
-            offset_img = readZipImg(path, anim_name + '-Offsets.png')
+            img = path.getImg(anim_name + '-Anim.png')
+            offset_img = path.getImg(anim_name + '-Offsets.png')
         else:
             img = Image.open(os.path.join(path, anim_name + '-Anim.png')).convert("RGBA")
             offset_img = Image.open(os.path.join(path, anim_name + '-Offsets.png')).convert("RGBA")
@@ -1506,45 +1579,64 @@ def prepareSpriteRecolor(path):
     combinedImg, _ = getCombinedImg(path, False)
     return insertPalette(combinedImg)
 
+def getColorMappings(colors, shiny_colors):
+    """
+    Builds the table of shiny colors each color maps to, from the packed colors of paired opaque pixels.
+    Colors are in order of first appearance, and their mappings sorted by most common first.
+    """
+    color_tbl: Dict[Tuple[int, int, int, int], List[Tuple[Tuple[int, int, int, int], int]]] = {}
+    if len(colors) == 0:
+        return color_tbl
+
+    pairs = (colors.astype(np.uint64) << np.uint64(32)) | shiny_colors.astype(np.uint64)
+    unique_pairs, pair_first, pair_counts = np.unique(pairs, return_index=True, return_counts=True)
+    pair_colors = (unique_pairs >> np.uint64(32)).astype(np.uint32)
+    pair_shiny_colors = (unique_pairs & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    _, color_inverse = np.unique(pair_colors, return_inverse=True)
+    color_first = np.full(color_inverse.max() + 1, len(pairs))
+    np.minimum.at(color_first, color_inverse, pair_first)
+
+    # ties in count keep the order the mappings were first seen in
+    order = np.lexsort((pair_first, -pair_counts, color_first[color_inverse]))
+    for color, shiny_color, count in zip(exUtils.unpackColors(pair_colors[order]),
+                                         exUtils.unpackColors(pair_shiny_colors[order]),
+                                         pair_counts[order].tolist()):
+        if color not in color_tbl:
+            color_tbl[color] = []
+        color_tbl[color].append((shiny_color, count))
+    return color_tbl
+
+def getOpaquePairs(arr, shiny_arr):
+    opaque = (arr[..., 3] == 255) & (shiny_arr[..., 3] == 255)
+    return exUtils.getPackedColors(arr)[opaque], exUtils.getPackedColors(shiny_arr)[opaque]
+
 def getSpriteRecolorMap(frames, shiny_frames):
-    color_tbl = {}
     img_tbl = []
 
+    # each frame is paired with the first shiny frame of the same lineart
+    shiny_lookup = {}
+    for shiny_tex in shiny_frames:
+        shiny_key = exUtils.getLineartKey(shiny_tex)
+        if shiny_key not in shiny_lookup:
+            shiny_lookup[shiny_key] = shiny_tex
     for frame_tex in frames:
-        for shiny_tex in shiny_frames:
-            if exUtils.imgsLineartEqual(frame_tex, shiny_tex, False):
-                img_tbl.append((frame_tex, shiny_tex))
-                break
-
-    color_lookup = {} # type: ignore
+        frame_key = exUtils.getLineartKey(frame_tex)
+        if frame_key in shiny_lookup:
+            img_tbl.append((frame_tex, shiny_lookup[frame_key]))
 
     # only do a color mapping for frames that have been known to fit
+    colors = [np.zeros(0, np.uint32)]
+    shiny_colors = [np.zeros(0, np.uint32)]
     for frame_tex, shiny_tex in img_tbl:
-        datas = frame_tex.getdata()
-        shinyDatas = shiny_tex.getdata()
-        for idx in range(len(datas)):
-            color = datas[idx]
-            shinyColor = shinyDatas[idx]
-            if color[3] != 255 or shinyColor[3] != 255:
-                continue
-            if color not in color_lookup:
-                color_lookup[color] = {}
-            if shinyColor not in color_lookup[color]:
-                color_lookup[color][shinyColor] = 0
-            color_lookup[color][shinyColor] += 1
-
-    # sort by most common mapping
-    for color in color_lookup:
-        map_to = []
-        for shinyColor in color_lookup[color]:
-            map_to.append((shinyColor, color_lookup[color][shinyColor]))
-        map_to = sorted(map_to, key=lambda stat: stat[1], reverse=True)
-        color_tbl[color] = map_to
+        frame_colors, frame_shiny_colors = getOpaquePairs(exUtils.getImgArray(frame_tex), exUtils.getImgArray(shiny_tex))
+        colors.append(frame_colors)
+        shiny_colors.append(frame_shiny_colors)
 
+    color_tbl = getColorMappings(np.concatenate(colors), np.concatenate(shiny_colors))
     return color_tbl, img_tbl
 
 def getPortraitRecolorMap(img, shinyImg, frame_size):
-    color_tbl = {}
     img_tbl = []
 
     for yy in range(0, img.size[1], frame_size[1]):
@@ -1561,56 +1653,76 @@ def getPortraitRecolorMap(img, shinyImg, frame_size):
             shiny_tex = shinyImg.crop(abs_bounds)
             img_tbl.append((frame_tex, shiny_tex))
 
-    color_lookup = {} # type: ignore
-    datas = img.getdata()
-    shinyDatas = shinyImg.getdata()
-    for idx in range(len(datas)):
-        color = datas[idx]
-        shinyColor = shinyDatas[idx]
-        if color[3] != 255 or shinyColor[3] != 255:
-            continue
-        if color not in color_lookup:
-            color_lookup[color] = {}
-        if shinyColor not in color_lookup[color]:
-            color_lookup[color][shinyColor] = 0
-        color_lookup[color][shinyColor] += 1
-    # sort by most common mapping
-    for color in color_lookup:
-        map_to = []
-        for shinyColor in color_lookup[color]:
-            map_to.append((shinyColor, color_lookup[color][shinyColor]))
-        map_to = sorted(map_to, key=lambda stat: stat[1], reverse=True)
-        color_tbl[color] = map_to
-
+    # pixels are paired in data order, across the whole sheet
+    arr = exUtils.getImgArray(img).reshape(-1, 4)
+    shiny_arr = exUtils.getImgArray(shinyImg).reshape(-1, 4)[:len(arr)]
+    colors, shiny_colors = getOpaquePairs(arr, shiny_arr)
+    color_tbl = getColorMappings(colors, shiny_colors)
     return color_tbl, img_tbl
 
-def getRecoloredTex(color_tbl, img_tbl, frame_tex):
+class RecolorLookup:
+    """
+    A recolor map prepared for recoloring many frames with it.
+    """
+    def __init__(self, color_tbl, img_tbl):
+        self.color_tbl = color_tbl
+        self.img_tbl = img_tbl
+
+        # the first mapped frame equal to an image, either as is or flipped
+        self.frame_lookup: Dict[Tuple[str, Tuple[int, int], bytes], int] = {}
+        self.flip_lookup: Dict[Tuple[str, Tuple[int, int], bytes], int] = {}
+        for idx, (frame, _) in enumerate(img_tbl):
+            self.frame_lookup.setdefault(exUtils.getImgKey(frame), idx)
+            self.flip_lookup.setdefault(exUtils.getImgKey(frame, True), idx)
+
+        # sorted colors with their most common shiny color, and whether that is ambiguous
+        color_list = list(color_tbl.keys())
+        colors = np.array([exUtils.getPackedColors(np.array(color, np.uint8)) for color in color_list], np.uint32)
+        shiny_colors = np.array([exUtils.getPackedColors(np.array(color_tbl[color][0][0], np.uint8)) for color in color_list], np.uint32)
+        ambiguous = np.array([len(color_tbl[color]) > 1 for color in color_list], bool)
+        order = np.argsort(colors)
+        self.colors = colors[order]
+        self.shiny_colors = shiny_colors[order]
+        self.ambiguous = ambiguous[order]
+
+def getRecoloredTex(recolor_lookup, frame_tex):
     # attempt to find an image in img_tbl that corresponds with this one
-    for frame, shiny_frame in img_tbl:
-        if exUtils.imgsEqual(frame, frame_tex):
-            return shiny_frame, { }
-        if exUtils.imgsEqual(frame, frame_tex, True):
-            return shiny_frame.transpose(Image.FLIP_LEFT_RIGHT), { } # type: ignore
+    frame_key = exUtils.getImgKey(frame_tex)
+    frame_idx = recolor_lookup.frame_lookup.get(frame_key)
+    flip_idx = recolor_lookup.flip_lookup.get(frame_key)
+    if flip_idx is not None and (frame_idx is None or flip_idx < frame_idx):
+        return recolor_lookup.img_tbl[flip_idx][1].transpose(Image.FLIP_LEFT_RIGHT), { } # type: ignore
+    if frame_idx is not None:
+        return recolor_lookup.img_tbl[frame_idx][1], { }
+
     # attempt to recolor the image
-    datas = frame_tex.getdata()
-    shiny_datas = [(0,0,0,0)] * len(datas)
+    arr = exUtils.getImgArray(frame_tex)
+    opaque = arr[:, :, 3] == 255
+    packed = exUtils.getPackedColors(arr)
+    colors, color_first, color_inverse = np.unique(packed[opaque], return_index=True, return_inverse=True)
+
+    found = np.zeros(len(colors), bool)
+    ambiguous = np.zeros(len(colors), bool)
+    shiny_colors = colors.copy()
+    if len(recolor_lookup.colors) > 0:
+        lookup_idx = np.minimum(np.searchsorted(recolor_lookup.colors, colors), len(recolor_lookup.colors) - 1)
+        found = recolor_lookup.colors[lookup_idx] == colors
+        ambiguous = found & recolor_lookup.ambiguous[lookup_idx]
+        # no color mapping at all?  we can't recolor it, so it stays the same.  serious issue.
+        shiny_colors = np.where(found, recolor_lookup.shiny_colors[lookup_idx], colors)
+
+    shiny_packed = np.zeros(packed.shape, np.uint32)
+    shiny_packed[opaque] = shiny_colors[color_inverse.reshape(-1)]
+    shiny_tex = Image.fromarray(shiny_packed.view(np.uint8).reshape(arr.shape), 'RGBA')
+
     off_color_tbl = { } # type: ignore
-    for idx in range(len(datas)):
-        color = datas[idx]
-        if color[3] != 255:
-            continue
-        # no color mapping at all?  we can't recolor it.  serious issue.
-        if color not in color_tbl:
-            off_color_tbl[color] = []
-            shiny_colors = [(color, 0)]
+    off_idx = np.flatnonzero(~found | ambiguous)
+    off_idx = off_idx[np.argsort(color_first[off_idx])]
+    for idx, color in zip(off_idx.tolist(), exUtils.unpackColors(colors[off_idx])):
+        if found[idx]:
+            off_color_tbl[color] = recolor_lookup.color_tbl[color]
         else:
-            shiny_colors = color_tbl[color]
-        if len(shiny_colors) > 1:
-            off_color_tbl[color] = shiny_colors
-        shiny_datas[idx] = shiny_colors[0][0]
-
-    shiny_tex = Image.new('RGBA', frame_tex.size, (0, 0, 0, 0))
-    shiny_tex.putdata(shiny_datas)
+            off_color_tbl[color] = []
     return shiny_tex, off_color_tbl
 
 def updateOffColorTable(total_off_color, off_color_tbl):
@@ -1628,13 +1740,13 @@ def autoRecolor(prev_base_file, cur_base_path, shiny_path, asset_type):
     cur_shiny_img = None
     total_off_color = {} # type: ignore
     if asset_type == "sprite":
-        with zipfile.ZipFile(prev_base_file, 'r') as prev_base_zip:
-            prev_frames, _ = getFramesAndMappings(prev_base_zip, True)
+        prev_frames, _ = getFramesAndMappings(DecodedSprite(prev_base_file), True)
         prev_frames_only = [x[0] for x in prev_frames]
         frames, _ = getFramesAndMappings(cur_base_path, False)
         shiny_frames, _ = getFramesAndMappings(shiny_path, False)
         shiny_frames_only = [x[0] for x in shiny_frames]
         color_tbl, img_tbl = getSpriteRecolorMap(prev_frames_only, shiny_frames_only)
+        recolor_lookup = RecolorLookup(color_tbl, img_tbl)
 
         frame_size = getFrameSizeFromFrames(frames)
 
@@ -1644,7 +1756,7 @@ def autoRecolor(prev_base_file, cur_base_path, shiny_path, asset_type):
 
         for idx, frame_pair in enumerate(frames):
             frame = frame_pair[0]
-            recolored_frame, off_color_tbl = getRecoloredTex(color_tbl, img_tbl, frame)
+            recolored_frame, off_color_tbl = getRecoloredTex(recolor_lookup, frame)
             updateOffColorTable(total_off_color, off_color_tbl)
 
             diffPos = (frame_size[0] // 2 - frame.size[0] // 2, frame_size[1] // 2 - frame.size[1] // 2)
@@ -1661,6 +1773,7 @@ def autoRecolor(prev_base_file, cur_base_path, shiny_path, asset_type):
         cur_base_img = preparePortraitImage(cur_base_path)
         frame_size = (Constants.PORTRAIT_SIZE, Constants.PORTRAIT_SIZE)
         color_tbl, img_tbl = getPortraitRecolorMap(prev_base_img, prev_shiny_img, frame_size)
+        recolor_lookup = RecolorLookup(color_tbl, img_tbl)
 
         cur_shiny_img = Image.new('RGBA', cur_base_img.size, (0, 0, 0, 0))
         for yy in range(0, cur_base_img.size[1], frame_size[1]):
@@ -1671,7 +1784,7 @@ def autoRecolor(prev_base_file, cur_base_path, shiny_path, asset_type):
                     continue
                 abs_bounds = exUtils.addToBounds(bounds, (xx, yy))
                 frame_tex = cur_base_img.crop(abs_bounds)
-                shiny_tex, off_color_tbl = getRecoloredTex(color_tbl, img_tbl, frame_tex)
+                shiny_tex, off_color_tbl = getRecoloredTex(recolor_lookup, frame_tex)
                 updateOffColorTable(total_off_color, off_color_tbl)
 
                 cur_shiny_img.paste(shiny_tex, (abs_bounds[0], abs_bounds[1]), shiny_tex)
@@ -1690,32 +1803,7 @@ def autoRecolor(prev_base_file, cur_base_path, shiny_path, asset_type):
         args.append("--colormod " + str(palette_diff))
 
     if asset_type == "portrait":
-        palette_counts = {}
-        in_data = cur_shiny_img.getdata()
-        img_tile_size = (cur_shiny_img.size[0] // Constants.PORTRAIT_SIZE, cur_shiny_img.size[1] // Constants.PORTRAIT_SIZE)
-        for xx in range(Constants.PORTRAIT_TILE_X):
-            for yy in range(Constants.PORTRAIT_TILE_Y):
-                if xx >= img_tile_size[0] or yy >= img_tile_size[1]:
-                    continue
-                first_pos = (xx * Constants.PORTRAIT_SIZE, yy * Constants.PORTRAIT_SIZE)
-                first_pixel = in_data[first_pos[1] * cur_shiny_img.size[0] + first_pos[0]]
-                if first_pixel[3] == 0:
-                    continue
-
-                palette = {}
-                for mx in range(Constants.PORTRAIT_SIZE):
-                    for my in range(Constants.PORTRAIT_SIZE):
-                        cur_pos = (first_pos[0] + mx, first_pos[1] + my)
-                        cur_pixel = in_data[cur_pos[1] * cur_shiny_img.size[0] + cur_pos[0]]
-                        palette[cur_pixel] = True
-                palette_counts[(xx, yy)] = len(palette)
-
-        overpalette = False
-        for emote_loc in palette_counts:
-            if palette_counts[emote_loc] > 15:
-                overpalette = True
-
-        if overpalette:
+        if len(getPortraitOverpalette(cur_shiny_img)) > 0:
             args.append("--overcolor")
     elif asset_type == "sprite":
         if len(shiny_palette) > 15:
@@ -1749,36 +1837,67 @@ def autoRecolor(prev_base_file, cur_base_path, shiny_path, asset_type):
 def colorToHex(color):
     return ('#%02x%02x%02x' % color[:3]).upper()
 
+def getEmotionSlots() -> Dict[str, Tuple[int, bool]]:
+    global emotion_slots, emotion_slots_key
+    if emotion_slots_key != tuple(Constants.EMOTIONS):
+        slots: Dict[str, Tuple[int, bool]] = {}
+        # the first emotion with the name takes the slot
+        for idx, emotion in enumerate(Constants.EMOTIONS):
+            if emotion not in slots:
+                slots[emotion] = (idx, False)
+            if emotion + "^" not in slots:
+                slots[emotion + "^"] = (idx, True)
+        emotion_slots = slots
+        emotion_slots_key = tuple(Constants.EMOTIONS)
+    return emotion_slots
+
+def getPortraitSheetData(path) -> Optional[bytes]:
+    """
+    Returns the portrait sheet of a folder encoded as png, or None if there are no portraits.
+    Sheets are cached by the stats of the folder's files.
+    """
+    sheet_key = getContentKey(path, False)
+    sheet_data = sheet_cache.get(sheet_key)
+    if sheet_data is None:
+        sheet_data = b""
+        printImg = assemblePortraitImage(path)
+        if printImg is not None:
+            file_data = BytesIO()
+            printImg.save(file_data, format='PNG')
+            sheet_data = file_data.getvalue()
+        sheet_cache.put(sheet_key, sheet_data, len(sheet_data))
+
+    if len(sheet_data) == 0:
+        return None
+    return sheet_data
+
 """
 Returns Image
 """
 def preparePortraitImage(path):
+    sheet_data = getPortraitSheetData(path)
+    if sheet_data is None:
+        return None
+    return Image.open(BytesIO(sheet_data)).convert("RGBA")
+
+def assemblePortraitImage(path):
     printImg = Image.new('RGBA', (Constants.PORTRAIT_SHEET_WIDTH, Constants.PORTRAIT_SHEET_HEIGHT), (0, 0, 0, 0))
     maxX = 0
     maxY = 0
+    emotion_slots = getEmotionSlots()
     for file in os.listdir(path):
         filename, ext = os.path.splitext(file)
-        if ext == '.png':
-            for idx in range(len(Constants.EMOTIONS)):
-                use = False
-                flip = False
-                if Constants.EMOTIONS[idx] == filename:
-                    use = True
-                elif Constants.EMOTIONS[idx] + "^" == filename:
-                    use = True
-                    flip = True
-
-                if use:
-                    inImg = Image.open(os.path.join(path, file)).convert("RGBA")
-                    placeX = Constants.PORTRAIT_SIZE * (idx % Constants.PORTRAIT_TILE_X)
-                    placeY = Constants.PORTRAIT_SIZE * (idx // Constants.PORTRAIT_TILE_X)
-                    # handle flips
-                    if flip:
-                        placeY += 4 * Constants.PORTRAIT_SIZE
-                    printImg.paste(inImg, (placeX, placeY))
-                    maxX = max(maxX, placeX + Constants.PORTRAIT_SIZE)
-                    maxY = max(maxY, placeY + Constants.PORTRAIT_SIZE)
-                    break
+        if ext == '.png' and filename in emotion_slots:
+            idx, flip = emotion_slots[filename]
+            inImg = Image.open(os.path.join(path, file)).convert("RGBA")
+            placeX = Constants.PORTRAIT_SIZE * (idx % Constants.PORTRAIT_TILE_X)
+            placeY = Constants.PORTRAIT_SIZE * (idx // Constants.PORTRAIT_TILE_X)
+            # handle flips
+            if flip:
+                placeY += 4 * Constants.PORTRAIT_SIZE
+            printImg.paste(inImg, (placeX, placeY))
+            maxX = max(maxX, placeX + Constants.PORTRAIT_SIZE)
+            maxY = max(maxY, placeY + Constants.PORTRAIT_SIZE)
 
     if maxX > 0 and maxY > 0:
         if Constants.CROP_PORTRAITS:
@@ -1,11 +1,13 @@
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Set, Tuple, TypeVar, Generic
 
 import sys
 import os
 import re
 import shutil
 import datetime
+import threading
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 import Constants
 
 CURRENT_LICENSE = "CC_BY-NC_4"
@@ -26,11 +28,83 @@ class CreditEvent:
         self.license = license
         self.changed = changed
 
+class CreditIndex:
+    """
+    Parsed credits of each folder, checked against the stats of its credits file before use.
+    Also tracks the folders each author appears in, so that renaming an author only touches their files.
+    """
+    def __init__(self):
+        # folder -> (credits file stats, credit events)
+        self.entries: Dict[str, Tuple[Optional[List[int]], List[CreditEvent]]] = {}
+        # author -> folders with credit events from them
+        self.authors: Dict[str, Set[str]] = {}
+        # roots whose credits files have all been read since files were last moved between folders
+        self.loaded_roots: Set[str] = set()
+        # the startup scan reads credits from several threads
+        self.lock = threading.Lock()
+
+    def getCredits(self, path) -> List[CreditEvent]:
+        folder = os.path.abspath(path)
+        credit_path = os.path.join(folder, Constants.CREDIT_TXT)
+        signature = getCreditSignature(credit_path)
+        with self.lock:
+            entry = self.entries.get(folder)
+        if entry is not None and entry[0] == signature:
+            return list(entry[1])
+
+        credits = []
+        if signature is not None:
+            credits = readCreditFile(credit_path)
+        self.setCredits(folder, credits, signature)
+        return list(credits)
+
+    def setCredits(self, path, credits: List[CreditEvent], signature=None):
+        folder = os.path.abspath(path)
+        if signature is None:
+            signature = getCreditSignature(os.path.join(folder, Constants.CREDIT_TXT))
+        with self.lock:
+            old_entry = self.entries.get(folder)
+            if old_entry is not None:
+                for credit in old_entry[1]:
+                    if credit.name in self.authors:
+                        self.authors[credit.name].discard(folder)
+            self.entries[folder] = (signature, list(credits))
+            for credit in credits:
+                if credit.name not in self.authors:
+                    self.authors[credit.name] = set()
+                self.authors[credit.name].add(folder)
+
+    def markIncomplete(self):
+        with self.lock:
+            self.loaded_roots.clear()
+
+    def getAuthorFolders(self, root, author) -> List[str]:
+        root_folder = os.path.abspath(root)
+        if root_folder not in self.loaded_roots:
+            for dir_path, _, file_names in os.walk(root_folder):
+                if Constants.CREDIT_TXT in file_names:
+                    self.getCredits(dir_path)
+            with self.lock:
+                self.loaded_roots.add(root_folder)
+
+        with self.lock:
+            candidates = sorted(self.authors.get(author, set()))
+        folders = []
+        for folder in candidates:
+            if folder != root_folder and not folder.startswith(root_folder + os.sep):
+                continue
+            # re-read in case the file changed since it was indexed
+            for credit in self.getCredits(folder):
+                if credit.name == author:
+                    folders.append(folder)
+                    break
+        return folders
+
 def getStatusEmoji(chosen_node, asset_type):
-    pending = chosen_node.__dict__[asset_type+"_pending"]
-    added = chosen_node.__dict__[asset_type + "_credit"].primary != ""
-    complete = chosen_node.__dict__[asset_type+"_complete"]
-    required = chosen_node.__dict__[asset_type+"_required"]
+    pending = chosen_node[asset_type+"_pending"]
+    added = chosen_node[asset_type + "_credit"].primary != ""
+    complete = chosen_node[asset_type+"_complete"]
+    required = chosen_node[asset_type+"_required"]
     if complete > PHASE_EXISTS: # star
         return "\u2B50"
     elif len(pending) > 0:
@@ -74,27 +148,41 @@ def hasExistingCredits(cur_credits, orig_author, diff):
                 return True
     return False
 
-def getFileCredits(path):
+credit_index = CreditIndex()
+
+def getCreditSignature(credit_path):
+    try:
+        file_stat = os.stat(credit_path)
+    except FileNotFoundError:
+        return None
+    return [file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino]
+
+def readCreditFile(credit_path):
     id_list = []
-    credit_path = os.path.join(path, Constants.CREDIT_TXT)
-    if os.path.exists(credit_path):
-        with open(credit_path, 'r', encoding='utf-8') as txt:
-            for line in txt:
-                credit = line.strip().split('\t')
-                if len(credit) >= 5:
-                    id_list.append(CreditEvent(credit[0], credit[1], credit[2], credit[3], credit[4]))
-                else:
-                    raise BaseException("Invalid credit line “{}” at {}".format(line, credit_path))
+    with open(credit_path, 'r', encoding='utf-8') as txt:
+        for line in txt:
+            credit = line.strip().split('\t')
+            if len(credit) >= 5:
+                id_list.append(CreditEvent(credit[0], credit[1], credit[2], credit[3], credit[4]))
+            else:
+                raise BaseException("Invalid credit line “{}” at {}".format(line, credit_path))
     return id_list
 
+def getFileCredits(path):
+    return credit_index.getCredits(path)
+
 def appendCredits(path, id, diff, is_old):
     if diff == '':
         diff = '"'
     status = "CUR"
     if is_old:
         status = "OLD"
+    credits = getFileCredits(path)
+    credit = CreditEvent(str(datetime.datetime.utcnow()), id, status, CURRENT_LICENSE, diff)
     with open(os.path.join(path, Constants.CREDIT_TXT), 'a+', encoding='utf-8') as txt:
-        txt.write("{0}\t{1}\t{2}\t{3}\t{4}\n".format(str(datetime.datetime.utcnow()), id, status, CURRENT_LICENSE, diff))
+        txt.write("{0}\t{1}\t{2}\t{3}\t{4}\n".format(credit.datetime, credit.name, credit.old, credit.license, credit.changed))
+    credits.append(credit)
+    credit_index.setCredits(path, credits)
 
 def mergeCredits(path_from, path_to):
     id_list = []
@@ -113,6 +201,7 @@ def mergeCredits(path_from, path_to):
     with open(path_to, 'w', encoding='utf-8') as txt:
         for credit in id_list:
             txt.write("{0}\t{1}\t{2}\t{3}\t{4}\n".format(credit.datetime, credit.name, credit.old, credit.license, credit.changed))
+    credit_index.setCredits(os.path.dirname(path_to), id_list)
 
 def shiftCredits(fullPath):
     id_list = []
@@ -138,6 +227,7 @@ def deleteCredits(path, id):
     with open(fullPath, 'w', encoding='utf-8') as txt:
         for entry in id_list:
             txt.write(entry[0] + "\t" + entry[1] + "\t" + entry[2] + "\t" + entry[3] + "\t" + entry[4] + "\n")
+    credit_index.setCredits(path, [CreditEvent(*entry[:5]) for entry in id_list])
 
 class CreditEntry:
     """
@@ -159,37 +249,149 @@ class CreditCompileEntry:
         self.portrait = {}
         self.contact = contact
 
+ASSET_TYPES = ("sprite", "portrait")
+ASSET_FIELDS = ("bounty", "complete", "credit", "files", "link", "modified", "pending", "recolor_link", "required", "talk")
+NODE_FIELDS = ("name", "canon", "modreward", "subgroups")
+# tracker keys of asset fields, such as "sprite_files", to their asset type and field
+asset_keys: Dict[str, Tuple[str, str]] = { asset_type + "_" + field: (asset_type, field) for asset_type in ASSET_TYPES for field in ASSET_FIELDS }
+# key orders of nodes, shared since nearly every node has the same keys
+node_layouts: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+def internLayout(layout) -> Tuple[str, ...]:
+    layout = tuple(sys.intern(key) for key in layout)
+    return node_layouts.setdefault(layout, layout)
+
+class AssetRecord:
+    """
+    The tracked state of one asset type of a node
+    """
+    __slots__ = ASSET_FIELDS
+    bounty: Dict[str, int]
+    complete: int
+    credit: "CreditNode"
+    files: Dict[str, bool]
+    link: str
+    modified: str
+    pending: Dict[str, int]
+    recolor_link: str
+    required: bool
+    talk: Dict[str, int]
+
+T = TypeVar("T")
+
+class AssetField(Generic[T]):
+    """
+    A field of a node's asset record, read and written as node.sprite_files and the like
+    """
+    def __init__(self, asset_type: str, field: str):
+        self.asset_type = asset_type
+        self.field = field
+
+    def __get__(self, node: "TrackerNode", owner=None) -> T:
+        return getattr(getattr(node, self.asset_type), self.field)
+
+    def __set__(self, node: "TrackerNode", value: T):
+        setattr(getattr(node, self.asset_type), self.field, value)
+
 class TrackerNode:
+    """
+    A node of the tracker, with the fields of each asset type kept in its own record.
+    Fields can also be read and written by their tracker key, such as node[asset_type + "_files"].
+    """
+    __slots__ = ("name", "canon", "modreward", "subgroups", "sprite", "portrait", "extra", "layout")
     name: str
+    canon: bool
     modreward: bool
+    subgroups: Dict[str, "TrackerNode"]
+
+    # the asset fields as they were named before the asset records
+    sprite_bounty: AssetField[Dict[str, int]] = AssetField("sprite", "bounty")
+    sprite_complete: AssetField[int] = AssetField("sprite", "complete")
+    sprite_credit: AssetField["CreditNode"] = AssetField("sprite", "credit")
+    sprite_files: AssetField[Dict[str, bool]] = AssetField("sprite", "files")
+    sprite_link: AssetField[str] = AssetField("sprite", "link")
+    sprite_modified: AssetField[str] = AssetField("sprite", "modified")
+    sprite_pending: AssetField[Dict[str, int]] = AssetField("sprite", "pending")
+    sprite_recolor_link: AssetField[str] = AssetField("sprite", "recolor_link")
+    sprite_required: AssetField[bool] = AssetField("sprite", "required")
+    sprite_talk: AssetField[Dict[str, int]] = AssetField("sprite", "talk")
+    portrait_bounty: AssetField[Dict[str, int]] = AssetField("portrait", "bounty")
+    portrait_complete: AssetField[int] = AssetField("portrait", "complete")
+    portrait_credit: AssetField["CreditNode"] = AssetField("portrait", "credit")
+    portrait_files: AssetField[Dict[str, bool]] = AssetField("portrait", "files")
+    portrait_link: AssetField[str] = AssetField("portrait", "link")
+    portrait_modified: AssetField[str] = AssetField("portrait", "modified")
+    portrait_pending: AssetField[Dict[str, int]] = AssetField("portrait", "pending")
+    portrait_recolor_link: AssetField[str] = AssetField("portrait", "recolor_link")
+    portrait_required: AssetField[bool] = AssetField("portrait", "required")
+    portrait_talk: AssetField[Dict[str, int]] = AssetField("portrait", "talk")
 
     def __init__(self, node_dict):
         temp_list = [i for i in node_dict]
         temp_list = sorted(temp_list)
 
         self.subgroups = { }
+        self.sprite = AssetRecord()
+        self.portrait = AssetRecord()
+        # any keys the bot doesn't know of, kept as they are
+        self.extra: Optional[Dict[str, Any]] = None
 
+        layout = ["subgroups"]
         for key in temp_list:
             if key == "subgroups":
                 for sub_key, sub in node_dict[key].items():
                     self.subgroups[sub_key] = TrackerNode(sub)
             else:
-                self.__dict__[key] = node_dict[key]
-
-        if "sprite_talk" not in self.__dict__:
-            self.sprite_talk = {}
-            self.portrait_talk = {}
-
-        self.sprite_credit = CreditNode(node_dict["sprite_credit"])
-        self.portrait_credit = CreditNode(node_dict["portrait_credit"])
+                self.setValue(key, node_dict[key])
+                layout.append(key)
+
+        if "sprite_talk" not in node_dict:
+            for key in ("sprite_talk", "portrait_talk"):
+                self.setValue(key, {})
+                if key not in layout:
+                    layout.append(key)
+
+        self.sprite.credit = CreditNode(node_dict["sprite_credit"])
+        self.portrait.credit = CreditNode(node_dict["portrait_credit"])
+        # the order keys are written back in, same as they were read
+        self.layout = internLayout(layout)
+
+    def setValue(self, key, value):
+        if key in asset_keys:
+            asset_type, field = asset_keys[key]
+            setattr(getattr(self, asset_type), field, value)
+        elif key in NODE_FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __getitem__(self, key):
+        if key in asset_keys:
+            asset_type, field = asset_keys[key]
+            return getattr(getattr(self, asset_type), field)
+        elif key in NODE_FIELDS:
+            return getattr(self, key)
+        elif self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self.setValue(key, value)
+        if key not in self.layout:
+            self.layout = internLayout(self.layout + (key,))
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.layout
 
     def getDict(self):
         node_dict = { }
-        for k in self.__dict__:
-            node_dict[k] = self.__dict__[k]
+        for k in self.layout:
+            node_dict[k] = self[k]
 
-        node_dict["sprite_credit"] = self.sprite_credit.getDict()
-        node_dict["portrait_credit"] = self.portrait_credit.getDict()
+        node_dict["sprite_credit"] = self.sprite.credit.getDict()
+        node_dict["portrait_credit"] = self.portrait.credit.getDict()
 
         sub_dict = { }
         for sub_idx in self.subgroups:
@@ -198,21 +400,21 @@ class TrackerNode:
         return node_dict
 
 class CreditNode:
+    __slots__ = ("primary", "secondary", "total")
+    primary: str
+    secondary: List[str]
+    total: int
 
     def __init__(self, node_dict):
-        temp_list = [i for i in node_dict]
-        temp_list = sorted(temp_list)
-
-        main_dict = { }
-        for key in temp_list:
-            main_dict[key] = node_dict[key]
-
-        self.__dict__ = main_dict
+        self.primary = node_dict["primary"]
+        self.secondary = node_dict["secondary"]
+        self.total = node_dict["total"]
 
     def getDict(self):
-        node_dict = { }
-        for k in self.__dict__:
-            node_dict[k] = self.__dict__[k]
+        node_dict: Dict[str, Any] = { }
+        node_dict["primary"] = self.primary
+        node_dict["secondary"] = self.secondary
+        node_dict["total"] = self.total
         return node_dict
 
 def loadNameFile(name_path):
@@ -264,8 +466,8 @@ def initSubNode(name, canon):
 
 def getCurrentCompletion(orig_dict, dict, prefix):
 
-    for orig_file in orig_dict.__dict__[prefix + "_files"]:
-        if orig_file not in dict.__dict__[prefix + "_files"]:
+    for orig_file in orig_dict[prefix + "_files"]:
+        if orig_file not in dict[prefix + "_files"]:
             return PHASE_INCOMPLETE
 
     if prefix == "sprite":
@@ -274,7 +476,7 @@ def getCurrentCompletion(orig_dict, dict, prefix):
             has_all = True
             for idx in Constants.COMPLETION_ACTIONS[completion]:
                 file = Constants.ACTIONS[idx]
-                if file not in dict.__dict__[prefix + "_files"]:
+                if file not in dict[prefix + "_files"]:
                     has_all = False
                     break
             if has_all:
@@ -284,7 +486,7 @@ def getCurrentCompletion(orig_dict, dict, prefix):
     else:
         completion = PHASE_FULL
         search_flip = False
-        for file in dict.__dict__[prefix + "_files"]:
+        for file in dict[prefix + "_files"]:
             if file.endswith("^"):
                 search_flip = True
                 break
@@ -292,12 +494,12 @@ def getCurrentCompletion(orig_dict, dict, prefix):
             has_all = True
             for idx in Constants.COMPLETION_EMOTIONS[completion]:
                 file = Constants.EMOTIONS[idx]
-                if file not in dict.__dict__[prefix + "_files"]:
+                if file not in dict[prefix + "_files"]:
                     has_all = False
                     break
                 if search_flip:
                     file_flip = file + "^"
-                    if file_flip not in dict.__dict__[prefix + "_files"]:
+                    if file_flip not in dict[prefix + "_files"]:
                         has_all = False
                         break
             if has_all:
@@ -307,8 +509,8 @@ def getCurrentCompletion(orig_dict, dict, prefix):
 
 
 
-def updateFiles(dict, species_path, prefix):
-    file_list = {}
+def getFileList(species_path, prefix):
+    file_list = []
     if prefix == "sprite":
         if os.path.exists(os.path.join(species_path, Constants.MULTI_SHEET_XML)):
             tree = ET.parse(os.path.join(species_path, Constants.MULTI_SHEET_XML))
@@ -316,27 +518,33 @@ def updateFiles(dict, species_path, prefix):
             anims_node = root.find('Anims')
             for anim_node in anims_node.iter('Anim'): # type: ignore
                 name = anim_node.find('Name').text # type: ignore
-                file_list[name] = True
+                if name not in file_list:
+                    file_list.append(name)
     else:
         for inFile in os.listdir(species_path):
             if inFile.endswith(".png"):
                 file, _ = os.path.splitext(inFile)
-                file_list[file] = True
+                file_list.append(file)
+    return file_list
 
+def updateFiles(dict, species_path, prefix):
+    updateFileList(dict, species_path, prefix, getFileList(species_path, prefix))
+
+def updateFileList(dict, species_path, prefix, file_list):
     for file in file_list:
-        if file not in dict.__dict__[prefix + "_files"]:
-            dict.__dict__[prefix + "_files"][file] = False
+        if file not in dict[prefix + "_files"]:
+            dict[prefix + "_files"][file] = False
 
     to_remove = []
-    for file in dict.__dict__[prefix + "_files"]:
+    for file in dict[prefix + "_files"]:
         if file not in file_list:
             to_remove.append(file)
 
     for file in to_remove:
-        if dict.__dict__[prefix + "_files"][file]:
+        if dict[prefix + "_files"][file]:
             print("Locked file no longer exists: {0} {1}".format(species_path, file))
         else:
-            del dict.__dict__[prefix + "_files"][file]
+            del dict[prefix + "_files"][file]
 
 def updateCreditFromEntries(credit_data, credit_entries):
     # updates just the total count and the secondary
@@ -351,53 +559,109 @@ def updateCreditFromEntries(credit_data, credit_entries):
                 break
 
 
-def fileSystemToJson(dict, species_path, prefix, tier):
-    # get last modify date of everything that isn't credits.txt or dirs
-    last_modify = ""
-    for inFile in os.listdir(species_path):
-        fullPath = os.path.join(species_path, inFile)
-        if os.path.isdir(fullPath):
-            if inFile not in dict.subgroups:
-                # init name if applicable
-                if tier == 1:
-                    if inFile == "0000":
-                        dict.subgroups[inFile] = initSubNode("", dict.canon)
-                    else:
-                        dict.subgroups[inFile] = initSubNode("Form" + inFile, dict.canon)
-                elif tier == 2:
-                    if inFile == "0001":
-                        dict.subgroups[inFile] = initSubNode("Shiny", dict.canon)
-                    else:
-                        dict.subgroups[inFile] = initSubNode("", dict.canon)
-                elif tier == 3:
-                    if inFile == "0001":
-                        dict.subgroups[inFile] = initSubNode("Male", dict.canon)
-                    elif inFile == "0002":
-                        dict.subgroups[inFile] = initSubNode("Female", dict.canon)
-                    else:
-                        dict.subgroups[inFile] = initSubNode("", dict.canon)
-
-            fileSystemToJson(dict.subgroups[inFile], fullPath, prefix, tier + 1)
-        elif inFile == Constants.CREDIT_TXT:
-            #shiftCredits(fullPath)
-            credit_entries = getCreditEntries(species_path)
-            credit_data = dict.__dict__[prefix + "_credit"]
-            updateCreditFromEntries(credit_data, credit_entries)
-        else:
-            modify_datetime = datetime.datetime.utcfromtimestamp(os.path.getmtime(fullPath))
-            if str(modify_datetime) > last_modify:
-                last_modify = str(modify_datetime)
+class ScanCache:
+    """
+    The results of the last filesystem scan by directory, so that unchanged directories can be skipped on startup
+    """
+    def __init__(self, main_dict=None):
+        self.entries = {} if main_dict is None else main_dict
+        # only directories seen in this scan are kept
+        self.scanned = {}
+
+    def getDict(self):
+        return self.scanned
+
+def getScanSignature(species_path, dir_stat):
+    # both git and the bot replace asset files instead of writing over them, which changes the directory mtime.
+    # credits and anim data are rewritten in place, so their own stats are needed as well
+    signature = [dir_stat.st_mtime_ns]
+    for file_name in [Constants.CREDIT_TXT, Constants.MULTI_SHEET_XML]:
+        try:
+            file_stat = os.stat(os.path.join(species_path, file_name))
+            signature += [file_stat.st_mtime_ns, file_stat.st_size]
+        except FileNotFoundError:
+            signature += [0, 0]
+    return signature
+
+def scanDirectory(species_path, prefix, scan_cache):
+    signature = getScanSignature(species_path, os.stat(species_path))
+    scan_entry = scan_cache.entries.get(species_path)
+    if scan_entry is None or scan_entry["signature"] != signature:
+        # get last modify date of everything that isn't credits.txt or dirs
+        subdirs = []
+        last_modify = ""
+        credit_entries = None
+        with os.scandir(species_path) as it:
+            for entry in it:
+                if entry.is_dir():
+                    subdirs.append(entry.name)
+                elif entry.name == Constants.CREDIT_TXT:
+                    #shiftCredits(entry.path)
+                    credit_entries = getCreditEntries(species_path)
+                else:
+                    modify_datetime = datetime.datetime.utcfromtimestamp(entry.stat().st_mtime)
+                    if str(modify_datetime) > last_modify:
+                        last_modify = str(modify_datetime)
+
+        scan_entry = { "signature": signature, "subdirs": subdirs, "last_modify": last_modify,
+                       "credits": credit_entries, "files": getFileList(species_path, prefix) }
+    scan_cache.scanned[species_path] = scan_entry
+    return scan_entry
+
+def fileSystemToJson(dict, species_path, prefix, tier, scan_cache=None):
+    if scan_cache is None:
+        scan_cache = ScanCache()
+    scan_entry = scanDirectory(species_path, prefix, scan_cache)
+
+    for inFile in scan_entry["subdirs"]:
+        if inFile not in dict.subgroups:
+            # init name if applicable
+            if tier == 1:
+                if inFile == "0000":
+                    dict.subgroups[inFile] = initSubNode("", dict.canon)
+                else:
+                    dict.subgroups[inFile] = initSubNode("Form" + inFile, dict.canon)
+            elif tier == 2:
+                if inFile == "0001":
+                    dict.subgroups[inFile] = initSubNode("Shiny", dict.canon)
+                else:
+                    dict.subgroups[inFile] = initSubNode("", dict.canon)
+            elif tier == 3:
+                if inFile == "0001":
+                    dict.subgroups[inFile] = initSubNode("Male", dict.canon)
+                elif inFile == "0002":
+                    dict.subgroups[inFile] = initSubNode("Female", dict.canon)
+                else:
+                    dict.subgroups[inFile] = initSubNode("", dict.canon)
+
+    if tier == 0:
+        # each species is independent, so they can be scanned side by side
+        with ThreadPoolExecutor() as executor:
+            futures = []
+            for inFile in scan_entry["subdirs"]:
+                futures.append(executor.submit(fileSystemToJson, dict.subgroups[inFile],
+                                               os.path.join(species_path, inFile), prefix, tier + 1, scan_cache))
+            for future in futures:
+                future.result()
+    else:
+        for inFile in scan_entry["subdirs"]:
+            fileSystemToJson(dict.subgroups[inFile], os.path.join(species_path, inFile), prefix, tier + 1, scan_cache)
+
+    if scan_entry["credits"] is not None:
+        credit_data = dict[prefix + "_credit"]
+        updateCreditFromEntries(credit_data, scan_entry["credits"])
 
-    updateFiles(dict, species_path, prefix)
+    updateFileList(dict, species_path, prefix, scan_entry["files"])
 
+    last_modify = scan_entry["last_modify"]
     updated = False
-    if dict.__dict__[prefix + "_modified"] < last_modify:
-        dict.__dict__[prefix + "_modified"] = last_modify
+    if dict[prefix + "_modified"] < last_modify:
+        dict[prefix + "_modified"] = last_modify
         updated = True
 
     # the link always starts off blank, or is set to blank when last-modified is updated
     if updated:
-        dict.__dict__[prefix + "_link"] = ""
+        dict[prefix + "_link"] = ""
 
 def isDataPopulated(sub_dict, check_sprite = True, check_portrait = True, recursive = True):
     if check_sprite and sub_dict.sprite_credit.primary != "":
@@ -411,7 +675,32 @@ def isDataPopulated(sub_dict, check_sprite = True, check_portrait = True, recurs
                 return True
     return False
 
+class NodeStats:
+    """
+    Totals over a node and all of its subgroups, by asset type
+    """
+    def __init__(self, node):
+        self.populated: Dict[str, bool] = { asset_type: False for asset_type in ASSET_TYPES }
+        # the largest bounty on the next phase of any node
+        self.max_bounty: Dict[str, int] = { asset_type: 0 for asset_type in ASSET_TYPES }
+        self.addNode(node)
+
+    def addNode(self, node):
+        for asset_type in ASSET_TYPES:
+            record = getattr(node, asset_type)
+            if record.credit.primary != "":
+                self.populated[asset_type] = True
+            next_phase = str(record.complete + 1)
+            if next_phase in record.bounty:
+                self.max_bounty[asset_type] = max(self.max_bounty[asset_type], record.bounty[next_phase])
+        for sub_idx in node.subgroups:
+            self.addNode(node.subgroups[sub_idx])
+
+    def isPopulated(self):
+        return self.populated["sprite"] or self.populated["portrait"]
+
 def deleteData(tracker_dict, portrait_path, sprite_path, idx):
+    credit_index.markIncomplete()
     next_idx = "{:04d}".format(int(idx) + 1)
     while next_idx in tracker_dict:
         # replace with the index in front
@@ -502,6 +791,74 @@ def findFullTrackerIdx(tracker_dict, name_args, depth):
     # otherwise, it means we just can't find it
     return None
 
+def getNameLevel(sub_dict):
+    # the first node for each lower-cased name, and the last blank node to fall through
+    level_names = {}
+    blank_idx = None
+    for idx in sub_dict:
+        name = sub_dict[idx].name
+        if name.lower() not in level_names:
+            level_names[name.lower()] = idx
+        if name == "":
+            blank_idx = idx
+    return level_names, blank_idx
+
+class NameIndex:
+    """
+    Node names of every level in the tracker, giving the same results as
+    findFullTrackerIdx and findSlotIdx without scanning the tracker
+    """
+    def __init__(self, tracker_dict):
+        self.tracker = tracker_dict
+        # parent index tuple -> (idx by lower-cased name, last blank idx)
+        self.levels: Dict[Tuple[str, ...], Tuple[Dict[str, str], Optional[str]]] = {}
+        self.rebuild()
+
+    def rebuild(self):
+        self.levels = {}
+        self.indexLevel((), self.tracker)
+
+    def updateSpecies(self, species_idx):
+        for parent_idx in [key for key in self.levels if len(key) > 0 and key[0] == species_idx]:
+            del self.levels[parent_idx]
+        self.levels[()] = getNameLevel(self.tracker)
+        if species_idx in self.tracker:
+            self.indexLevel((species_idx,), self.tracker[species_idx].subgroups)
+
+    def indexLevel(self, parent_idx, sub_dict):
+        self.levels[parent_idx] = getNameLevel(sub_dict)
+        for idx in sub_dict:
+            self.indexLevel(parent_idx + (idx,), sub_dict[idx].subgroups)
+
+    def findSlotIdx(self, name):
+        level_names, _ = self.levels[()]
+        return level_names.get(name.lower())
+
+    def findFullTrackerIdx(self, name_args):
+        return self.findLevelIdx((), name_args, 0)
+
+    def findLevelIdx(self, parent_idx, name_args, depth):
+        # base case
+        if depth >= len(name_args):
+            return []
+
+        # recursive case
+        level_names, blank_idx = self.levels[parent_idx]
+        idx = level_names.get(name_args[depth].lower())
+        if idx is not None:
+            full_idx = self.findLevelIdx(parent_idx + (idx,), name_args, depth+1)
+        elif blank_idx is not None:
+            # didn't find any name matches, check if the base name is blank
+            idx = blank_idx
+            full_idx = self.findLevelIdx(parent_idx + (idx,), name_args, depth)
+        else:
+            # otherwise, it means we just can't find it
+            return None
+
+        if full_idx is None:
+            return None
+        return [idx] + full_idx
+
 def isShinyIdx(full_idx):
     if len(full_idx) < 3:
         return False
@@ -568,7 +925,7 @@ def genderDiffExists(form_dict, asset_type, gender):
     gender_idx = findSlotIdx(normal_dict, gender)
     if gender_idx is not None:
         gender_dict = normal_dict[gender_idx]
-        if gender_dict.__dict__[asset_type + "_required"]:
+        if gender_dict[asset_type + "_required"]:
             return True
 
     return False
@@ -583,7 +940,7 @@ def genderDiffPopulated(form_dict, asset_type):
         gender_idx = findSlotIdx(normal_dict, gender)
         if gender_idx is not None:
             gender_dict = normal_dict[gender_idx]
-            if gender_dict.__dict__[asset_type + "_credit"].primary != "":
+            if gender_dict[asset_type + "_credit"].primary != "":
                 return True
 
     return False
@@ -607,7 +964,7 @@ def createShinyGenderDiff(color_dict, asset_type, gender_name):
             color_dict.subgroups["0002"] = gender_dict
     else:
         gender_dict = color_dict.subgroups[gender_idx]
-    gender_dict.__dict__[asset_type + "_required"] = True
+    gender_dict[asset_type + "_required"] = True
 
 
 def removeGenderDiff(form_dict, asset_type):
@@ -628,8 +985,8 @@ def removeColorGenderDiff(color_dict, asset_type, gender):
         return True
 
     gender_dict = color_dict.subgroups[gender_idx]
-    gender_dict.__dict__[asset_type + "_required"] = False
-    if not gender_dict.__dict__["sprite_required"] and not gender_dict.__dict__["portrait_required"]:
+    gender_dict[asset_type + "_required"] = False
+    if not gender_dict["sprite_required"] and not gender_dict["portrait_required"]:
         del color_dict.subgroups[gender_idx]
         return True
 
@@ -783,27 +1140,27 @@ def renameJsonCredits(dict, old_name, new_name):
 
 def renameFileCredits(species_path, old_name, new_name):
     # renames all mentions of an author to a different author
-    for inFile in os.listdir(species_path):
-        fullPath = os.path.join(species_path, inFile)
-        if os.path.isdir(fullPath):
-            renameFileCredits(fullPath, old_name, new_name)
-        elif inFile == Constants.CREDIT_TXT:
-            id_list = []
-            with open(fullPath, 'r', encoding='utf-8') as txt:
-                for line in txt:
-                    id_list.append(line.strip().split('\t'))
+    for credit_dir in credit_index.getAuthorFolders(species_path, old_name):
+        fullPath = os.path.join(credit_dir, Constants.CREDIT_TXT)
+        id_list = []
+        with open(fullPath, 'r', encoding='utf-8') as txt:
+            for line in txt:
+                id_list.append(line.strip().split('\t'))
+        for entry in id_list:
+            if entry[1] == old_name:
+                entry[1] = new_name
+        with open(fullPath, 'w', encoding='utf-8') as txt:
             for entry in id_list:
-                if entry[1] == old_name:
-                    entry[1] = new_name
-            with open(fullPath, 'w', encoding='utf-8') as txt:
-                for entry in id_list:
-                    txt.write(entry[0] + "\t" + entry[1] + "\t" + entry[2] + "\t" + entry[3] + "\t" + entry[4] + "\n")
+                txt.write(entry[0] + "\t" + entry[1] + "\t" + entry[2] + "\t" + entry[3] + "\t" + entry[4] + "\n")
+        credit_index.setCredits(credit_dir, [CreditEvent(*entry[:5]) for entry in id_list])
 
 def getDirFromIdx(base_path, asset_type, full_idx):
     full_arr = [base_path, asset_type] + full_idx
     return os.path.join(*full_arr)
 
 def moveNodeFiles(dir_from, dir_to, merge_credit, is_dir):
+    # credits files change folders, so the author index has to be rebuilt before it can be trusted
+    credit_index.markIncomplete()
     cur_files = os.listdir(dir_from)
     for file in cur_files:
         # exclude tmp as it is a special folder name for temp files
@@ -818,6 +1175,7 @@ def moveNodeFiles(dir_from, dir_to, merge_credit, is_dir):
             shutil.move(full_base_path, os.path.join(dir_to, file))
 
 def copyNodeFiles(dir_from, dir_to, is_dir):
+    credit_index.markIncomplete()
     cur_files = os.listdir(dir_from)
     for file in cur_files:
         full_base_path = os.path.join(dir_from, file)
@@ -825,6 +1183,7 @@ def copyNodeFiles(dir_from, dir_to, is_dir):
             shutil.copy(full_base_path, os.path.join(dir_to, file))
 
 def deleteNodeFiles(dir_to, include_credit):
+    credit_index.markIncomplete()
     cur_files = os.listdir(dir_to)
     for file in cur_files:
         # exclude tmp as it is a special folder name for temp files
@@ -856,7 +1215,7 @@ def setNodeModReward(chosen_node, modreward, recursive):
 
 
 def swapNodeMiscFeatures(node_from, node_to):
-    for key in node_from.__dict__:
+    for key in node_from.keys():
         if key.startswith("sprite"):
             pass
         elif key.startswith("portrait"):
@@ -864,45 +1223,45 @@ def swapNodeMiscFeatures(node_from, node_to):
         elif key == "canon" or key == "modreward" or key == "subgroups":
             pass
         else:
-            tmp = node_to.__dict__[key]
-            node_to.__dict__[key] = node_from.__dict__[key]
-            node_from.__dict__[key] = tmp
+            tmp = node_to[key]
+            node_to[key] = node_from[key]
+            node_from[key] = tmp
 
 def swapNodeAssetFeatures(node_from, node_to, asset_type):
-    for key in node_from.__dict__:
+    for key in node_from.keys():
         if key.startswith(asset_type):
-            tmp = node_to.__dict__[key]
-            node_to.__dict__[key] = node_from.__dict__[key]
-            node_from.__dict__[key] = tmp
+            tmp = node_to[key]
+            node_to[key] = node_from[key]
+            node_from[key] = tmp
 
 def copyNodeAssetFeatures(node_from, node_to, asset_type):
-    for key in node_from.__dict__:
+    for key in node_from.keys():
         if key.startswith(asset_type):
-            node_to.__dict__[key] = node_from.__dict__[key]
+            node_to[key] = node_from[key]
 
 def replaceNodeAssetFeatures(node_from, node_to, asset_type):
     node_new = initSubNode("", False)
-    for key in node_from.__dict__:
+    for key in node_from.keys():
         if key.startswith(asset_type):
             if key == asset_type + "_files":
                 # pass in keys and set to false, only if new keys are introduced
-                for file_key in node_from.__dict__[key]:
-                    if file_key not in node_to.__dict__[key]:
-                        node_to.__dict__[key][file_key] = False
+                for file_key in node_from[key]:
+                    if file_key not in node_to[key]:
+                        node_to[key][file_key] = False
             elif key == asset_type + "_talk":
                 # do not overwrite
                 pass
             elif key == asset_type + "_bounty":
-                for status_key in node_from.__dict__[key]:
-                    if status_key not in node_to.__dict__[key]:
-                        node_to.__dict__[key][status_key] = 0
-                    node_to.__dict__[key][status_key] = node_to.__dict__[key][status_key] + node_from.__dict__[key][status_key]
+                for status_key in node_from[key]:
+                    if status_key not in node_to[key]:
+                        node_to[key][status_key] = 0
+                    node_to[key][status_key] = node_to[key][status_key] + node_from[key][status_key]
             elif key == "canon" or key == "modreward":
                 # do not overwrite canon
                 pass
             else:
-                node_to.__dict__[key] = node_from.__dict__[key]
-            node_from.__dict__[key] = node_new.__dict__[key]
+                node_to[key] = node_from[key]
+            node_from[key] = node_new[key]
 
 def swapFolderPaths(base_path, tracker, asset_type, full_idx_from, full_idx_to):
 
@@ -978,11 +1337,11 @@ def replaceFolderPaths(base_path, tracker, asset_type, full_idx_from, full_idx_t
 
 
 def swapNodeMiscCanon(chosen_node_from, chosen_node_to):
-    for key in chosen_node_from.__dict__:
+    for key in chosen_node_from.keys():
         if key == "canon" or key == "modreward":
-            tmp = chosen_node_to.__dict__[key]
-            chosen_node_to.__dict__[key] = chosen_node_from.__dict__[key]
-            chosen_node_from.__dict__[key] = tmp
+            tmp = chosen_node_to[key]
+            chosen_node_to[key] = chosen_node_from[key]
+            chosen_node_from[key] = tmp
 
     for sub_id in chosen_node_from.subgroups:
         if sub_id in chosen_node_to.subgroups:
@@ -1034,8 +1393,8 @@ def swapAllSubNodes(base_path, tracker, full_idx_from, full_idx_to):
 
 
 def hasLock(dict, asset_type, recursive):
-    for file in dict.__dict__[asset_type + "_files"]:
-        if dict.__dict__[asset_type + "_files"][file]:
+    for file in dict[asset_type + "_files"]:
+        if dict[asset_type + "_files"][file]:
             return True
 
     if recursive:
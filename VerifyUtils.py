@@ -0,0 +1,116 @@
+"""
+Submission verification, run in worker processes so a large sprite zip doesn't stall the bot.
+"""
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import SpriteUtils
+import TrackerUtils
+import Constants
+
+# Constants loaded from sprite_config.json, which the workers need as well
+CONFIG_CONSTANTS = [ "PORTRAIT_SIZE", "PORTRAIT_TILE_X", "PORTRAIT_TILE_Y", "PORTRAIT_SHEET_WIDTH", "PORTRAIT_SHEET_HEIGHT",
+                     "CROP_PORTRAITS", "COMPLETION_EMOTIONS", "EMOTIONS", "COMPLETION_ACTIONS", "ACTIONS",
+                     "DUNGEON_ACTIONS", "STARTER_ACTIONS", "ACTION_MAP" ]
+
+
+class LockData:
+    """
+    The parts of a tracker node that the lock checks read, small enough to send to a worker.
+    """
+    def __init__(self, node: TrackerUtils.TrackerNode, digests):
+        self.sprite_files = dict(node.sprite_files)
+        self.portrait_files = dict(node.portrait_files)
+        # the digests of the node's files, filled in with any the checks had to read
+        self.digests = digests
+
+
+def getConstantsState():
+    return { name: getattr(Constants, name) for name in CONFIG_CONSTANTS }
+
+def initWorker(constants_state, frame_cache_size: int):
+    for name in constants_state:
+        setattr(Constants, name, constants_state[name])
+    # each worker keeps its own frame cache, held to the same limit as the bot's
+    SpriteUtils.frame_cache.size_limit = frame_cache_size
+
+def warmUp():
+    return True
+
+def createVerifyPool(workers: int, frame_cache_size: int) -> ProcessPoolExecutor:
+    # workers come from a single-threaded fork server, so the pool can be rebuilt safely while the bot is running
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        multiprocessing.get_context("forkserver").set_forkserver_preload(["VerifyUtils"])
+        method = "forkserver"
+    else:
+        method = "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method),
+                               initializer=initWorker, initargs=(getConstantsState(), frame_cache_size))
+
+def killVerifyPool(pool: ProcessPoolExecutor):
+    """
+    Shuts down the pool without waiting, terminating any worker still stuck on a job.
+    Jobs that were running or queued in it fail with BrokenProcessPool.
+    """
+    # the executor has no public way to reach its workers, so this relies on its private process map,
+    # which is None once the pool has already shut down or broken
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False)
+    for process in processes:
+        process.kill()
+
+
+def verifySpriteSubmission(msg_args, lock_data, chosen_path, is_shiny, has_base, orig_zip, orig_zip_group, wan_zip, recolor):
+    """
+    Returns the changed files, any warnings for the submission, the preview of a zip submission as png data,
+    the updated file digests, and the SpriteVerifyError if it should be declined.
+    """
+    diffs = None
+    warnings = []
+    preview_data = None
+    try:
+        # every zip is decoded once here and shared by all the checks below
+        if orig_zip_group is not None:
+            orig_zip_group = SpriteUtils.DecodedSprite(orig_zip_group)
+        if not recolor:
+            wan_zip = SpriteUtils.DecodedSprite(wan_zip)
+            if orig_zip is not None:
+                orig_zip = SpriteUtils.DecodedSprite(orig_zip)
+
+        # if the file needs to be compared to an original, verify it as a recolor. Otherwise, by itself.
+        diffs = SpriteUtils.verifySpriteLock(lock_data, chosen_path, orig_zip_group, wan_zip, recolor, lock_data.digests)
+        if is_shiny:
+            SpriteUtils.verifySpriteRecolor(msg_args, orig_zip, wan_zip, recolor, True)
+        elif has_base:
+            warnings = SpriteUtils.verifySpriteRecolor(msg_args, orig_zip, wan_zip, recolor, False)
+        else:
+            SpriteUtils.verifySprite(msg_args, wan_zip)
+
+        if not recolor:
+            preview_img, _ = SpriteUtils.getCombinedImg(wan_zip, True)
+            preview_file = io.BytesIO()
+            preview_img.save(preview_file, format='PNG')
+            preview_data = preview_file.getvalue()
+    except SpriteUtils.SpriteVerifyError as e:
+        # the digests read before the submission was declined are still worth keeping
+        return diffs, warnings, preview_data, lock_data.digests, e
+    return diffs, warnings, preview_data, lock_data.digests, None
+
+def verifyPortraitSubmission(msg_args, lock_data, chosen_path, is_shiny, orig_img, img, recolor):
+    """
+    Returns the changed files, any warnings for the submission, the updated file digests,
+    and the SpriteVerifyError if it should be declined.
+    """
+    diffs = None
+    warnings = []
+    try:
+        # if the file needs to be compared to an original, verify it as a recolor. Otherwise, by itself.
+        diffs = SpriteUtils.verifyPortraitLock(lock_data, chosen_path, img, recolor, lock_data.digests)
+        if is_shiny:
+            warnings = SpriteUtils.verifyPortraitRecolor(msg_args, orig_img, img, recolor)
+        else:
+            SpriteUtils.verifyPortrait(msg_args, img)
+    except SpriteUtils.SpriteVerifyError as e:
+        # the digests read before the submission was declined are still worth keeping
+        return diffs, warnings, lock_data.digests, e
+    return diffs, warnings, lock_data.digests, None
@@ -49,7 +49,7 @@ class AddGender(BaseCommand):
             other_gender = "Female"
 
         species_name = TrackerUtils.sanitizeName(args[1])
-        species_idx = TrackerUtils.findSlotIdx(self.spritebot.tracker, species_name)
+        species_idx = self.spritebot.name_index.findSlotIdx(species_name)
         if species_idx is None:
             await msg.channel.send(msg.author.mention + " {0} does not exist!".format(species_name))
             return
@@ -62,6 +62,7 @@ class AddGender(BaseCommand):
                 return
 
             TrackerUtils.createGenderDiff(species_dict.subgroups["0000"], asset_type, gender_name)
+            self.spritebot.name_index.updateSpecies(species_idx)
             await msg.channel.send(msg.author.mention + " Added gender difference to #{0:03d}: {1}! ({2})".format(int(species_idx), species_name, asset_type))
         else:
 
@@ -79,6 +80,7 @@ class AddGender(BaseCommand):
                 return
 
             TrackerUtils.createGenderDiff(form_dict, asset_type, gender_name)
+            self.spritebot.name_index.updateSpecies(species_idx)
             await msg.channel.send(msg.author.mention +
                 " Added gender difference to #{0:03d}: {1} {2}! ({3})".format(int(species_idx), species_name, form_name, asset_type))
 
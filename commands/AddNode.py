@@ -35,7 +35,7 @@ class AddNode(BaseCommand):
             return
 
         species_name = TrackerUtils.sanitizeName(args[0])
-        species_idx = TrackerUtils.findSlotIdx(self.spritebot.tracker, species_name)
+        species_idx = self.spritebot.name_index.findSlotIdx(species_name)
         if len(args) == 1:
             if species_idx is not None:
                 await msg.channel.send(msg.author.mention + " {0} already exists!".format(species_name))
@@ -44,6 +44,7 @@ class AddNode(BaseCommand):
             new_id_int = max([int(i) for i in self.spritebot.tracker.keys()]) + 1
             new_idx = "{:04d}".format(new_id_int)
             self.spritebot.tracker[new_idx] = TrackerUtils.createSpeciesNode(species_name)
+            self.spritebot.name_index.updateSpecies(new_idx)
 
             await msg.channel.send(msg.author.mention + " Added #{0:03d}: {1}!".format(new_id_int, species_name))
         else:
@@ -68,6 +69,7 @@ class AddNode(BaseCommand):
             new_id_int = max([int(i) for i in species_dict.subgroups.keys()]) + 1
             new_idx = "{:04d}".format(new_id_int)
             species_dict.subgroups[new_idx] = TrackerUtils.createFormNode(form_name, canon)
+            self.spritebot.name_index.updateSpecies(species_idx)
 
             await msg.channel.send(msg.author.mention +
                                    " Added #{0:03d}: {1} {2}!".format(int(species_idx), species_name, form_name))
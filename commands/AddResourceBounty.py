@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, List
 from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import TrackerUtils
+from utils import unpack_optional
 import discord
 import json
 from Constants import PHASES
@@ -59,14 +60,14 @@ class AddResourceBounty(BaseCommand):
             return
 
         name_seq = [TrackerUtils.sanitizeName(i) for i in args[:-1]]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
-        chosen_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0)
+        chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0))
 
         status = TrackerUtils.getStatusEmoji(chosen_node, self.resource_type)
-        if chosen_node.__dict__[self.resource_type + "_complete"] >= TrackerUtils.PHASE_FULL:
+        if chosen_node[self.resource_type + "_complete"] >= TrackerUtils.PHASE_FULL:
             await msg.channel.send(msg.author.mention + " {0} #{1:03d} {2} is fully featured and cannot have a bounty.".format(status, int(full_idx[0]), " ".join(name_seq)))
             return
 
@@ -107,14 +108,14 @@ class AddResourceBounty(BaseCommand):
                 return
 
         cur_val = 0
-        result_phase = chosen_node.__dict__[self.resource_type + "_complete"] + 1
-        if str(result_phase) in chosen_node.__dict__[self.resource_type + "_bounty"]:
-            cur_val = chosen_node.__dict__[self.resource_type + "_bounty"][str(result_phase)]
+        result_phase = chosen_node[self.resource_type + "_complete"] + 1
+        if str(result_phase) in chosen_node[self.resource_type + "_bounty"]:
+            cur_val = chosen_node[self.resource_type + "_bounty"][str(result_phase)]
 
-        chosen_node.__dict__[self.resource_type + "_bounty"][str(result_phase)] = cur_val + amt
+        chosen_node[self.resource_type + "_bounty"][str(result_phase)] = cur_val + amt
 
         # set to complete
         await msg.channel.send(msg.author.mention + " {0} #{1:03d}: {2} now has a bounty of **{3}GP**, paid out when the {4} becomes {5}.".format(status, int(full_idx[0]), " ".join(name_seq), cur_val + amt, self.resource_type, PHASES[result_phase].title()))
 
-        self.spritebot.saveTracker()
+        self.spritebot.saveTracker(full_idx)
         self.spritebot.changed = True
@@ -3,7 +3,7 @@ from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import discord
 import TrackerUtils
-import SpriteUtils
+from utils import unpack_optional
 
 if TYPE_CHECKING:
     from SpriteBot import SpriteBot, BotServer
@@ -49,14 +49,14 @@ class AddResourceCredit(BaseCommand):
 
         wanted_author = self.spritebot.getFormattedCredit(args[0])
         name_seq = [TrackerUtils.sanitizeName(i) for i in args[1:-1]]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
 
-        chosen_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0)
+        chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0))
 
-        if chosen_node.__dict__[self.resource_type + "_credit"].primary == "":
+        if chosen_node[self.resource_type + "_credit"].primary == "":
             await msg.channel.send(msg.author.mention + " This command only works on filled {0}.".format(self.resource_type))
             return
 
@@ -85,8 +85,7 @@ class AddResourceCredit(BaseCommand):
         submit_channel = self.spritebot.client.get_channel(chat_id)
         author = "<@!{0}>".format(msg.author.id)
 
-        base_link = await self.spritebot.retrieveLinkMsg(full_idx, chosen_node, self.resource_type, False)
-        base_file, base_name = SpriteUtils.getLinkData(base_link)
+        base_file, base_name = self.spritebot.getAssetFile(full_idx, chosen_node, self.resource_type, False)
 
         # stage a post in submissions
         await self.spritebot.postStagedSubmission(submit_channel, submit_args, "", full_idx, chosen_node, self.resource_type, author + "/" + wanted_author,
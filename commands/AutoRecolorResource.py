@@ -3,6 +3,7 @@ from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import discord
 import TrackerUtils
+from utils import unpack_optional
 import SpriteUtils
 import io
 
@@ -56,7 +57,7 @@ class AutoRecolorResource(BaseCommand):
             await msg.channel.send(msg.author.mention + " Specify a Pokemon.")
             return
         name_seq = [TrackerUtils.sanitizeName(i) for i in args]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
@@ -66,36 +67,34 @@ class AutoRecolorResource(BaseCommand):
             await msg.channel.send(msg.author.mention + " Can't recolor a shiny Pokemon.")
             return
 
-        chosen_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0)
+        async with self.spritebot.node_locks.lock(full_idx):
+            chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0))
 
-        if chosen_node.__dict__[self.resource_type + "_credit"].primary == "":
-            await msg.channel.send(msg.author.mention + " Can't recolor a Pokemon that doesn't have a {0}.".format(self.resource_type))
-            return
+            if chosen_node[self.resource_type + "_credit"].primary == "":
+                await msg.channel.send(msg.author.mention + " Can't recolor a Pokemon that doesn't have a {0}.".format(self.resource_type))
+                return
 
-        shiny_idx = TrackerUtils.createShinyIdx(full_idx, True)
-        shiny_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, shiny_idx, 0)
+            shiny_idx = TrackerUtils.createShinyIdx(full_idx, True)
+            shiny_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, shiny_idx, 0))
 
-        if shiny_node.__dict__[self.resource_type + "_credit"].primary == "":
-            await msg.channel.send(msg.author.mention + " Can't recolor a Pokemon that doesn't have a shiny {0}.".format(self.resource_type))
-            return
+            if shiny_node[self.resource_type + "_credit"].primary == "":
+                await msg.channel.send(msg.author.mention + " Can't recolor a Pokemon that doesn't have a shiny {0}.".format(self.resource_type))
+                return
 
-        base_link = await self.spritebot.retrieveLinkMsg(full_idx, chosen_node, self.resource_type, False)
-        cur_recolor_file, _ = SpriteUtils.getLinkFile(base_link, self.resource_type)
-        base_recolor_link = await self.spritebot.retrieveLinkMsg(full_idx, chosen_node, self.resource_type, True)
-        cur_recolor_img = SpriteUtils.getLinkImg(base_recolor_link)
-        base_path = TrackerUtils.getDirFromIdx(self.spritebot.config.path, self.resource_type, full_idx)
-        # auto-generate the shiny recolor image, in file form
-        shiny_path = TrackerUtils.getDirFromIdx(self.spritebot.config.path, self.resource_type, shiny_idx)
-        auto_recolor_img, cmd_str, content = SpriteUtils.autoRecolor(cur_recolor_file, base_path, shiny_path, self.resource_type)
-        # post it as a staged submission
-        return_name = "{0}-{1}{2}".format(self.resource_type + "_recolor", "-".join(shiny_idx), ".png")
+            cur_recolor_file, _ = self.spritebot.getAssetFile(full_idx, chosen_node, self.resource_type, False)
+            base_path = TrackerUtils.getDirFromIdx(self.spritebot.config.path, self.resource_type, full_idx)
+            # auto-generate the shiny recolor image, in file form
+            shiny_path = TrackerUtils.getDirFromIdx(self.spritebot.config.path, self.resource_type, shiny_idx)
+            auto_recolor_img, cmd_str, content = SpriteUtils.autoRecolor(cur_recolor_file, base_path, shiny_path, self.resource_type)
+            # post it as a staged submission
+            return_name = "{0}-{1}{2}".format(self.resource_type + "_recolor", "-".join(shiny_idx), ".png")
 
-        auto_recolor_file = io.BytesIO()
-        auto_recolor_img.save(auto_recolor_file, format='PNG')
-        auto_recolor_file.seek(0)
+            auto_recolor_file = io.BytesIO()
+            auto_recolor_img.save(auto_recolor_file, format='PNG')
+            auto_recolor_file.seek(0)
 
-        title = TrackerUtils.getIdxName(self.spritebot.tracker, full_idx)
+            title = TrackerUtils.getIdxName(self.spritebot.tracker, full_idx)
 
-        send_files = [discord.File(auto_recolor_file, return_name)]
-        await msg.channel.send("{0} {1}\n{2}\n{3}".format(msg.author.mention, " ".join(title), cmd_str, content),
-                                     files=send_files)
\ No newline at end of file
+            send_files = [discord.File(auto_recolor_file, return_name)]
+            await msg.channel.send("{0} {1}\n{2}\n{3}".format(msg.author.mention, " ".join(title), cmd_str, content),
+                                         files=send_files)
\ No newline at end of file
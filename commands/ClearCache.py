@@ -33,7 +33,7 @@ class ClearCache(BaseCommand):
     
     async def executeCommand(self, msg: discord.Message, args: List[str]):
         name_seq = [TrackerUtils.sanitizeName(i) for i in args]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
@@ -42,7 +42,8 @@ class ClearCache(BaseCommand):
         chosen_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0)
 
         TrackerUtils.clearCache(chosen_node, True)
+        self.spritebot.clearAssetCache(full_idx, chosen_node)
 
-        self.spritebot.saveTracker()
+        self.spritebot.saveTracker(full_idx)
 
         await msg.channel.send(msg.author.mention + " Cleared links for #{0:03d}: {1}.".format(int(full_idx[0]), " ".join(name_seq)))
\ No newline at end of file
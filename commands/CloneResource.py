@@ -3,6 +3,7 @@ from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import SpriteUtils
 import TrackerUtils
+from utils import unpack_optional
 import discord
 
 if TYPE_CHECKING:
@@ -48,46 +49,49 @@ class CloneResource(BaseCommand):
         name_args_to = args[delim_idx+1:]
 
         name_seq_from = [TrackerUtils.sanitizeName(i) for i in name_args_from]
-        full_idx_from = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq_from, 0)
+        full_idx_from = self.spritebot.name_index.findFullTrackerIdx(name_seq_from)
         if full_idx_from is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon specified as source.")
             return
 
         name_seq_to = [TrackerUtils.sanitizeName(i) for i in name_args_to]
-        full_idx_to = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq_to, 0)
+        full_idx_to = self.spritebot.name_index.findFullTrackerIdx(name_seq_to)
         if full_idx_to is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon specified as destination.")
             return
 
-        chosen_node_from = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_from, 0)
-        chosen_node_to = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_to, 0)
+        async with self.spritebot.node_locks.lock(full_idx_from, full_idx_to):
+            chosen_node_from = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_from, 0))
+            chosen_node_to = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_to, 0))
 
-        if chosen_node_from == chosen_node_to:
-            await msg.channel.send(msg.author.mention + " Cannot clone to the same location.")
-            return
+            if chosen_node_from == chosen_node_to:
+                await msg.channel.send(msg.author.mention + " Cannot clone to the same location.")
+                return
 
-        if not chosen_node_to.__dict__[self.resource_type + "_required"]:
-            await msg.channel.send(msg.author.mention + " Cannot clone when destination {0} is unneeded.".format(self.resource_type))
-            return
+            if not chosen_node_to[self.resource_type + "_required"]:
+                await msg.channel.send(msg.author.mention + " Cannot clone when destination {0} is unneeded.".format(self.resource_type))
+                return
 
-        try:
-            await self.spritebot.checkMoveLock(full_idx_from, chosen_node_from, full_idx_to, chosen_node_to, self.resource_type)
-        except SpriteUtils.SpriteVerifyError as e:
-            await msg.channel.send(msg.author.mention + " Cannot clone the locked Pokemon specified as source:\n{0}".format(e.message))
-            return
+            try:
+                await self.spritebot.checkMoveLock(full_idx_from, chosen_node_from, full_idx_to, chosen_node_to, self.resource_type)
+            except SpriteUtils.SpriteVerifyError as e:
+                await msg.channel.send(msg.author.mention + " Cannot clone the locked Pokemon specified as source:\n{0}".format(e.message))
+                return
 
-        if TrackerUtils.isDataPopulated(chosen_node_to, self.resource_type == "sprite", self.resource_type == "portrait", False):
-            await msg.channel.send(msg.author.mention + " Cannot clone to an occupied destination!")
-            return
+            if TrackerUtils.isDataPopulated(chosen_node_to, self.resource_type == "sprite", self.resource_type == "portrait", False):
+                await msg.channel.send(msg.author.mention + " Cannot clone to an occupied destination!")
+                return
 
-        # clear caches
-        TrackerUtils.clearCache(chosen_node_from, True)
-        TrackerUtils.clearCache(chosen_node_to, True)
+            # clear caches
+            TrackerUtils.clearCache(chosen_node_from, True)
+            TrackerUtils.clearCache(chosen_node_to, True)
 
-        TrackerUtils.copyFolderPaths(self.spritebot.config.path, self.spritebot.tracker, self.resource_type, full_idx_from, full_idx_to)
+            TrackerUtils.copyFolderPaths(self.spritebot.config.path, self.spritebot.tracker, self.resource_type, full_idx_from, full_idx_to)
 
-        await msg.channel.send(msg.author.mention + " Copied {0} to {1}.".format(" ".join(name_seq_from), " ".join(name_seq_to)))
-        self.spritebot.saveTracker()
-        self.spritebot.changed = True
+            await msg.channel.send(msg.author.mention + " Copied {0} to {1}.".format(" ".join(name_seq_from), " ".join(name_seq_to)))
+            self.spritebot.saveTracker()
+            self.spritebot.changed = True
 
-        await self.spritebot.gitCommit("Copied {0} to {1}".format(" ".join(name_seq_from), " ".join(name_seq_to)))
+            await self.spritebot.gitCommit("Copied {0} to {1}".format(" ".join(name_seq_from), " ".join(name_seq_to)),
+                                            [TrackerUtils.getDirFromIdx(self.spritebot.config.path, self.resource_type, full_idx_from),
+                                            TrackerUtils.getDirFromIdx(self.spritebot.config.path, self.resource_type, full_idx_to)])
@@ -41,7 +41,7 @@ class DeleteGender(BaseCommand):
             return
 
         species_name = TrackerUtils.sanitizeName(args[1])
-        species_idx = TrackerUtils.findSlotIdx(self.spritebot.tracker, species_name)
+        species_idx = self.spritebot.name_index.findSlotIdx(species_name)
         if species_idx is None:
             await msg.channel.send(msg.author.mention + " {0} does not exist!".format(species_name))
             return
@@ -60,6 +60,7 @@ class DeleteGender(BaseCommand):
                 return
 
             TrackerUtils.removeGenderDiff(species_dict.subgroups["0000"], asset_type)
+            self.spritebot.name_index.updateSpecies(species_idx)
             await msg.channel.send(msg.author.mention +
                 " Removed gender difference to #{0:03d}: {1}! ({2})".format(int(species_idx), species_name, asset_type))
         else:
@@ -83,6 +84,7 @@ class DeleteGender(BaseCommand):
                 return
 
             TrackerUtils.removeGenderDiff(form_dict, asset_type)
+            self.spritebot.name_index.updateSpecies(species_idx)
             await msg.channel.send(msg.author.mention +
                 " Removed gender difference to #{0:03d}: {1} {2}! ({3})".format(int(species_idx), species_name, form_name, asset_type))
 
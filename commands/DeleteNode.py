@@ -35,7 +35,7 @@ class DeleteNode(BaseCommand):
             return
 
         species_name = TrackerUtils.sanitizeName(args[0])
-        species_idx = TrackerUtils.findSlotIdx(self.spritebot.tracker, species_name)
+        species_idx = self.spritebot.name_index.findSlotIdx(species_name)
         if species_idx is None:
             await msg.channel.send(msg.author.mention + " {0} does not exist!".format(species_name))
             return
@@ -44,12 +44,14 @@ class DeleteNode(BaseCommand):
         if len(args) == 1:
 
             # check against data population
-            if TrackerUtils.isDataPopulated(species_dict) and msg.author.id != self.spritebot.config.root:
+            if self.spritebot.getSpeciesStats(species_idx).isPopulated() and msg.author.id != self.spritebot.config.root:
                 await msg.channel.send(msg.author.mention + " Can only delete empty slots!")
                 return
 
             TrackerUtils.deleteData(self.spritebot.tracker, os.path.join(self.spritebot.config.path, 'sprite'),
                                        os.path.join(self.spritebot.config.path, 'portrait'), species_idx)
+            # every species after it is shifted down
+            self.spritebot.name_index.rebuild()
 
             await msg.channel.send(msg.author.mention + " Deleted #{0:03d}: {1}!".format(int(species_idx), species_name))
         else:
@@ -68,6 +70,7 @@ class DeleteNode(BaseCommand):
 
             TrackerUtils.deleteData(species_dict.subgroups, os.path.join(self.spritebot.config.path, 'sprite', species_idx),
                                        os.path.join(self.spritebot.config.path, 'portrait', species_idx), form_idx)
+            self.spritebot.name_index.updateSpecies(species_idx)
 
             await msg.channel.send(msg.author.mention + " Deleted #{0:03d}: {1} {2}!".format(int(species_idx), species_name, form_name))
 
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, List, Tuple
+import heapq
 from .BaseCommand import BaseCommand
-import TrackerUtils
 from Constants import PermissionLevel, PHASES
 import discord
 
@@ -50,17 +50,35 @@ class ListBounties(BaseCommand):
                 await msg.channel.send(msg.author.mention + " Use 'sprite' or 'portrait' as argument.")
                 return
 
-        entries: List[Tuple[int, str, str, int]] = []
-        over_dict = TrackerUtils.initSubNode("", True)
-        over_dict.subgroups = self.spritebot.tracker
-
+        asset_types = []
         if include_sprite:
-            self.spritebot.getBountiesFromDict("sprite", over_dict, entries, [])
+            asset_types.append("sprite")
         if include_portrait:
-            self.spritebot.getBountiesFromDict("portrait", over_dict, entries, [])
+            asset_types.append("portrait")
+
+        # only species with bounties are searched, largest first
+        candidates = []
+        for species_idx in self.spritebot.tracker:
+            species_stats = self.spritebot.getSpeciesStats(species_idx)
+            for asset_type in asset_types:
+                if species_stats.max_bounty[asset_type] > 0:
+                    candidates.append((species_stats.max_bounty[asset_type], species_idx, asset_type))
+        candidates.sort(reverse=True)
+
+        # the top 10 so far, smallest first
+        top_entries: List[Tuple[int, str, str, int]] = []
+        for max_bounty, species_idx, asset_type in candidates:
+            if len(top_entries) == 10 and max_bounty < top_entries[0][0]:
+                break
+            species_entries: List[Tuple[int, str, str, int]] = []
+            self.spritebot.getBountiesFromDict(asset_type, self.spritebot.tracker[species_idx], species_entries, [species_idx], [])
+            for entry in species_entries:
+                if len(top_entries) < 10:
+                    heapq.heappush(top_entries, entry)
+                else:
+                    heapq.heappushpop(top_entries, entry)
 
-        entries = sorted(entries, reverse=True)
-        entries = entries[:10]
+        entries = sorted(top_entries, reverse=True)
 
         posts = []
         if include_sprite and include_portrait:
@@ -46,7 +46,7 @@ class ListResource(BaseCommand):
             await msg.channel.send(msg.author.mention + " Specify a Pokemon.")
             return
         name_seq = [TrackerUtils.sanitizeName(args[0])]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
@@ -56,5 +56,5 @@ class ListResource(BaseCommand):
         posts: List[str] = []
         over_dict = TrackerUtils.initSubNode("", True)
         over_dict.subgroups = { full_idx[0] : chosen_node }
-        self.spritebot.getPostsFromDict(self.resource_type == 'sprite', self.resource_type == 'portrait', False, over_dict, posts, [])
+        self.spritebot.getPostsFromDict(self.resource_type == 'sprite', self.resource_type == 'portrait', False, over_dict, posts, [], [])
         msgs_used, changed = await self.spritebot.sendInfoPosts(msg.channel, posts, [], 0)
\ No newline at end of file
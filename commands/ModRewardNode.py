@@ -35,7 +35,7 @@ class ModRewardNode(BaseCommand):
             return
 
         species_name = TrackerUtils.sanitizeName(args[0])
-        species_idx = TrackerUtils.findSlotIdx(self.spritebot.tracker, species_name)
+        species_idx = self.spritebot.name_index.findSlotIdx(species_name)
         if species_idx is None:
             await msg.channel.send(msg.author.mention + " {0} does not exist!".format(species_name))
             return
@@ -70,5 +70,5 @@ class ModRewardNode(BaseCommand):
             else:
                 await msg.channel.send(msg.author.mention + " #{0:03d}: {1} {2}'s rewards will be given automatically. (Including shiny and gender slots)".format(int(species_idx), species_name, form_name))
 
-        self.spritebot.saveTracker()
+        self.spritebot.saveTracker([species_idx])
         self.spritebot.changed = True
\ No newline at end of file
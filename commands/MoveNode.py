@@ -45,7 +45,7 @@ class MoveNode(BaseCommand):
         name_args_to = args[delim_idx+1:]
 
         name_seq_from = [TrackerUtils.sanitizeName(i) for i in name_args_from]
-        full_idx_from = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq_from, 0)
+        full_idx_from = self.spritebot.name_index.findFullTrackerIdx(name_seq_from)
         if full_idx_from is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon specified as source.")
             return
@@ -54,7 +54,7 @@ class MoveNode(BaseCommand):
             return
 
         name_seq_to = [TrackerUtils.sanitizeName(i) for i in name_args_to]
-        full_idx_to = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq_to, 0)
+        full_idx_to = self.spritebot.name_index.findFullTrackerIdx(name_seq_to)
         if full_idx_to is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon specified as destination.")
             return
@@ -62,79 +62,86 @@ class MoveNode(BaseCommand):
             await msg.channel.send(msg.author.mention + " Can move only species or form. Destination specified more than that.")
             return
 
-        chosen_node_from = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_from, 0)
-        chosen_node_to = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_to, 0)
+        async with self.spritebot.node_locks.lock(full_idx_from, full_idx_to):
+            chosen_node_from = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_from, 0)
+            chosen_node_to = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_to, 0)
 
-        if chosen_node_from == chosen_node_to:
-            await msg.channel.send(msg.author.mention + " Cannot move to the same location.")
-            return
-
-        explicit_idx_from = full_idx_from.copy()
-        if len(explicit_idx_from) < 2:
-            explicit_idx_from.append("0000")
-        explicit_idx_to = full_idx_to.copy()
-        if len(explicit_idx_to) < 2:
-            explicit_idx_to.append("0000")
-
-        explicit_node_from = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_from, 0)
-        explicit_node_to = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_to, 0)
-        assert explicit_node_from is not None
-        assert explicit_node_to is not None
-
-        diff_forms_on_same_species = False
-        if len(full_idx_from) == 2 and len(full_idx_to) == 2 and full_idx_from[0] == full_idx_to[0]:
-            diff_forms_on_same_species = True
-
-        if not diff_forms_on_same_species:
-            # check the main nodes
-            try:
-                await self.spritebot.checkMoveLock(full_idx_from, chosen_node_from, full_idx_to, chosen_node_to, "sprite")
-                await self.spritebot.checkMoveLock(full_idx_from, chosen_node_from, full_idx_to, chosen_node_to, "portrait")
-            except SpriteUtils.SpriteVerifyError as e:
-                await msg.channel.send(msg.author.mention + " Cannot move the locked Pokemon specified as source:\n{0}".format(e.message))
+            if chosen_node_from == chosen_node_to:
+                await msg.channel.send(msg.author.mention + " Cannot move to the same location.")
                 return
 
-            try:
-                await self.spritebot.checkMoveLock(full_idx_to, chosen_node_to, full_idx_from, chosen_node_from, "sprite")
-                await self.spritebot.checkMoveLock(full_idx_to, chosen_node_to, full_idx_from, chosen_node_from, "portrait")
-            except SpriteUtils.SpriteVerifyError as e:
-                await msg.channel.send(msg.author.mention + " Cannot move the locked Pokemon specified as destination:\n{0}".format(e.message))
-                return
-
-            # check the subnodes
-            for sub_idx in explicit_node_from.subgroups:
-                sub_node = explicit_node_from.subgroups[sub_idx]
-                if TrackerUtils.hasLock(sub_node, "sprite", True) or TrackerUtils.hasLock(sub_node, "portrait", True):
-                    await msg.channel.send(msg.author.mention + " Cannot move the locked subgroup specified as source.")
-                    return
-            for sub_idx in explicit_node_to.subgroups:
-                sub_node = explicit_node_to.subgroups[sub_idx]
-                if TrackerUtils.hasLock(sub_node, "sprite", True) or TrackerUtils.hasLock(sub_node, "portrait", True):
-                    await msg.channel.send(msg.author.mention + " Cannot move the locked subgroup specified as destination.")
+            explicit_idx_from = full_idx_from.copy()
+            if len(explicit_idx_from) < 2:
+                explicit_idx_from.append("0000")
+            explicit_idx_to = full_idx_to.copy()
+            if len(explicit_idx_to) < 2:
+                explicit_idx_to.append("0000")
+
+            explicit_node_from = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_from, 0)
+            explicit_node_to = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_to, 0)
+            assert explicit_node_from is not None
+            assert explicit_node_to is not None
+
+            diff_forms_on_same_species = False
+            if len(full_idx_from) == 2 and len(full_idx_to) == 2 and full_idx_from[0] == full_idx_to[0]:
+                diff_forms_on_same_species = True
+
+            if not diff_forms_on_same_species:
+                # check the main nodes
+                try:
+                    await self.spritebot.checkMoveLock(full_idx_from, chosen_node_from, full_idx_to, chosen_node_to, "sprite")
+                    await self.spritebot.checkMoveLock(full_idx_from, chosen_node_from, full_idx_to, chosen_node_to, "portrait")
+                except SpriteUtils.SpriteVerifyError as e:
+                    await msg.channel.send(msg.author.mention + " Cannot move the locked Pokemon specified as source:\n{0}".format(e.message))
                     return
 
-        # clear caches
-        TrackerUtils.clearCache(chosen_node_from, True)
-        TrackerUtils.clearCache(chosen_node_to, True)
-
-        # perform the swap
-        TrackerUtils.swapFolderPaths(self.spritebot.config.path, self.spritebot.tracker, "sprite", full_idx_from, full_idx_to)
-        TrackerUtils.swapFolderPaths(self.spritebot.config.path, self.spritebot.tracker, "portrait", full_idx_from, full_idx_to)
-        TrackerUtils.swapNodeMiscFeatures(chosen_node_from, chosen_node_to)
-
-        # then, swap the subnodes
-        TrackerUtils.swapAllSubNodes(self.spritebot.config.path, self.spritebot.tracker, explicit_idx_from, explicit_idx_to)
-
-        await msg.channel.send(msg.author.mention + " Swapped {0} with {1}.".format(" ".join(name_seq_from), " ".join(name_seq_to)))
-        # if the source is empty in sprite and portrait, and its subunits are empty in sprite and portrait
-        # remind to delete
-        server_config = self.spritebot.config.servers[str(msg.guild.id)]
-        if not TrackerUtils.isDataPopulated(chosen_node_from):
-            await msg.channel.send(msg.author.mention + " {0} is now empty. Use `{1}delete` if it is no longer needed.".format(" ".join(name_seq_to), server_config.prefix))
-        if not TrackerUtils.isDataPopulated(chosen_node_to):
-            await msg.channel.send(msg.author.mention + " {0} is now empty. Use `{1}delete` if it is no longer needed.".format(" ".join(name_seq_from), server_config.prefix))
-
-        self.spritebot.saveTracker()
-        self.spritebot.changed = True
+                try:
+                    await self.spritebot.checkMoveLock(full_idx_to, chosen_node_to, full_idx_from, chosen_node_from, "sprite")
+                    await self.spritebot.checkMoveLock(full_idx_to, chosen_node_to, full_idx_from, chosen_node_from, "portrait")
+                except SpriteUtils.SpriteVerifyError as e:
+                    await msg.channel.send(msg.author.mention + " Cannot move the locked Pokemon specified as destination:\n{0}".format(e.message))
+                    return
 
-        await self.spritebot.gitCommit("Swapped {0} with {1} recursively".format(" ".join(name_seq_from), " ".join(name_seq_to)))
\ No newline at end of file
+                # check the subnodes
+                for sub_idx in explicit_node_from.subgroups:
+                    sub_node = explicit_node_from.subgroups[sub_idx]
+                    if TrackerUtils.hasLock(sub_node, "sprite", True) or TrackerUtils.hasLock(sub_node, "portrait", True):
+                        await msg.channel.send(msg.author.mention + " Cannot move the locked subgroup specified as source.")
+                        return
+                for sub_idx in explicit_node_to.subgroups:
+                    sub_node = explicit_node_to.subgroups[sub_idx]
+                    if TrackerUtils.hasLock(sub_node, "sprite", True) or TrackerUtils.hasLock(sub_node, "portrait", True):
+                        await msg.channel.send(msg.author.mention + " Cannot move the locked subgroup specified as destination.")
+                        return
+
+            # clear caches
+            TrackerUtils.clearCache(chosen_node_from, True)
+            TrackerUtils.clearCache(chosen_node_to, True)
+
+            # perform the swap
+            TrackerUtils.swapFolderPaths(self.spritebot.config.path, self.spritebot.tracker, "sprite", full_idx_from, full_idx_to)
+            TrackerUtils.swapFolderPaths(self.spritebot.config.path, self.spritebot.tracker, "portrait", full_idx_from, full_idx_to)
+            TrackerUtils.swapNodeMiscFeatures(chosen_node_from, chosen_node_to)
+
+            # then, swap the subnodes
+            TrackerUtils.swapAllSubNodes(self.spritebot.config.path, self.spritebot.tracker, explicit_idx_from, explicit_idx_to)
+            self.spritebot.name_index.updateSpecies(full_idx_from[0])
+            self.spritebot.name_index.updateSpecies(full_idx_to[0])
+
+            await msg.channel.send(msg.author.mention + " Swapped {0} with {1}.".format(" ".join(name_seq_from), " ".join(name_seq_to)))
+            # if the source is empty in sprite and portrait, and its subunits are empty in sprite and portrait
+            # remind to delete
+            server_config = self.spritebot.config.servers[str(msg.guild.id)]
+            if not TrackerUtils.isDataPopulated(chosen_node_from):
+                await msg.channel.send(msg.author.mention + " {0} is now empty. Use `{1}delete` if it is no longer needed.".format(" ".join(name_seq_to), server_config.prefix))
+            if not TrackerUtils.isDataPopulated(chosen_node_to):
+                await msg.channel.send(msg.author.mention + " {0} is now empty. Use `{1}delete` if it is no longer needed.".format(" ".join(name_seq_from), server_config.prefix))
+
+            self.spritebot.saveTracker()
+            self.spritebot.changed = True
+
+            changed_paths = []
+            for asset_type in ["sprite", "portrait"]:
+                changed_paths.append(TrackerUtils.getDirFromIdx(self.spritebot.config.path, asset_type, full_idx_from))
+                changed_paths.append(TrackerUtils.getDirFromIdx(self.spritebot.config.path, asset_type, full_idx_to))
+            await self.spritebot.gitCommit("Swapped {0} with {1} recursively".format(" ".join(name_seq_from), " ".join(name_seq_to)), changed_paths)
\ No newline at end of file
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, List
 from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import TrackerUtils
+from utils import unpack_optional
 import discord
 import io
 
@@ -73,14 +74,14 @@ class QueryResourceCredit(BaseCommand):
             await msg.channel.send(msg.author.mention + " Specify a Pokemon.")
             return
         name_seq = [TrackerUtils.sanitizeName(i) for i in args]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
 
-        chosen_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0)
+        chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0))
 
-        if chosen_node.__dict__[self.resource_type + "_credit"].primary == "":
+        if chosen_node[self.resource_type + "_credit"].primary == "":
             await msg.channel.send(msg.author.mention + " No credit found.")
             return
 
@@ -74,7 +74,7 @@ class QueryResourceStatus(BaseCommand):
             await msg.channel.send(msg.author.mention + " Specify a Pokemon.")
             return
         name_seq = [TrackerUtils.sanitizeName(i) for i in args]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
@@ -91,8 +91,8 @@ class QueryResourceStatus(BaseCommand):
         status = TrackerUtils.getStatusEmoji(chosen_node, self.resource_type)
         response += "{0} #{1:03d}: {2}".format(status, int(full_idx[0]), " ".join(name_seq))
 
-        if chosen_node.__dict__[self.resource_type + "_required"]:
-            file_exists = chosen_node.__dict__[self.resource_type + "_credit"].primary != ""
+        if chosen_node[self.resource_type + "_required"]:
+            file_exists = chosen_node[self.resource_type + "_credit"].primary != ""
             if not file_exists and self.is_derivation:
                 if recolor_shiny:
                     response += " doesn't have a {0}. Submit it first.".format(self.resource_type)
@@ -102,7 +102,7 @@ class QueryResourceStatus(BaseCommand):
                 if not file_exists:
                     response += "\n [This {0} is missing. If you want to submit, use this file as a template!]".format(self.resource_type)
                 else:
-                    credit = chosen_node.__dict__[self.resource_type + "_credit"]
+                    credit = chosen_node[self.resource_type + "_credit"]
                     base_credit = None
                     response += "\n" + self.spritebot.createCreditBlock(credit, base_credit)
                     if len(credit.secondary) + 1 < credit.total:
@@ -112,13 +112,13 @@ class QueryResourceStatus(BaseCommand):
                 chosen_link = await self.spritebot.retrieveLinkMsg(full_idx, chosen_node, self.resource_type, self.is_derivation)
                 response += "\n" + chosen_link
 
-            next_phase = chosen_node.__dict__[self.resource_type + "_complete"] + 1
+            next_phase = chosen_node[self.resource_type + "_complete"] + 1
 
-            if str(next_phase) in chosen_node.__dict__[self.resource_type + "_bounty"]:
-                bounty = chosen_node.__dict__[self.resource_type + "_bounty"][str(next_phase)]
+            if str(next_phase) in chosen_node[self.resource_type + "_bounty"]:
+                bounty = chosen_node[self.resource_type + "_bounty"][str(next_phase)]
                 if bounty > 0:
                     response += "\n This {0} has a bounty of **{1}GP**, paid out when it becomes {2}".format(self.resource_type, bounty, PHASES[next_phase].title())
-            if chosen_node.modreward and chosen_node.__dict__[self.resource_type + "_complete"] == TrackerUtils.PHASE_INCOMPLETE:
+            if chosen_node.modreward and chosen_node[self.resource_type + "_complete"] == TrackerUtils.PHASE_INCOMPLETE:
                 response += "\n The reward for this {0} will be decided by approvers.".format(self.resource_type)
         else:
             response += " does not need a {0}.".format(self.resource_type)
@@ -35,7 +35,7 @@ class RenameNode(BaseCommand):
 
         species_name = TrackerUtils.sanitizeName(args[0])
         new_name = TrackerUtils.sanitizeName(args[-1])
-        species_idx = TrackerUtils.findSlotIdx(self.spritebot.tracker, species_name)
+        species_idx = self.spritebot.name_index.findSlotIdx(species_name)
         if species_idx is None:
             await msg.channel.send(msg.author.mention + " {0} does not exist!".format(species_name))
             return
@@ -43,12 +43,13 @@ class RenameNode(BaseCommand):
         species_dict = self.spritebot.tracker[species_idx]
 
         if len(args) == 2:
-            new_species_idx = TrackerUtils.findSlotIdx(self.spritebot.tracker, new_name)
+            new_species_idx = self.spritebot.name_index.findSlotIdx(new_name)
             if new_species_idx is not None:
                 await msg.channel.send(msg.author.mention + " #{0:03d}: {1} already exists!".format(int(new_species_idx), new_name))
                 return
 
             species_dict.name = new_name
+            self.spritebot.name_index.updateSpecies(species_idx)
             await msg.channel.send(msg.author.mention + " Changed #{0:03d}: {1} to {2}!".format(int(species_idx), species_name, new_name))
         else:
 
@@ -65,6 +66,7 @@ class RenameNode(BaseCommand):
 
             form_dict = species_dict.subgroups[form_idx]
             form_dict.name = new_name
+            self.spritebot.name_index.updateSpecies(species_idx)
 
             await msg.channel.send(msg.author.mention + " Changed {2} to {3} in #{0:03d}: {1}!".format(int(species_idx), species_name, form_name, new_name))
 
@@ -3,6 +3,7 @@ from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import discord
 import TrackerUtils
+from utils import unpack_optional
 import SpriteUtils
 
 if TYPE_CHECKING:
@@ -43,56 +44,59 @@ class ReplaceResource(BaseCommand):
         name_args_to = args[delim_idx+1:]
 
         name_seq_from = [TrackerUtils.sanitizeName(i) for i in name_args_from]
-        full_idx_from = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq_from, 0)
+        full_idx_from = self.spritebot.name_index.findFullTrackerIdx(name_seq_from)
         if full_idx_from is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon specified as source.")
             return
 
         name_seq_to = [TrackerUtils.sanitizeName(i) for i in name_args_to]
-        full_idx_to = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq_to, 0)
+        full_idx_to = self.spritebot.name_index.findFullTrackerIdx(name_seq_to)
         if full_idx_to is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon specified as destination.")
             return
 
-        chosen_node_from = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_from, 0)
-        chosen_node_to = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_to, 0)
+        async with self.spritebot.node_locks.lock(full_idx_from, full_idx_to):
+            chosen_node_from = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_from, 0))
+            chosen_node_to = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx_to, 0))
 
-        if chosen_node_from == chosen_node_to:
-            await msg.channel.send(msg.author.mention + " Cannot move to the same location.")
-            return
+            if chosen_node_from == chosen_node_to:
+                await msg.channel.send(msg.author.mention + " Cannot move to the same location.")
+                return
 
-        if not chosen_node_from.__dict__[self.resource_type + "_required"]:
-            await msg.channel.send(msg.author.mention + " Cannot move when source {0} is unneeded.".format(self.resource_type))
-            return
-        if not chosen_node_to.__dict__[self.resource_type + "_required"]:
-            await msg.channel.send(msg.author.mention + " Cannot move when destination {0} is unneeded.".format(self.resource_type))
-            return
+            if not chosen_node_from[self.resource_type + "_required"]:
+                await msg.channel.send(msg.author.mention + " Cannot move when source {0} is unneeded.".format(self.resource_type))
+                return
+            if not chosen_node_to[self.resource_type + "_required"]:
+                await msg.channel.send(msg.author.mention + " Cannot move when destination {0} is unneeded.".format(self.resource_type))
+                return
 
-        try:
-            await self.spritebot.checkMoveLock(full_idx_from, chosen_node_from, full_idx_to, chosen_node_to, self.resource_type)
-        except SpriteUtils.SpriteVerifyError as e:
-            await msg.channel.send(msg.author.mention + " Cannot move out the locked Pokemon specified as source:\n{0}".format(e.message))
-            return
+            try:
+                await self.spritebot.checkMoveLock(full_idx_from, chosen_node_from, full_idx_to, chosen_node_to, self.resource_type)
+            except SpriteUtils.SpriteVerifyError as e:
+                await msg.channel.send(msg.author.mention + " Cannot move out the locked Pokemon specified as source:\n{0}".format(e.message))
+                return
 
-        try:
-            await self.spritebot.checkMoveLock(full_idx_to, chosen_node_to, full_idx_from, chosen_node_from, self.resource_type)
-        except SpriteUtils.SpriteVerifyError as e:
-            await msg.channel.send(msg.author.mention + " Cannot replace the locked Pokemon specified as destination:\n{0}".format(e.message))
-            return
+            try:
+                await self.spritebot.checkMoveLock(full_idx_to, chosen_node_to, full_idx_from, chosen_node_from, self.resource_type)
+            except SpriteUtils.SpriteVerifyError as e:
+                await msg.channel.send(msg.author.mention + " Cannot replace the locked Pokemon specified as destination:\n{0}".format(e.message))
+                return
 
-        # clear caches
-        TrackerUtils.clearCache(chosen_node_from, True)
-        TrackerUtils.clearCache(chosen_node_to, True)
+            # clear caches
+            TrackerUtils.clearCache(chosen_node_from, True)
+            TrackerUtils.clearCache(chosen_node_to, True)
 
-        TrackerUtils.replaceFolderPaths(self.spritebot.config.path, self.spritebot.tracker, self.resource_type, full_idx_from, full_idx_to)
+            TrackerUtils.replaceFolderPaths(self.spritebot.config.path, self.spritebot.tracker, self.resource_type, full_idx_from, full_idx_to)
 
-        await msg.channel.send(msg.author.mention + " Replaced {0} with {1}.".format(" ".join(name_seq_to), " ".join(name_seq_from)))
-        # if the source is empty in sprite and portrait, and its subunits are empty in sprite and portrait
-        # remind to delete
-        server_config = self.spritebot.config.servers[str(msg.guild.id)]
-        await msg.channel.send(msg.author.mention + " {0} is now empty. Use `{1}delete` if it is no longer needed.".format(" ".join(name_seq_from), server_config.prefix))
+            await msg.channel.send(msg.author.mention + " Replaced {0} with {1}.".format(" ".join(name_seq_to), " ".join(name_seq_from)))
+            # if the source is empty in sprite and portrait, and its subunits are empty in sprite and portrait
+            # remind to delete
+            server_config = self.spritebot.config.servers[str(msg.guild.id)]
+            await msg.channel.send(msg.author.mention + " {0} is now empty. Use `{1}delete` if it is no longer needed.".format(" ".join(name_seq_from), server_config.prefix))
 
-        self.spritebot.saveTracker()
-        self.spritebot.changed = True
+            self.spritebot.saveTracker()
+            self.spritebot.changed = True
 
-        await self.spritebot.gitCommit("Replaced {0} with {1}".format(" ".join(name_seq_to), " ".join(name_seq_from)))
\ No newline at end of file
+            await self.spritebot.gitCommit("Replaced {0} with {1}".format(" ".join(name_seq_to), " ".join(name_seq_from)),
+                                            [TrackerUtils.getDirFromIdx(self.spritebot.config.path, self.resource_type, full_idx_from),
+                                            TrackerUtils.getDirFromIdx(self.spritebot.config.path, self.resource_type, full_idx_to)])
\ No newline at end of file
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, List
 from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import TrackerUtils
+from utils import unpack_optional
 import discord
 
 if TYPE_CHECKING:
@@ -58,17 +59,17 @@ class SetNeedNode(BaseCommand):
             return
 
         name_seq = [TrackerUtils.sanitizeName(i) for i in args[1:]]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
-        chosen_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0)
-        chosen_node.__dict__[asset_type + "_required"] = self.needed
+        chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0))
+        chosen_node[asset_type + "_required"] = self.needed
 
         if self.needed:
             await msg.channel.send(msg.author.mention + " {0} {1} is now needed.".format(asset_type, " ".join(name_seq)))
         else:
             await msg.channel.send(msg.author.mention + " {0} {1} is no longer needed.".format(asset_type, " ".join(name_seq)))
 
-        self.spritebot.saveTracker()
+        self.spritebot.saveTracker(full_idx)
         self.spritebot.changed = True
\ No newline at end of file
@@ -42,7 +42,7 @@ class SetNodeCanon(BaseCommand):
     
     async def executeCommand(self, msg: discord.Message, args: List[str]):
         name_seq = [TrackerUtils.sanitizeName(i) for i in args]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
@@ -57,5 +57,5 @@ class SetNodeCanon(BaseCommand):
         # set to complete
         await msg.channel.send(msg.author.mention + " {0} is now {1}.".format(" ".join(name_seq), self.getCanonOrUncanon()))
 
-        self.spritebot.saveTracker()
+        self.spritebot.saveTracker(full_idx)
         self.spritebot.changed = True
\ No newline at end of file
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, List
 from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import TrackerUtils
+from utils import unpack_optional
 import discord
 from Constants import PHASES
 
@@ -75,26 +76,26 @@ class SetResourceCompletion(BaseCommand):
 
     async def executeCommand(self, msg: discord.Message, args: List[str]):
         name_seq = [TrackerUtils.sanitizeName(i) for i in args]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
-        chosen_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0)
+        chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0))
 
         phase_str = PHASES[self.completion]
 
         # if the node has no credit, fail
-        if chosen_node.__dict__[self.resource_type + "_credit"].primary == "" and self.completion > TrackerUtils.PHASE_INCOMPLETE:
+        if chosen_node[self.resource_type + "_credit"].primary == "" and self.completion > TrackerUtils.PHASE_INCOMPLETE:
             status = TrackerUtils.getStatusEmoji(chosen_node, self.resource_type)
             await msg.channel.send(msg.author.mention +
                                    " {0} #{1:03d}: {2} has no data and cannot be marked {3}.".format(status, int(full_idx[0]), " ".join(name_seq), phase_str))
             return
 
         # set to complete
-        chosen_node.__dict__[self.resource_type + "_complete"] = self.completion
+        chosen_node[self.resource_type + "_complete"] = self.completion
 
         status = TrackerUtils.getStatusEmoji(chosen_node, self.resource_type)
         await msg.channel.send(msg.author.mention + " {0} #{1:03d}: {2} marked as {3}.".format(status, int(full_idx[0]), " ".join(name_seq), phase_str))
 
-        self.spritebot.saveTracker()
+        self.spritebot.saveTracker(full_idx)
         self.spritebot.changed = True
\ No newline at end of file
@@ -3,6 +3,7 @@ from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import discord
 import TrackerUtils
+from utils import unpack_optional
 
 if TYPE_CHECKING:
     from SpriteBot import SpriteBot, BotServer
@@ -47,14 +48,14 @@ class SetResourceCredit(BaseCommand):
 
         wanted_author = self.spritebot.getFormattedCredit(args[0])
         name_seq = [TrackerUtils.sanitizeName(i) for i in args[1:]]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
 
-        chosen_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0)
+        chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0))
 
-        if chosen_node.__dict__[self.resource_type + "_credit"].primary == "":
+        if chosen_node[self.resource_type + "_credit"].primary == "":
             await msg.channel.send(msg.author.mention + " No credit found.")
             return
         gen_path = TrackerUtils.getDirFromIdx(self.spritebot.config.path, self.resource_type, full_idx)
@@ -66,7 +67,7 @@ class SetResourceCredit(BaseCommand):
             return
 
         # make the credit array into the most current author by itself
-        credit_data = chosen_node.__dict__[self.resource_type + "_credit"]
+        credit_data = chosen_node[self.resource_type + "_credit"]
         if credit_data.primary == "CHUNSOFT":
             await msg.channel.send(msg.author.mention + " Cannot reset credit for a CHUNSOFT {0}.".format(self.resource_type))
             return
@@ -76,5 +77,5 @@ class SetResourceCredit(BaseCommand):
 
         await msg.channel.send(msg.author.mention + " Credit display has been reset for {0} {1}:\n{2}".format(self.resource_type, " ".join(name_seq), self.spritebot.createCreditBlock(credit_data, None)))
 
-        self.spritebot.saveTracker()
+        self.spritebot.saveTracker(full_idx)
         self.spritebot.changed = True
\ No newline at end of file
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, List
 from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import TrackerUtils
+from utils import unpack_optional
 import discord
 
 if TYPE_CHECKING:
@@ -60,11 +61,11 @@ class SetResourceLock(BaseCommand):
     
     async def executeCommand(self, msg: discord.Message, args: List[str]):
         name_seq = [TrackerUtils.sanitizeName(i) for i in args[:-1]]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
-        chosen_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0)
+        chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0))
 
         final_file_names, failed_file_names = self.spritebot.parseFileNames(chosen_node, self.resource_type, args[-1])
 
@@ -73,7 +74,7 @@ class SetResourceLock(BaseCommand):
             return
 
         for file_name in final_file_names:
-            chosen_node.__dict__[self.resource_type + "_files"][file_name] = self.lock
+            chosen_node[self.resource_type + "_files"][file_name] = self.lock
 
         status = TrackerUtils.getStatusEmoji(chosen_node, self.resource_type)
 
@@ -83,5 +84,5 @@ class SetResourceLock(BaseCommand):
         # set to complete
         await msg.channel.send(msg.author.mention + " {0} #{1:03d}: {2} {3} is now {4}.".format(status, int(full_idx[0]), " ".join(name_seq), ",".join(final_file_names), lock_str))
 
-        self.spritebot.saveTracker()
+        self.spritebot.saveTracker(full_idx)
         self.spritebot.changed = True
\ No newline at end of file
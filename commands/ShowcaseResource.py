@@ -3,6 +3,7 @@ from .BaseCommand import BaseCommand
 from Constants import PermissionLevel
 import discord
 import TrackerUtils
+from utils import unpack_optional
 import Constants
 
 if TYPE_CHECKING:
@@ -56,23 +57,23 @@ class ShowcaseResource(BaseCommand):
             asset_type = "portrait"
 
         name_seq = [TrackerUtils.sanitizeName(i) for i in args]
-        full_idx = TrackerUtils.findFullTrackerIdx(self.spritebot.tracker, name_seq, 0)
+        full_idx = self.spritebot.name_index.findFullTrackerIdx(name_seq)
         if full_idx is None:
             await msg.channel.send(msg.author.mention + " No such Pokemon.")
             return
-        chosen_node = TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0)
+        chosen_node = unpack_optional(TrackerUtils.getNodeFromIdx(self.spritebot.tracker, full_idx, 0))
 
         if asset_type == "sprite":
-            for k in chosen_node.__dict__[asset_type + "_files"]:
+            for k in chosen_node[asset_type + "_files"]:
                 if file_name.lower() == k.lower():
                     file_name = k
                     break
 
-            if file_name not in chosen_node.__dict__[asset_type + "_files"]:
+            if file_name not in chosen_node[asset_type + "_files"]:
                 await msg.channel.send(msg.author.mention + " Specify a Pokemon and an existing emotion/animation.")
                 return
 
-        credit_data = chosen_node.__dict__[asset_type + "_credit"]
+        credit_data = chosen_node[asset_type + "_credit"]
 
         urls = await self.spritebot.postSocialMedia(full_idx, asset_type, "Showcased",
                                           self.spritebot.createCreditBlock(credit_data, None, True), file_name)
@@ -0,0 +1,65 @@
+import unittest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import aiohttp
+import SpriteUtils
+
+
+class TestLinks(unittest.IsolatedAsyncioTestCase):
+    """
+    Link downloads against a local stand-in for the attachment server.
+    """
+    async def asyncSetUp(self):
+        async def sendFile(request):
+            return web.Response(body=b"x" * 1000)
+
+        async def sendStream(request):
+            # no content length, so the size can only be checked while reading
+            response = web.StreamResponse()
+            await response.prepare(request)
+            for _ in range(10):
+                await response.write(b"x" * 1000)
+            await response.write_eof()
+            return response
+
+        app = web.Application()
+        app.router.add_get("/file.zip", sendFile)
+        app.router.add_get("/stream.zip", sendStream)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await SpriteUtils.closeHttpSession()
+        await self.server.close()
+
+    def getUrl(self, path):
+        return str(self.server.make_url(path))
+
+    async def test_read_link(self):
+        data = await SpriteUtils.readLink(self.getUrl("/file.zip"))
+        self.assertEqual(b"x" * 1000, data)
+        data = await SpriteUtils.readLink(self.getUrl("/stream.zip"))
+        self.assertEqual(b"x" * 10000, data)
+
+    async def test_read_link_over_limit(self):
+        with self.assertRaises(SpriteUtils.SpriteVerifyError):
+            await SpriteUtils.readLink(self.getUrl("/file.zip"), 999)
+        with self.assertRaises(SpriteUtils.SpriteVerifyError):
+            await SpriteUtils.readLink(self.getUrl("/stream.zip"), 5000)
+
+    async def test_read_link_missing(self):
+        with self.assertRaises(aiohttp.ClientResponseError):
+            await SpriteUtils.readLink(self.getUrl("/missing.zip"))
+
+    async def test_link_file(self):
+        self.assertTrue(await SpriteUtils.testLinkFile(self.getUrl("/file.zip")))
+        self.assertFalse(await SpriteUtils.testLinkFile(self.getUrl("/missing.zip")))
+
+    async def test_shared_session(self):
+        session = SpriteUtils.getHttpSession()
+        await SpriteUtils.readLink(self.getUrl("/file.zip"))
+        self.assertIs(session, SpriteUtils.getHttpSession())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,7 +14,10 @@
 #
 #  You should have received a copy of the GNU General Public License
 #  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+import hashlib
 from typing import List, Set, Dict, Tuple, Optional, TypeVar
+import numpy as np
+from PIL import Image
 
 class MultipleOffsetError(Exception):
     def __init__(self, message):
@@ -55,26 +58,95 @@ def addLoc(loc1: Tuple[int, int], loc2: Tuple[int, int], sub: bool = False):
     return (loc1[0] + loc2[0] * mult, loc1[1] + loc2[1] * mult)
 
 
+def getImgArray(img) -> np.ndarray:
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    return np.asarray(img)
+
+
+def getArrayBounds(alpha: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    occupied = alpha != 0
+    cols = np.flatnonzero(occupied.any(axis=0))
+    if len(cols) == 0:
+        return None
+    rows = np.flatnonzero(occupied.any(axis=1))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
 def getCoveredBounds(inImg, max_box: Optional[Tuple[int, int, int, int]] = None):
     if max_box is None:
         max_box = (0, 0, inImg.size[0], inImg.size[1])
-    minX, minY = inImg.size
-    maxX = -1
-    maxY = -1
-    datas = inImg.getdata()
-    for i in range(max_box[0], max_box[2]):
-        for j in range(max_box[1], max_box[3]):
-            if datas[i + j * inImg.size[0]][3] != 0:
-                if i < minX:
-                    minX = i
-                if i > maxX:
-                    maxX = i
-                if j < minY:
-                    minY = j
-                if j > maxY:
-                    maxY = j
-    abs_bounds = (minX, minY, maxX + 1, maxY + 1)
-    return addToBounds(abs_bounds, (max_box[0], max_box[1]), True)
+    tile = getImgArray(inImg.crop(max_box))
+    bounds = getArrayBounds(tile[:, :, 3])
+    if bounds is None:
+        # nothing covered; keep the inverted bounds callers check for
+        abs_bounds = (inImg.size[0], inImg.size[1], 0, 0)
+        return addToBounds(abs_bounds, (max_box[0], max_box[1]), True)
+    return bounds
+
+
+def getTileBounds(arr: np.ndarray, tile_size: Tuple[int, int]) -> List[List[Tuple[int, int, int, int]]]:
+    """
+    Covered bounds of every tile in a sheet array, indexed [row][col].
+    Matches getCoveredBounds called on each tile, including the inverted bounds of empty tiles.
+    """
+    height, width = arr.shape[0], arr.shape[1]
+    tile_w, tile_h = tile_size
+    rows = height // tile_h
+    cols = width // tile_w
+    occupied = (arr[:rows * tile_h, :cols * tile_w, 3] != 0).reshape(rows, tile_h, cols, tile_w)
+    x_occupied = occupied.any(axis=1)
+    y_occupied = occupied.any(axis=3).transpose(0, 2, 1)
+    filled = x_occupied.any(axis=2)
+    min_x = x_occupied.argmax(axis=2)
+    max_x = tile_w - x_occupied[:, :, ::-1].argmax(axis=2)
+    min_y = y_occupied.argmax(axis=2)
+    max_y = tile_h - y_occupied[:, :, ::-1].argmax(axis=2)
+
+    tile_bounds = []
+    for yy in range(rows):
+        row_bounds = []
+        for xx in range(cols):
+            if filled[yy, xx]:
+                row_bounds.append((int(min_x[yy, xx]), int(min_y[yy, xx]), int(max_x[yy, xx]), int(max_y[yy, xx])))
+            else:
+                row_bounds.append((width - xx * tile_w, height - yy * tile_h, -xx * tile_w, -yy * tile_h))
+        tile_bounds.append(row_bounds)
+    return tile_bounds
+
+
+def getRoguePixels(arr: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Semi-transparent pixel positions in column-major order.
+    """
+    alpha = arr[:, :, 3]
+    xs, ys = np.nonzero(((alpha > 0) & (alpha < 255)).T)
+    return list(zip(xs.tolist(), ys.tolist()))
+
+
+def getPackedColors(arr: np.ndarray) -> np.ndarray:
+    """
+    Each RGBA pixel of the array as one uint32, for comparing and sorting colors as a whole.
+    """
+    return np.ascontiguousarray(arr).view(np.uint32)[..., 0]
+
+
+def unpackColors(packed: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    channels = np.ascontiguousarray(packed, dtype=np.uint32).view(np.uint8).reshape(-1, 4).tolist()
+    return [(color[0], color[1], color[2], color[3]) for color in channels]
+
+
+def addArrayToPalette(palette: Dict[Tuple[int, int, int, int], int], arr: np.ndarray):
+    """
+    Adds the counts of all fully opaque colors in the array to the palette.
+    """
+    opaque = np.ascontiguousarray(arr[arr[:, :, 3] == 255])
+    colors, counts = np.unique(opaque.view(np.uint32), return_counts=True)
+    for channels, count in zip(colors.view(np.uint8).reshape(-1, 4).tolist(), counts.tolist()):
+        color: Tuple[int, int, int, int] = (channels[0], channels[1], channels[2], channels[3])
+        if color not in palette:
+            palette[color] = 0
+        palette[color] += count
 
 
 def addToPalette(palette, img):
@@ -85,62 +157,83 @@ def addToPalette(palette, img):
 
 
 def getOffsetFromRGB(img, bounds: Tuple[int, int, int, int], black: bool, r: bool, g: bool, b: bool, white: bool):
-    datas = img.getdata()
+    return getOffsetFromArray(getImgArray(img.crop(bounds)), bounds, black, r, g, b, white)
+
+
+def getOffsetFromArray(tile: np.ndarray, bounds: Tuple[int, int, int, int], black: bool, r: bool, g: bool, b: bool, white: bool):
+    """
+    Finds the offset pixels of a tile already cut out of its sheet at bounds.
+    Only the pixels that can affect the result are visited, in the same column-major order as a full scan.
+    """
+    rgb = tile[:, :, :3]
+    is_max = rgb == 255
+    candidates = is_max.all(axis=2)
+    if black:
+        candidates |= (rgb == 0).all(axis=2)
+    if r:
+        candidates |= is_max[:, :, 0]
+    if g:
+        candidates |= is_max[:, :, 1]
+    if b:
+        candidates |= is_max[:, :, 2]
+    candidates &= tile[:, :, 3] == 255
+    xs, ys = np.nonzero(candidates.T)
+    colors = tile[ys, xs].tolist()
+
     results: List[Optional[Tuple[int, int]]] = [None] * 5
-    for i in range(bounds[0], bounds[2]):
-        for j in range(bounds[1], bounds[3]):
-            color = datas[i + j * img.size[0]]
-            if color[3] == 255:
-                if color[0] == 255 and color[1] == 255 and color[2] == 255:
-                    if white:
-                        if results[4] is None:
-                            results[4] = (i - bounds[0], j - bounds[1])
-                        else:
-                            raise MultipleOffsetError("Second white pixel found at {0} when already found at {1} when searching for offsets!".format((i, j), (results[4][0] + bounds[0], results[4][1] + bounds[1])))
-                    else:
-                        if results[1] is None and results[2] is None and results[3] is None:
-                            if results[0] is None:
-                                results[0] = (i - bounds[0], j - bounds[1])
-                            # otherwise, black may already be chosen.  and just leave it alone
-
-                            results[1] = (i - bounds[0], j - bounds[1])
-                            results[2] = (i - bounds[0], j - bounds[1])
-                            results[3] = (i - bounds[0], j - bounds[1])
-                        else:
-                            existing_px = []
-                            if results[0] is not None:
-                                existing_px.append((results[0][0] + bounds[0], results[0][1] + bounds[1]))
-                            if results[1] is not None:
-                                existing_px.append((results[0][1] + bounds[0], results[1][1] + bounds[1])) # type: ignore
-                            if results[2] is not None:
-                                existing_px.append((results[0][2] + bounds[0], results[2][1] + bounds[1])) # type: ignore
-                            if results[3] is not None:
-                                existing_px.append((results[0][3] + bounds[0], results[3][1] + bounds[1])) # type: ignore
-                            raise MultipleOffsetError("White pixel found at {0} when r/g/b pixel already found at {1} when searching for offsets!".format((i, j), existing_px))
+    for x, y, color in zip(xs.tolist(), ys.tolist(), colors):
+        i = x + bounds[0]
+        j = y + bounds[1]
+        if color[0] == 255 and color[1] == 255 and color[2] == 255:
+            if white:
+                if results[4] is None:
+                    results[4] = (i - bounds[0], j - bounds[1])
+                else:
+                    raise MultipleOffsetError("Second white pixel found at {0} when already found at {1} when searching for offsets!".format((i, j), (results[4][0] + bounds[0], results[4][1] + bounds[1])))
+            else:
+                if results[1] is None and results[2] is None and results[3] is None:
+                    if results[0] is None:
+                        results[0] = (i - bounds[0], j - bounds[1])
+                    # otherwise, black may already be chosen.  and just leave it alone
+
+                    results[1] = (i - bounds[0], j - bounds[1])
+                    results[2] = (i - bounds[0], j - bounds[1])
+                    results[3] = (i - bounds[0], j - bounds[1])
+                else:
+                    existing_px = []
+                    if results[0] is not None:
+                        existing_px.append((results[0][0] + bounds[0], results[0][1] + bounds[1]))
+                    if results[1] is not None:
+                        existing_px.append((results[0][1] + bounds[0], results[1][1] + bounds[1])) # type: ignore
+                    if results[2] is not None:
+                        existing_px.append((results[0][2] + bounds[0], results[2][1] + bounds[1])) # type: ignore
+                    if results[3] is not None:
+                        existing_px.append((results[0][3] + bounds[0], results[3][1] + bounds[1])) # type: ignore
+                    raise MultipleOffsetError("White pixel found at {0} when r/g/b pixel already found at {1} when searching for offsets!".format((i, j), existing_px))
+        else:
+            if black and color[0] == 0 and color[1] == 0 and color[2] == 0:
+                # there is one exception: black and white can coexist
+                # so if black offset already exists, but it was read as part of a white pixel,
+                # correct it to this black pixel
+                if results[0] is None or results[0] == results[1] and results[1] == results[2] and results[2] == results[3]:
+                    results[0] = (i - bounds[0], j - bounds[1])
                 else:
-                    if black and color[0] == 0 and color[1] == 0 and color[2] == 0:
-                        # there is one exception: black and white can coexist
-                        # so if black offset already exists, but it was read as part of a white pixel,
-                        # correct it to this black pixel
-                        if results[0] is None or results[0] == results[1] and results[1] == results[2] and results[2] == results[3]:
-                            results[0] = (i - bounds[0], j - bounds[1])
-                        else:
-                            raise MultipleOffsetError("Multiple black pixels found when searching for offsets!")
-                    if r and color[0] == 255:
-                        if results[1] is None:
-                            results[1] = (i - bounds[0], j - bounds[1])
-                        else:
-                            raise MultipleOffsetError("Multiple red pixels found found when searching for offsets!")
-                    if g and color[1] == 255:
-                        if results[2] is None:
-                            results[2] = (i - bounds[0], j - bounds[1])
-                        else:
-                            raise MultipleOffsetError("Multiple green pixels found found when searching for offsets!")
-                    if b and color[2] == 255:
-                        if results[3] is None:
-                            results[3] = (i - bounds[0], j - bounds[1])
-                        else:
-                            raise MultipleOffsetError("Multiple blue pixels found found when searching for offsets!")
+                    raise MultipleOffsetError("Multiple black pixels found when searching for offsets!")
+            if r and color[0] == 255:
+                if results[1] is None:
+                    results[1] = (i - bounds[0], j - bounds[1])
+                else:
+                    raise MultipleOffsetError("Multiple red pixels found found when searching for offsets!")
+            if g and color[1] == 255:
+                if results[2] is None:
+                    results[2] = (i - bounds[0], j - bounds[1])
+                else:
+                    raise MultipleOffsetError("Multiple green pixels found found when searching for offsets!")
+            if b and color[2] == 255:
+                if results[3] is None:
+                    results[3] = (i - bounds[0], j - bounds[1])
+                else:
+                    raise MultipleOffsetError("Multiple blue pixels found found when searching for offsets!")
 
     return results
 
@@ -155,6 +248,25 @@ def roundUpToMult(inInt: int, inMult: int):
     div = subInt // inMult
     return (div + 1) * inMult
 
+def getImgKey(img, flip: bool = False):
+    """
+    Hashable key of an image's pixels.  Two images with the same key are imgsEqual.
+    """
+    if flip:
+        img = img.transpose(Image.FLIP_LEFT_RIGHT) # type: ignore
+    return img.mode, img.size, img.tobytes()
+
+def getImgDigest(img) -> str:
+    """
+    Digest of an image's RGBA pixels.  Two images with the same digest are imgsEqual.
+    """
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("{0}x{1}".format(img.size[0], img.size[1]).encode("ascii"))
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
 def imgsEqual(img1, img2, flip: bool = False):
     if img1.size[0] != img2.size[0] or img1.size[1] != img2.size[1]:
         return False
@@ -172,6 +284,14 @@ def imgsEqual(img1, img2, flip: bool = False):
 
     return True
 
+def getLineartKey(img):
+    """
+    Hashable key of an image's black lineart.  Two images with the same key are imgsLineartEqual.
+    """
+    arr = getImgArray(img)
+    lineart = np.all(arr == (0, 0, 0, 255), axis=2)
+    return img.size, np.packbits(lineart).tobytes()
+
 def imgsLineartEqual(img1, img2, flip: bool = False):
     if img1.size[0] != img2.size[0] or img1.size[1] != img2.size[1]:
         return False